@@ -0,0 +1,79 @@
+"""Per-step time of small ncps cells (19 to 64 units) when a scan calls
+them through `Layer.__call__`, calls their `call()` method directly (the
+default path of `ncps.mini_keras.layers.RNN` after the first step) or calls a
+trace of `call()` compiled with `mx.compile` (`RNN(..., compile_cell=True)`).
+Small cells spend most of a step in Python, so the difference is the
+per-step overhead of the layer machinery.
+
+Usage::
+
+    python benchmarks/cell_call_overhead.py --steps 200 --batch 16
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mini_keras import backend
+from ncps.mlx import CfCCell, LTCCell, MixedMemoryRNN, WiredCfCCell
+
+
+def cells():
+    return {
+        "ltc ncp 19": lambda: LTCCell(wirings.NCP(7, 7, 5, 4, 4, 4, 3, seed=0)),
+        "cfc 32": lambda: CfCCell(32),
+        "cfc mixed memory 32": lambda: MixedMemoryRNN(CfCCell(32)),
+        "cfc wired 64": lambda: WiredCfCCell(wirings.AutoNCP(64, 8, seed=0)),
+    }
+
+
+def rollout(step, x, states):
+    for t in range(x.shape[1]):
+        _, states = step(x[:, t], states)
+        if not isinstance(states, (list, tuple)):
+            states = [states]
+    mx.eval(states)
+
+
+def measure(step, x, states, repeats):
+    rollout(step, x, states)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        rollout(step, x, states)
+    return (time.perf_counter() - start) / repeats / x.shape[1] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    print(
+        f"{'cell':>20} {'__call__ [us]':>14} {'call() [us]':>12} "
+        f"{'compiled [us]':>14}"
+    )
+    for name, make in cells().items():
+        cell = make()
+        state_size = cell.state_size
+        if isinstance(state_size, int):
+            state_size = [state_size]
+        states = [mx.zeros((args.batch, size)) for size in state_size]
+        cell(x[:, 0], states)
+        compiled = backend.compile_cell_call(cell.call, cell.variables)
+        timings = [
+            measure(step, x, states, args.repeats)
+            for step in [cell, cell.call, compiled]
+        ]
+        print(
+            f"{name:>20} {timings[0]:>14.1f} {timings[1]:>12.1f} "
+            f"{timings[2]:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
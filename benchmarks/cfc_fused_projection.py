@@ -0,0 +1,66 @@
+"""Time per step of `ncps.mlx.CfCCell` with four separate projection
+matmuls versus the fused single-matmul projection, with and without a
+backbone.
+
+Usage::
+
+    python benchmarks/cfc_fused_projection.py --units 64 256 --steps 100
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps.mlx import CfCCell
+
+
+def unroll(cell, x, h):
+    for t in range(x.shape[1]):
+        _, (h,) = cell(x[:, t], [h])
+    return h
+
+
+def measure(cell, x, h, repeats):
+    mx.eval(unroll(cell, x, h))  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(unroll(cell, x, h))
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    print(
+        f"{'units':>6} {'backbone':>9} {'separate [ms]':>14} "
+        f"{'fused [ms]':>11} {'speedup':>8}"
+    )
+    for units in args.units:
+        h = mx.zeros((args.batch, units))
+        for backbone_layers in [0, 1]:
+            times = []
+            for fused in [False, True]:
+                cell = CfCCell(
+                    units,
+                    backbone_layers=backbone_layers,
+                    backbone_dropout=0.0,
+                    fused_projection=fused,
+                )
+                cell(x[:, 0], [h])
+                times.append(measure(cell, x, h, args.repeats))
+            separate, fused = (1e3 * t / args.steps for t in times)
+            print(
+                f"{units:>6} {backbone_layers:>9} {separate:>14.3f} "
+                f"{fused:>11.3f} {separate / fused:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Inference and training throughput of K small `ncps.mlx.CfC` or
+`ncps.mlx.LTCCell` (`ncps.wirings.AutoNCP` with different seeds) models run
+one after another versus stacked into one `ncps.mlx.Ensemble`.
+
+Usage::
+
+    python benchmarks/ensemble.py --model ltc --members 1 4 16 64
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+import ncps
+from ncps import wirings
+from ncps.mlx import CfC, Ensemble, LTCCell
+
+
+def make_member(model, units, seed):
+    if model == "cfc":
+        return CfC(units, mode="no_gate", backbone_layers=0, return_sequences=True)
+    return ncps.mini_keras.layers.RNN(
+        LTCCell(wirings.AutoNCP(units, 2, seed=seed), sparse_execution=False),
+        return_sequences=True,
+    )
+
+
+def grads(layer, x):
+    def loss(trainable):
+        y, _ = layer.stateless_call(trainable, [], x)
+        return mx.mean(y**2)
+
+    return mx.grad(loss)([v.value for v in layer.trainable_variables])
+
+
+def measure(fn, repeats):
+    mx.eval(fn())  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(fn())
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=["cfc", "ltc"], default="cfc")
+    parser.add_argument("--units", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--members", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    print(
+        f"{'K':>4} {'loop [models/s]':>16} {'ensemble [models/s]':>20} "
+        f"{'loop train [models/s]':>22} {'ensemble train [models/s]':>26}"
+    )
+    for k in args.members:
+        members = [make_member(args.model, args.units, seed) for seed in range(k)]
+        for member in members:
+            member(x)
+        ensemble = Ensemble(members)
+        ensemble(x)
+        rates = [
+            k / measure(fn, args.repeats)
+            for fn in [
+                lambda: [member(x) for member in members],
+                lambda: ensemble(x),
+                lambda: [grads(member, x) for member in members],
+                lambda: grads(ensemble, x),
+            ]
+        ]
+        print(
+            f"{k:>4} {rates[0]:>16.1f} {rates[1]:>20.1f} "
+            f"{rates[2]:>22.1f} {rates[3]:>26.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
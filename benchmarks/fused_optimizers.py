@@ -0,0 +1,73 @@
+"""Time of one optimizer step over the weights of `ncps.mlx.LTC`, which has
+many small weight tensors (`gleak`, `vleak`, `cm`, `input_w`, ...), with the
+fused MLX optimizers (one compiled update of flat buffers per dtype) versus
+the generic per-variable `update_step` of the Keras base optimizer.
+
+Usage::
+
+    python benchmarks/fused_optimizers.py --units 32 --features 8 --repeats 200
+"""
+import argparse
+import functools
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.optimizers.base_optimizer import BaseOptimizer
+from ncps.mlx import LTC
+
+OPTIMIZERS = {
+    "adam": lambda: optimizers.Adam(learning_rate=1e-3),
+    "adamw": lambda: optimizers.AdamW(learning_rate=1e-3),
+    "sgd momentum": lambda: optimizers.SGD(learning_rate=1e-2, momentum=0.9),
+    "rmsprop": lambda: optimizers.RMSprop(learning_rate=1e-3),
+}
+
+
+def per_variable(optimizer):
+    optimizer._backend_update_step = functools.partial(
+        BaseOptimizer._backend_update_step, optimizer
+    )
+    optimizer._apply_weight_decay = functools.partial(
+        BaseOptimizer._apply_weight_decay, optimizer
+    )
+    optimizer._apply_constraints = functools.partial(
+        BaseOptimizer._apply_constraints, optimizer
+    )
+    return optimizer
+
+
+def measure(optimizer, variables, grads, repeats):
+    for _ in range(5):  # warm up
+        optimizer.apply(grads, variables)
+        mx.eval([v.value for v in variables + optimizer.variables])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        optimizer.apply(grads, variables)
+        mx.eval([v.value for v in variables + optimizer.variables])
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    layer = LTC(wirings.FullyConnected(args.units))
+    layer(mx.random.normal((1, 1, args.features)))
+    variables = layer.trainable_variables
+    grads = [mx.random.normal(v.shape) for v in variables]
+    print(f"{len(variables)} variables")
+    print(f"{'optimizer':>13} {'per-variable [us]':>18} {'fused [us]':>11}")
+    for name, make in OPTIMIZERS.items():
+        reference = measure(per_variable(make()), variables, grads, args.repeats)
+        fused = measure(make(), variables, grads, args.repeats)
+        print(f"{name:>13} {reference:>18.1f} {fused:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Throughput and per-request latency of serving many concurrent sessions of
+an `ncps.mlx.LTCCell`, one cell call per request versus micro-batched with
+`ncps.mlx.StatefulInferenceEngine`.
+
+Usage::
+
+    python benchmarks/inference_server.py --sessions 64 256 --steps 20
+"""
+import argparse
+import threading
+import time
+
+import mlx.core as mx
+import numpy as np
+
+from ncps import wirings
+from ncps.mlx import LTCCell, StatefulInferenceEngine
+
+
+def serve_unbatched(cell, obs):
+    """Every client thread calls the cell on its own state, one at a time"""
+    lock = threading.Lock()
+    latencies = []
+
+    def client(i):
+        h = mx.zeros((1, cell.state_size))
+        for t in range(obs.shape[1]):
+            start = time.perf_counter()
+            with lock:
+                output, (h,) = cell(mx.array(obs[i, t : t + 1]), [h])
+                mx.eval(output, h)
+            latencies.append(time.perf_counter() - start)
+
+    return run_clients(client, obs.shape[0]), latencies
+
+
+def serve_batched(cell, obs, latency_budget):
+    latencies = []
+    with StatefulInferenceEngine(
+        cell, max_sessions=obs.shape[0], latency_budget=latency_budget
+    ) as engine:
+        sessions = [engine.create_session() for _ in range(obs.shape[0])]
+
+        def client(i):
+            for t in range(obs.shape[1]):
+                start = time.perf_counter()
+                engine.step(sessions[i], obs[i, t])
+                latencies.append(time.perf_counter() - start)
+
+        elapsed = run_clients(client, obs.shape[0])
+    return elapsed, latencies
+
+
+def run_clients(client, num_clients):
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(num_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--latency-budget", type=float, default=0.002)
+    args = parser.parse_args()
+
+    cell = LTCCell(wirings.AutoNCP(args.units, 4))
+    cell(mx.zeros((1, args.features)), [mx.zeros((1, args.units))])
+    # Client threads cannot evaluate arrays built lazily on the main thread
+    mx.eval([getattr(w, "value", w) for w in cell.weights])
+
+    print(
+        f"{'sessions':>8} {'mode':>9} {'steps/s':>10} "
+        f"{'p50 [ms]':>10} {'p99 [ms]':>10}"
+    )
+    for sessions in args.sessions:
+        obs = np.random.default_rng(0).normal(
+            size=(sessions, args.steps, args.features)
+        ).astype(np.float32)
+        for name, (elapsed, latencies) in [
+            ("unbatched", serve_unbatched(cell, obs)),
+            ("batched", serve_batched(cell, obs, args.latency_budget)),
+        ]:
+            p50, p99 = 1e3 * np.percentile(latencies, [50, 99])
+            print(
+                f"{sessions:>8} {name:>9} {sessions * args.steps / elapsed:>10.0f} "
+                f"{p50:>10.2f} {p99:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time per sequence of the CfC, LTC and mixed-memory cells when every step
+applies its own input projection versus projecting the whole sequence with
+one batched matmul before the recurrence (`project_inputs` followed by
+`call_projected`, as done by `ncps.mini_keras.layers.RNN`).
+
+Usage::
+
+    python benchmarks/input_projection.py --features 64 --steps 200
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import CfCCell, LTCCell, MixedMemoryRNN
+
+
+def per_step(cell, x, states):
+    for t in range(x.shape[1]):
+        _, states = cell(x[:, t], states)
+    return states
+
+
+def hoisted(cell, x, states):
+    projected = cell.project_inputs(x)
+    for t in range(x.shape[1]):
+        _, states = cell.call_projected(projected[:, t], states)
+    return states
+
+
+def measure(unroll, cell, x, states, repeats):
+    mx.eval(unroll(cell, x, states))  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(unroll(cell, x, states))
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    units, batch = args.units, args.batch
+    x = mx.random.normal((batch, args.steps, args.features))
+    cells = {
+        "CfC": CfCCell(units, backbone_layers=0, backbone_units=0),
+        "CfC backbone": CfCCell(units, backbone_dropout=0.0),
+        "CfC fused": CfCCell(
+            units, backbone_layers=0, backbone_units=0, fused_projection=True
+        ),
+        "LTC": LTCCell(wirings.FullyConnected(units)),
+        "MixedMemory CfC": MixedMemoryRNN(
+            CfCCell(units, backbone_layers=0, backbone_units=0)
+        ),
+    }
+
+    print(f"{'cell':>16} {'per step [ms]':>14} {'hoisted [ms]':>13} {'speedup':>8}")
+    for name, cell in cells.items():
+        if isinstance(cell, MixedMemoryRNN):
+            states = [mx.zeros((batch, units)), [mx.zeros((batch, units))]]
+        else:
+            states = [mx.zeros((batch, units))]
+        cell(x[:, 0], states)
+        baseline = 1e3 * measure(per_step, cell, x, states, args.repeats)
+        fast = 1e3 * measure(hoisted, cell, x, states, args.repeats)
+        print(f"{name:>16} {baseline:>14.2f} {fast:>13.2f} {baseline / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Accuracy, function evaluations and time of `ncps.mlx.EnhancedLTCCell` on
+an irregularly sampled sequence with fixed-step solvers versus the adaptive
+Dormand-Prince ("dopri5") and Runge-Kutta-Fehlberg ("rkf45") solvers at a few
+tolerances. The error is measured against RK4 with many substeps.
+
+Usage::
+
+    python benchmarks/ltc_adaptive.py --units 32 --steps 50 --rtol 1e-2 1e-4
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import EnhancedLTCCell
+
+# Function evaluations per substep of the fixed-step solvers
+STAGES = {"euler": 1, "rk4": 4, "semi_implicit": 1}
+
+
+def rollout(cell, x, elapsed_time, h):
+    nfe = 0
+    for t in range(x.shape[1]):
+        _, (h,) = cell((x[:, t], elapsed_time[:, t]), [h])
+        mx.eval(h)
+        if cell.nfe is not None:
+            nfe += cell.nfe.sum().item()
+        else:
+            nfe += STAGES[cell.solver] * cell._ode_unfolds * x.shape[0]
+    return h, nfe
+
+
+def copy_params(cell, reference):
+    for name, param in cell._params.items():
+        if "sparsity_mask" not in name:
+            param.assign(reference._params[name])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--rtol", type=float, nargs="+", default=[1e-2, 1e-4])
+    args = parser.parse_args()
+
+    wiring = wirings.FullyConnected(args.units)
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    # Exponentially distributed intervals: mostly short with a few long gaps
+    uniform = mx.random.uniform(shape=(args.batch, args.steps, 1))
+    elapsed_time = -0.5 * mx.log(uniform)
+    h = mx.zeros((args.batch, args.units))
+
+    reference = EnhancedLTCCell(wiring, solver="rk4", ode_unfolds=200)
+    reference((x[:, 0], elapsed_time[:, 0]), [h])
+    expected, _ = rollout(reference, x, elapsed_time, h)
+
+    configs = [
+        (solver, {"ode_unfolds": 6}) for solver in ["euler", "rk4", "semi_implicit"]
+    ]
+    for rtol in args.rtol:
+        for solver in ["dopri5", "rkf45"]:
+            configs.append((solver, {"rtol": rtol, "atol": rtol * 1e-2}))
+
+    print(
+        f"{'solver':>13} {'rtol':>6} {'max error':>10} "
+        f"{'NFE/sample':>11} {'time [s]':>9}"
+    )
+    for solver, kwargs in configs:
+        if solver == "semi_implicit":
+            kwargs["sparse_execution"] = False
+        cell = EnhancedLTCCell(wiring, solver=solver, **kwargs)
+        cell((x[:, 0], elapsed_time[:, 0]), [h])
+        copy_params(cell, reference)
+        start = time.perf_counter()
+        state, nfe = rollout(cell, x, elapsed_time, h)
+        elapsed = time.perf_counter() - start
+        error = mx.abs(state - expected).max().item()
+        rtol = f"{kwargs['rtol']:.0e}" if "rtol" in kwargs else "-"
+        print(
+            f"{solver:>13} {rtol:>6} {error:>10.2e} "
+            f"{nfe / args.batch:>11.0f} {elapsed:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
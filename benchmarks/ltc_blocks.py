@@ -0,0 +1,82 @@
+"""Time per step, peak memory and synapse parameter count of `ncps.mlx.LTCCell`
+on `AutoNCP` wirings with dense masked synapse tensors, the edge-list path
+and the layer-block execution path.
+
+Usage::
+
+    python benchmarks/ltc_blocks.py --units 64 256 1024 --steps 8
+"""
+import argparse
+import time
+
+import mlx.core as mx
+import numpy as np
+
+from ncps import wirings
+from ncps.mlx import LTCCell
+
+
+def unroll(cell, x, h, steps):
+    for _ in range(steps):
+        _, (h,) = cell(x, [h])
+    return h
+
+
+def forward(cell, x, h, steps):
+    mx.eval(unroll(cell, x, h, steps))
+
+
+def backward(cell, x, h, steps):
+    mx.eval(mx.grad(lambda h0: unroll(cell, x, h0, steps).sum())(h))
+
+
+def measure(fn, cell, x, h, steps, repeats):
+    fn(cell, x, h, steps)
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(cell, x, h, steps)
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--outputs", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.features))
+
+    print(
+        f"{'units':>6} {'mode':>7} {'params':>9} {'pass':>9} "
+        f"{'time/step [ms]':>16} {'peak [MiB]':>12}"
+    )
+    for units in args.units:
+        h = mx.zeros((args.batch, units))
+        for mode in [False, True, "blocks"]:
+            # Same seed, so all modes see the same synapses
+            cell = LTCCell(
+                wirings.AutoNCP(units, args.outputs), sparse_execution=mode
+            )
+            cell(x, [h])
+            params = sum(
+                np.asarray(p).size
+                for name, p in cell._params.items()
+                if "sparsity_mask" not in name
+            )
+            name = {False: "dense", True: "sparse", "blocks": "blocks"}[mode]
+            for fn in [forward, backward]:
+                elapsed, peak = measure(fn, cell, x, h, args.steps, args.repeats)
+                print(
+                    f"{units:>6} {name:>7} {params:>9} {fn.__name__:>9} "
+                    f"{1e3 * elapsed / args.steps:>16.3f} {peak:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
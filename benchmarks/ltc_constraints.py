@@ -0,0 +1,86 @@
+"""Training steps per second of `ncps.mlx.LTC` with three ways of keeping
+gleak, cm, w and sensory_w non-negative:
+
+- "separate": the generic per-variable update of the Keras base optimizer
+  followed by a projection pass over the constrained variables,
+- "fused": the `NonNeg` constraints applied inside the fused MLX optimizer
+  update, in the same compiled call as the Adam step,
+- "softplus": `LTC(..., implicit_param_constraints=True)`, which has no
+  constraints and evaluates the ODE with the softplus of the parameters.
+
+Usage::
+
+    python benchmarks/ltc_constraints.py --units 32 --steps 50 --batch 16
+"""
+import argparse
+import functools
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.optimizers.base_optimizer import BaseOptimizer
+from ncps.mlx import LTC
+
+
+def separate(optimizer):
+    optimizer._backend_update_step = functools.partial(
+        BaseOptimizer._backend_update_step, optimizer
+    )
+    optimizer._apply_weight_decay = functools.partial(
+        BaseOptimizer._apply_weight_decay, optimizer
+    )
+    optimizer._apply_constraints = functools.partial(
+        BaseOptimizer._apply_constraints, optimizer
+    )
+    return optimizer
+
+
+def train_step(layer, optimizer, x):
+    def loss(trainable):
+        non_trainable = [v.value for v in layer.non_trainable_variables]
+        y, _ = layer.stateless_call(trainable, non_trainable, x)
+        return mx.mean(y**2)
+
+    trainable = [v.value for v in layer.trainable_variables]
+    _, grads = mx.value_and_grad(loss)(trainable)
+    optimizer.apply(grads, layer.trainable_variables)
+    mx.eval([v.value for v in layer.trainable_variables + optimizer.variables])
+
+
+def measure(layer, optimizer, x, repeats):
+    train_step(layer, optimizer, x)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        train_step(layer, optimizer, x)
+    return repeats / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    configurations = {
+        "separate": (False, lambda: separate(optimizers.Adam(learning_rate=1e-3))),
+        "fused": (False, lambda: optimizers.Adam(learning_rate=1e-3)),
+        "softplus": (True, lambda: optimizers.Adam(learning_rate=1e-3)),
+    }
+    print(f"{'constraints':>11} {'steps/s':>10}")
+    for name, (implicit, make_optimizer) in configurations.items():
+        layer = LTC(
+            wirings.FullyConnected(args.units), implicit_param_constraints=implicit
+        )
+        layer(x[:, :1])
+        rate = measure(layer, make_optimizer(), x, args.repeats)
+        print(f"{name:>11} {rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
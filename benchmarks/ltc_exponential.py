@@ -0,0 +1,97 @@
+"""Accuracy, synapse evaluations and time of `ncps.mlx.LTCCell` with the
+semi-implicit Euler unfolds versus the exponential integrator
+(`LTCCell(..., integrator="exponential")`) at a few substep sizes, on a
+regularly sampled sequence and on an irregularly sampled one with long gaps.
+The error is measured against the adaptive Dormand-Prince solver of
+`ncps.mlx.EnhancedLTCCell` at a tight tolerance.
+
+Usage::
+
+    python benchmarks/ltc_exponential.py --units 32 --steps 50 --substep-sizes 1.0 0.5
+"""
+import argparse
+import math
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import EnhancedLTCCell, LTCCell
+
+
+def rollout(cell, x, elapsed_time, h):
+    for t in range(x.shape[1]):
+        _, (h,) = cell((x[:, t], elapsed_time[:, t]), [h])
+        mx.eval(h)
+    return h
+
+
+def evaluations(cell, elapsed_time):
+    """Synapse evaluations per step, a batch takes as many substeps as its longest interval"""
+    if cell._integrator == "semi_implicit":
+        return cell._ode_unfolds
+    substeps = mx.clip(
+        mx.ceil(elapsed_time / cell._substep_size), 1, cell._max_substeps
+    )
+    # Two evaluations per substep
+    return 2 * mx.mean(mx.max(substeps, axis=0)).item()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument(
+        "--substep-sizes", type=float, nargs="+", default=[1.0, 0.5, 0.25]
+    )
+    args = parser.parse_args()
+
+    wiring = wirings.FullyConnected(args.units)
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    # Exponentially distributed intervals with a mean of 2: mostly short with a few long gaps
+    uniform = mx.random.uniform(shape=(args.batch, args.steps, 1))
+    workloads = {
+        "regular": mx.ones((args.batch, args.steps, 1)),
+        "irregular": -2.0 * mx.log(uniform),
+    }
+    h = mx.zeros((args.batch, args.units))
+
+    reference = EnhancedLTCCell(
+        wiring, solver="dopri5", rtol=1e-6, atol=1e-8, max_steps=1000
+    )
+    reference((x[:, 0], workloads["regular"][:, 0]), [h])
+
+    configs = [("semi_implicit", {"ode_unfolds": 6})] + [
+        ("exponential", {"substep_size": size, "max_substeps": math.ceil(30 / size)})
+        for size in args.substep_sizes
+    ]
+    print(
+        f"{'workload':>9} {'integrator':>13} {'substep':>8} {'max error':>10} "
+        f"{'evals/step':>11} {'time [s]':>9}"
+    )
+    for workload, elapsed_time in workloads.items():
+        expected = rollout(reference, x, elapsed_time, h)
+        for integrator, kwargs in configs:
+            cell = LTCCell(
+                wiring, integrator=integrator, sparse_execution=False, **kwargs
+            )
+            cell((x[:, 0], elapsed_time[:, 0]), [h])
+            for name, param in cell._params.items():
+                if "sparsity_mask" not in name:
+                    param.assign(reference._params[name])
+            rollout(cell, x[:, :2], elapsed_time[:, :2], h)  # warm up
+            start = time.perf_counter()
+            state = rollout(cell, x, elapsed_time, h)
+            elapsed = time.perf_counter() - start
+            error = mx.abs(state - expected).max().item()
+            substep = f"{kwargs['substep_size']:g}" if "substep_size" in kwargs else "-"
+            print(
+                f"{workload:>9} {integrator:>13} {substep:>8} {error:>10.2e} "
+                f"{evaluations(cell, elapsed_time):>11.2f} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
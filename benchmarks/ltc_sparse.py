@@ -0,0 +1,77 @@
+"""Time and peak memory of `ncps.mlx.LTCCell` steps with dense masked
+synapse tensors versus the edge-list (gather/segment-sum) execution path,
+over a range of wiring densities.
+
+Usage::
+
+    python benchmarks/ltc_sparse.py --units 1024 --densities 0.05 0.1 0.3
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import LTCCell
+
+
+def unroll(cell, x, h, steps):
+    for _ in range(steps):
+        _, (h,) = cell(x, [h])
+    return h
+
+
+def forward(cell, x, h, steps):
+    mx.eval(unroll(cell, x, h, steps))
+
+
+def backward(cell, x, h, steps):
+    mx.eval(mx.grad(lambda h0: unroll(cell, x, h0, steps).sum())(h))
+
+
+def measure(fn, cell, x, h, steps, repeats):
+    fn(cell, x, h, steps)
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(cell, x, h, steps)
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument(
+        "--densities", type=float, nargs="+", default=[0.05, 0.1, 0.2, 0.5]
+    )
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.features))
+    h = mx.zeros((args.batch, args.units))
+
+    print(
+        f"{'density':>8} {'mode':>7} {'pass':>9} "
+        f"{'time/step [ms]':>16} {'peak [MiB]':>12}"
+    )
+    for density in args.densities:
+        for sparse in [False, True]:
+            # Same seed, so both modes see the same synapses
+            wiring = wirings.Random(args.units, sparsity_level=1.0 - density)
+            cell = LTCCell(wiring, sparse_execution=sparse)
+            cell(x, [h])
+            for fn in [forward, backward]:
+                elapsed, peak = measure(fn, cell, x, h, args.steps, args.repeats)
+                name = "sparse" if sparse else "dense"
+                print(
+                    f"{density:>8.2f} {name:>7} {fn.__name__:>9} "
+                    f"{1e3 * elapsed / args.steps:>16.3f} {peak:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Time and peak memory of `ncps.mlx.LTCCell` steps with the fused, compiled
+ODE unfolds versus the reference Python loop, for inference and for a
+backward pass (where all unfold activations are kept alive).
+
+Usage::
+
+    python benchmarks/ltc_unfolds.py --units 256 --batch 64
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import LTCCell
+
+
+def unroll(cell, x, h, steps):
+    for _ in range(steps):
+        _, (h,) = cell(x, [h])
+    return h
+
+
+def forward(cell, x, h, steps):
+    mx.eval(unroll(cell, x, h, steps))
+
+
+def backward(cell, x, h, steps):
+    mx.eval(mx.grad(lambda h0: unroll(cell, x, h0, steps).sum())(h))
+
+
+def measure(fn, cell, x, h, steps, repeats):
+    fn(cell, x, h, steps)
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(cell, x, h, steps)
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=256)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--ode-unfolds", type=int, default=6)
+    parser.add_argument("--steps", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    cell = LTCCell(
+        wirings.FullyConnected(args.units), ode_unfolds=args.ode_unfolds
+    )
+    x = mx.random.normal((args.batch, args.features))
+    h = mx.zeros((args.batch, args.units))
+    cell(x, [h])
+
+    print(f"{'mode':>8} {'pass':>9} {'time/step [ms]':>16} {'peak [MiB]':>12}")
+    for fn in [forward, backward]:
+        for fused in [False, True]:
+            cell._fused_unfolds = fused
+            elapsed, peak = measure(fn, cell, x, h, args.steps, args.repeats)
+            name = "fused" if fused else "loop"
+            print(
+                f"{name:>8} {fn.__name__:>9} "
+                f"{1e3 * elapsed / args.steps:>16.3f} {peak:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
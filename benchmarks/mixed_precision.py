@@ -0,0 +1,94 @@
+"""Throughput, peak memory and accuracy drift of `ncps.mlx.LTC` and
+`ncps.mlx.CfC` (plain, mixed-memory and wired) under the "float32",
+"mixed_float16" and "mixed_bfloat16" dtype policies. Each configuration runs
+forward and backward passes over a long sequence. The error is the largest
+deviation of the outputs from the float32 layer with the same weights.
+
+Usage::
+
+    python benchmarks/mixed_precision.py --units 64 --steps 1000 --batch 32
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import CfC, LTC
+
+POLICIES = ["float32", "mixed_float16", "mixed_bfloat16"]
+
+
+def models(units):
+    return {
+        "ltc": lambda policy: LTC(
+            wirings.FullyConnected(units), return_sequences=True, dtype=policy
+        ),
+        "cfc": lambda policy: CfC(units, return_sequences=True, dtype=policy),
+        "cfc mixed memory": lambda policy: CfC(
+            units, mixed_memory=True, return_sequences=True, dtype=policy
+        ),
+        "cfc wired": lambda policy: CfC(
+            wirings.AutoNCP(units, units // 4, seed=0),
+            return_sequences=True,
+            dtype=policy,
+        ),
+    }
+
+
+def loss_and_grads(layer, x):
+    def loss(trainable):
+        non_trainable = [v.value for v in layer.non_trainable_variables]
+        y, _ = layer.stateless_call(trainable, non_trainable, x)
+        return mx.mean(y.astype(mx.float32) ** 2)
+
+    trainable = [v.value for v in layer.trainable_variables]
+    return mx.value_and_grad(loss)(trainable)
+
+
+def measure(layer, x, repeats):
+    mx.eval(loss_and_grads(layer, x))  # warm up
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(loss_and_grads(layer, x))
+    elapsed = (time.perf_counter() - start) / repeats
+    return x.shape[0] * x.shape[1] / elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument(
+        "--models", nargs="+", default=None, help="Subset of the benchmarked layers"
+    )
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    print(
+        f"{'model':>17} {'policy':>15} {'steps/s':>10} "
+        f"{'peak [MiB]':>11} {'max error':>10}"
+    )
+    for name, make in models(args.units).items():
+        if args.models is not None and name not in args.models:
+            continue
+        reference = make("float32")
+        expected = reference(x)
+        for policy in POLICIES:
+            layer = make(policy)
+            layer(x[:, :1])
+            layer.set_weights(reference.get_weights())
+            error = mx.abs(layer(x).astype(mx.float32) - expected).max().item()
+            rate, peak = measure(layer, x, args.repeats)
+            print(
+                f"{name:>17} {policy:>15} {rate:>10.0f} "
+                f"{peak:>11.1f} {error:>10.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Per-op timings of the MLX-native `ncps.mini_keras.backend.mlx.nn` against
+the former NumPy/JAX implementation of the same ops.
+
+The baselines below are transcribed from the former module and include the
+host round-trip it made for MLX inputs. The convolution and pooling
+baselines went through `jax.lax` and are skipped when JAX is not installed.
+
+Usage::
+
+    python benchmarks/nn_ops.py --batch 256 --features 128 --repeats 50
+"""
+import argparse
+import time
+
+import mlx.core as mx
+import numpy as np
+
+from ncps.mini_keras.backend.mlx import nn
+
+
+def numpy_baselines(args):
+    def host(x):
+        return np.asarray(x)
+
+    def sigmoid(x):
+        x = host(x)
+        return np.array(1.0, x.dtype) / (np.array(1.0, x.dtype) + np.exp(-x))
+
+    def softmax(x):
+        x = host(x)
+        exp_x = np.exp(x - np.max(x, axis=-1, keepdims=True))
+        return exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+
+    def log_softmax(x):
+        x = host(x)
+        max_x = np.max(x, axis=-1, keepdims=True)
+        return x - max_x - np.log(np.exp(x - max_x).sum(axis=-1, keepdims=True))
+
+    def gelu(x):
+        x = host(x)
+        cdf = 0.5 * (1.0 + np.tanh(np.sqrt(2 / np.pi) * (x + 0.044715 * x**3)))
+        return x * cdf
+
+    def one_hot(x):
+        x = host(x).reshape(-1)
+        categorical = np.zeros((x.shape[0], args.features), dtype="float32")
+        categorical[np.arange(x.shape[0]), x] = 1
+        return categorical
+
+    def moments(x):
+        x = host(x)
+        mean = np.mean(x, 0)
+        return mean, np.mean(np.square(x), axis=0) - np.square(mean)
+
+    def batch_normalization(x, mean, variance):
+        inv = 1.0 / np.sqrt(host(variance) + 1e-3)
+        return host(x) * inv - host(mean) * inv
+
+    def categorical_crossentropy(target, output):
+        output = host(output)
+        log_prob = output - np.log(np.exp(output).sum(-1, keepdims=True))
+        return -np.sum(host(target) * log_prob, axis=-1)
+
+    return {
+        "relu": lambda x: np.maximum(host(x), 0.0),
+        "sigmoid": sigmoid,
+        "tanh": lambda x: np.tanh(host(x)),
+        "softplus": lambda x: np.logaddexp(host(x), 0.0),
+        "gelu": gelu,
+        "softmax": softmax,
+        "log_softmax": log_softmax,
+        "one_hot": one_hot,
+        "moments": moments,
+        "batch_normalization": batch_normalization,
+        "categorical_crossentropy": categorical_crossentropy,
+    }
+
+
+def jax_baselines():
+    try:
+        from jax import lax
+    except ImportError:
+        return {}
+
+    def conv(x, kernel):
+        return np.array(
+            lax.conv_general_dilated(
+                np.asarray(x),
+                np.asarray(kernel),
+                (1,),
+                "SAME",
+                dimension_numbers=("NWC", "WIO", "NWC"),
+            )
+        )
+
+    def max_pool(x):
+        return np.array(
+            lax.reduce_window(
+                np.asarray(x), -np.inf, lax.max, (1, 2, 1), (1, 2, 1), "VALID"
+            )
+        )
+
+    def average_pool(x):
+        pooled = lax.reduce_window(
+            np.asarray(x), 0.0, lax.add, (1, 2, 1), (1, 2, 1), "VALID"
+        )
+        return np.array(pooled) / 2
+
+    return {"conv": conv, "max_pool": max_pool, "average_pool": average_pool}
+
+
+def measure(fn, inputs, repeats, evaluate):
+    evaluate(fn(*inputs))  # warm up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        evaluate(fn(*inputs))
+        times.append(time.perf_counter() - start)
+    return 1e3 * np.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--features", type=int, default=128)
+    parser.add_argument("--length", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.features))
+    labels = mx.random.randint(0, args.features, (args.batch,))
+    target = mx.softmax(mx.random.normal((args.batch, args.features)), axis=-1)
+    mean, variance = mx.mean(x, 0), mx.var(x, 0)
+    sequence = mx.random.normal((args.batch // 8, args.length, args.features))
+    kernel = mx.random.normal((3, args.features, args.features))
+    mx.eval(x, labels, target, mean, variance, sequence, kernel)
+
+    cases = {
+        "relu": ((x,), nn.relu),
+        "sigmoid": ((x,), nn.sigmoid),
+        "tanh": ((x,), nn.tanh),
+        "softplus": ((x,), nn.softplus),
+        "gelu": ((x,), nn.gelu),
+        "softmax": ((x,), lambda x: nn.softmax(x, axis=-1)),
+        "log_softmax": ((x,), lambda x: nn.log_softmax(x, axis=-1)),
+        "one_hot": ((labels,), lambda x: nn.one_hot(x, args.features)),
+        "moments": ((x,), lambda x: nn.moments(x, [0])),
+        "batch_normalization": (
+            (x, mean, variance),
+            lambda x, m, v: nn.batch_normalization(x, m, v, axis=1),
+        ),
+        "categorical_crossentropy": (
+            (target, x),
+            lambda t, o: nn.categorical_crossentropy(t, o, from_logits=True),
+        ),
+        "conv": ((sequence, kernel), lambda s, k: nn.conv(s, k, padding="same")),
+        "max_pool": ((sequence,), lambda s: nn.max_pool(s, 2)),
+        "average_pool": ((sequence,), lambda s: nn.average_pool(s, 2, None, "valid")),
+    }
+    baselines = {**numpy_baselines(args), **jax_baselines()}
+
+    print(f"{'op':>26} {'former [ms]':>12} {'mlx [ms]':>10} {'speedup':>8}")
+    for name, (inputs, fn) in cases.items():
+        mlx_time = measure(fn, inputs, args.repeats, mx.eval)
+        if name in baselines:
+            former = measure(baselines[name], inputs, args.repeats, lambda _: None)
+            print(
+                f"{name:>26} {former:>12.3f} {mlx_time:>10.3f} "
+                f"{former / mlx_time:>7.1f}x"
+            )
+        else:
+            print(f"{name:>26} {'n/a':>12} {mlx_time:>10.3f} {'':>8}")
+
+
+if __name__ == "__main__":
+    main()
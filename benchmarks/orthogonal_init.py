@@ -0,0 +1,47 @@
+"""Time and orthogonality error of the MLX orthogonal initializer at several
+square and rectangular sizes.
+
+Usage::
+
+    python benchmarks/orthogonal_init.py --sizes 256x256 512x2048 2048x2048
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps.mini_keras.backend.mlx.orthogonal import orthogonal
+
+
+def parse_size(text):
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes",
+        type=parse_size,
+        nargs="+",
+        default=[(256, 256), (512, 2048), (2048, 512), (1024, 1024), (2048, 2048)],
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'shape':>12} {'time [ms]':>10} {'max |QtQ - I|':>14}")
+    for shape in args.sizes:
+        mx.eval(orthogonal(shape))
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            q = orthogonal(shape)
+            mx.eval(q)
+        elapsed = (time.perf_counter() - start) / args.repeats
+        gram = q @ q.T if shape[0] <= shape[1] else q.T @ q
+        error = mx.abs(gram - mx.eye(gram.shape[0])).max().item()
+        name = f"{shape[0]}x{shape[1]}"
+        print(f"{name:>12} {1e3 * elapsed:>10.1f} {error:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Time and peak memory of one forward and backward pass of `ncps.mlx.LTC`
+(`ode_unfolds=6`) over a long sequence, keeping every intermediate for the
+backward pass versus recomputing the steps between states checkpointed every
+k steps (`LTC(..., checkpoint_every=k)`).
+
+Usage::
+
+    python benchmarks/rnn_checkpointing.py --steps 2000 --every 10 50 200
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps import wirings
+from ncps.mlx import LTC
+
+
+def loss_and_grads(layer, x):
+    def loss(trainable):
+        non_trainable = [v.value for v in layer.non_trainable_variables]
+        y, _ = layer.stateless_call(trainable, non_trainable, x)
+        return mx.mean(y**2)
+
+    trainable = [v.value for v in layer.trainable_variables]
+    return mx.value_and_grad(loss)(trainable)
+
+
+def measure(layer, x, repeats):
+    mx.eval(loss_and_grads(layer, x))  # warm up
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(loss_and_grads(layer, x))
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--every", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    x = mx.random.normal((args.batch, args.steps, args.features))
+    print(f"{'checkpoint_every':>16} {'time [s]':>9} {'peak [MiB]':>11}")
+    for every in [None] + args.every:
+        layer = LTC(
+            wirings.FullyConnected(args.units),
+            return_sequences=True,
+            ode_unfolds=6,
+            checkpoint_every=every,
+        )
+        layer(x[:, :1])
+        elapsed, peak = measure(layer, x, args.repeats)
+        name = "off" if every is None else str(every)
+        print(f"{name:>16} {elapsed:>9.3f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark of the MLX `rnn()` loop against the former NumPy scan path.
+
+The NumPy path is reproduced here as it was in
+`ncps/mini_keras/backend/mlx/rnn.py`: every timestep's output is pulled to the
+host, collected in a Python list and stacked with `np.array` at the end.
+
+Usage::
+
+    python benchmarks/rnn_scan.py --steps 1000 4000 --batch 16 --units 64
+"""
+import argparse
+import time
+
+import mlx.core as mx
+import numpy as np
+
+from ncps.mini_keras.backend.mlx.rnn import rnn
+
+
+def make_step(features, units):
+    kernel = mx.random.normal((features, units)) * 0.1
+    recurrent_kernel = mx.random.normal((units, units)) * 0.1
+
+    def step(inputs, states):
+        h = mx.tanh(inputs @ kernel + states[0] @ recurrent_kernel)
+        return h, [h]
+
+    return step
+
+
+def numpy_scan_rnn(step, inputs, initial_states):
+    inputs = np.transpose(np.array(inputs), (1, 0, 2))
+    states = initial_states
+    outputs = []
+    for x in inputs:
+        output, states = step(mx.array(x), states)
+        outputs.append(np.array(output))
+    outputs = np.transpose(np.array(outputs), (1, 0, 2))
+    return outputs[:, -1], outputs, states
+
+
+def mlx_rnn(step, inputs, initial_states):
+    last_output, outputs, states = rnn(step, inputs, initial_states)
+    mx.eval(outputs, states)
+    return last_output, outputs, states
+
+
+def timeit(fn, repeats):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    step = make_step(args.features, args.units)
+    print(f"{'T':>8} {'numpy scan [s]':>16} {'mlx rnn [s]':>14} {'speedup':>9}")
+    for steps in args.steps:
+        x = mx.random.normal((args.batch, steps, args.features))
+        h0 = [mx.zeros((args.batch, args.units))]
+        t_np = timeit(lambda: numpy_scan_rnn(step, x, h0), args.repeats)
+        t_mx = timeit(lambda: mlx_rnn(step, x, h0), args.repeats)
+        print(f"{steps:>8} {t_np:>16.4f} {t_mx:>14.4f} {t_np / t_mx:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Time and peak memory of a long `ncps.mini_keras.backend.mlx.core.scan`
+rollout when the outputs are stacked from a Python list, written into a
+preallocated buffer one step at a time, kept with a stride, or summarized on
+the fly by a `LastOutputs` / `MeanOutputs` reduction. With `--grad` the
+gradient with respect to the kernel is timed instead, where every per-step
+buffer write adds a backward pass over the whole buffer.
+
+Usage::
+
+    python benchmarks/scan_outputs.py --steps 20000 --units 256 --stride 100
+    python benchmarks/scan_outputs.py --steps 4000 --grad
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from ncps.mini_keras.backend.mlx.core import LastOutputs, MeanOutputs, scan
+
+
+def stacked_scan(f, init, xs):
+    carry, ys = init, []
+    for i in range(xs.shape[0]):
+        carry, y = f(carry, xs[i])
+        ys.append(y)
+    return carry, mx.stack(ys)
+
+
+def buffered_scan(f, init, xs):
+    carry, ys = init, None
+    for i in range(xs.shape[0]):
+        carry, y = f(carry, xs[i])
+        if ys is None:
+            ys = mx.zeros((xs.shape[0],) + y.shape, dtype=y.dtype)
+        ys[i] = y
+    return carry, ys
+
+
+def measure(fn, repeats):
+    mx.eval(fn())  # warm up
+    mx.reset_peak_memory()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(fn())
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--units", type=int, default=256)
+    parser.add_argument("--stride", type=int, default=100)
+    parser.add_argument("--last", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--grad", action="store_true")
+    args = parser.parse_args()
+
+    kernel = mx.random.normal((args.units, args.units)) / args.units**0.5
+    xs = mx.random.normal((args.steps, args.batch, args.units))
+    h0 = mx.zeros((args.batch, args.units))
+    mx.eval(kernel, xs)
+
+    def rollout(scan_fn, **kwargs):
+        def run(kernel):
+            def step(h, x):
+                h = mx.tanh(h @ kernel + x)
+                return h, h
+
+            return scan_fn(step, h0, xs, **kwargs)
+
+        if not args.grad:
+            return lambda: run(kernel)
+        grad = mx.grad(lambda kernel: mx.sum(run(kernel)[1] ** 2))
+        return lambda: grad(kernel)
+
+    cases = {
+        "stack": rollout(stacked_scan),
+        "buffer": rollout(buffered_scan),
+        "scan": rollout(scan),
+        f"stride {args.stride}": rollout(scan, stride=args.stride),
+        f"last {args.last}": rollout(scan, reduction=LastOutputs(args.last)),
+        "mean": rollout(scan, reduction=MeanOutputs()),
+    }
+    print(f"{'outputs':>12} {'time [s]':>9} {'peak [MiB]':>11}")
+    for name, fn in cases.items():
+        elapsed, peak = measure(fn, args.repeats)
+        print(f"{name:>12} {elapsed:>9.3f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Load time and peak resident memory of
+`ncps.datasets.icra2020_lidar_collision_avoidance` with the previous loader
+(hash and decompress the npz, copy every recording for the mirror
+augmentation and stack the windows), `load_data` and the memory mapped
+`load_sequences`, followed by one pass over the training windows in batches.
+Every loader runs in a fresh process, so the peak memory includes the
+interpreter and NumPy. The dataset is downloaded on the first run.
+
+Usage::
+
+    python benchmarks/sequence_datasets.py --local-path datasets/icra2020_imitation_data_packed.npz
+"""
+import argparse
+import hashlib
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+from ncps.datasets import icra2020_lidar_collision_avoidance as icra
+
+
+def previous_load_data(local_path, seq_len):
+    hashlib.md5(open(local_path, "rb").read()).hexdigest()
+    with np.load(local_path) as f:
+        all_files = [(f["x_{}".format(i)], f["y_{}".format(i)]) for i in range(29)]
+    train_files, test_files = icra._train_test_split(all_files)
+
+    def prepare(files):
+        windows_x, windows_y = [], []
+        for x, y in files:
+            for seq_x, seq_y in [(x, y), (x[:, ::-1], -y)]:
+                for i in range(0, x.shape[0] - seq_len, seq_len // 2):
+                    windows_x.append(seq_x[i : i + seq_len])
+                    windows_y.append(seq_y[i : i + seq_len])
+        return (
+            np.expand_dims(np.stack(windows_x), -1),
+            np.expand_dims(np.stack(windows_y), -1),
+        )
+
+    return prepare(train_files), prepare(test_files)
+
+
+def batches_of_arrays(data, batch_size):
+    x, y = data
+    for i in range(0, len(x), batch_size):
+        yield x[i : i + batch_size], y[i : i + batch_size]
+
+
+def run(loader, local_path, seq_len, batch_size):
+    start = time.perf_counter()
+    if loader == "previous":
+        train, _ = previous_load_data(local_path, seq_len)
+        batches = batches_of_arrays(train, batch_size)
+    elif loader == "load_data":
+        train, _ = icra.load_data(local_path, seq_len)
+        batches = batches_of_arrays(train, batch_size)
+    else:
+        train, _ = icra.load_sequences(local_path, seq_len)
+        batches = train.batches(batch_size)
+    loaded = time.perf_counter()
+    checksum = sum(float(x[:, -1].sum()) for x, _ in batches)
+    epoch = time.perf_counter()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return loaded - start, epoch - loaded, peak, checksum
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--local-path", default="datasets/icra2020_imitation_data_packed.npz"
+    )
+    parser.add_argument("--seq-len", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args()
+
+    # Downloads the dataset and builds the cache
+    icra.load_sequences(args.local_path, args.seq_len)
+    context = multiprocessing.get_context("spawn")
+    print(f"{'loader':>14} {'load [s]':>9} {'epoch [s]':>10} {'peak RSS [MiB]':>15}")
+    for loader in ["previous", "load_data", "load_sequences"]:
+        with context.Pool(1) as pool:
+            load, epoch, peak, _ = pool.apply(
+                run, (loader, args.local_path, args.seq_len, args.batch)
+            )
+        print(f"{loader:>14} {load:>9.3f} {epoch:>10.3f} {peak:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
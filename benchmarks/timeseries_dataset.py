@@ -0,0 +1,93 @@
+"""Windows per second of `ncps.mini_keras.utils.timeseries_dataset_from_array`
+against gathering every window with its own slice, and the time of an epoch
+of `ncps.mlx.CfC` training steps fed by the dataset with and without the
+background prefetch thread.
+
+Usage::
+
+    python benchmarks/timeseries_dataset.py --samples 1000000 --sequence-length 64
+"""
+import argparse
+import time
+
+import mlx.core as mx
+import numpy as np
+
+from ncps.mini_keras.utils import timeseries_dataset_from_array
+from ncps.mlx import CfC
+
+
+def per_window_batches(data, sequence_length, sampling_rate, batch_size):
+    starts = np.arange(len(data) - (sequence_length - 1) * sampling_rate)
+    span = sequence_length * sampling_rate
+    for i in range(0, len(starts), batch_size):
+        yield np.stack(
+            [data[p : p + span : sampling_rate] for p in starts[i : i + batch_size]]
+        )
+
+
+def windows_per_second(batches):
+    start = time.perf_counter()
+    windows = sum(len(batch) for batch in batches)
+    return windows / (time.perf_counter() - start)
+
+
+def train_epoch(layer, dataset, max_batches):
+    def loss(trainable, x):
+        non_trainable = [v.value for v in layer.non_trainable_variables]
+        y, _ = layer.stateless_call(trainable, non_trainable, x)
+        return mx.mean(y**2)
+
+    start = time.perf_counter()
+    for i, x in enumerate(dataset):
+        if i == max_batches:
+            break
+        trainable = [v.value for v in layer.trainable_variables]
+        mx.eval(mx.value_and_grad(loss)(trainable, mx.array(x)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--sequence-length", type=int, default=64)
+    parser.add_argument("--sampling-rate", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=128)
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--train-batches", type=int, default=50)
+    args = parser.parse_args()
+
+    data = np.random.normal(size=(args.samples, args.features)).astype(np.float32)
+    kwargs = dict(
+        sequence_length=args.sequence_length,
+        sampling_rate=args.sampling_rate,
+        batch_size=args.batch,
+    )
+    reference = windows_per_second(
+        per_window_batches(
+            data, args.sequence_length, args.sampling_rate, args.batch
+        )
+    )
+    strided = windows_per_second(
+        timeseries_dataset_from_array(data, None, prefetch_buffer_size=0, **kwargs)
+    )
+    print(f"{'per-window slices':>20} {reference:>12.0f} windows/s")
+    print(f"{'strided batches':>20} {strided:>12.0f} windows/s")
+
+    layer = CfC(args.units)
+    layer(mx.array(data[None, : args.sequence_length]))
+    for buffer_size in [0, 2]:
+        dataset = timeseries_dataset_from_array(
+            data, None, shuffle=True, prefetch_buffer_size=buffer_size, **kwargs
+        )
+        train_epoch(layer, dataset, 2)  # warm up
+        elapsed = train_epoch(layer, dataset, args.train_batches)
+        print(
+            f"{'prefetch ' + str(buffer_size):>20} "
+            f"{elapsed / args.train_batches * 1e3:>12.2f} ms/training step"
+        )
+
+
+if __name__ == "__main__":
+    main()
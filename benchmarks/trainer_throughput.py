@@ -0,0 +1,99 @@
+"""Training throughput of `ncps.mlx.CfC` through `Model.fit` versus a plain
+`ncps.torch.CfC` training loop on the same synthetic data.
+
+The MLX numbers come from the `samples_per_second` entry that the MLX trainer
+adds to each epoch's logs.
+
+Usage::
+
+    python benchmarks/trainer_throughput.py --steps-per-execution 1 4 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+import ncps
+import ncps.mlx
+
+
+def make_data(samples, length, features):
+    t = np.linspace(0, 4 * np.pi, length, dtype=np.float32)
+    phase = np.random.default_rng(0).uniform(0, np.pi, (samples, 1, 1))
+    x = np.concatenate(
+        [np.sin(t[None, :, None] + phase), np.cos(t[None, :, None] + phase)],
+        axis=-1,
+    )
+    x = np.tile(x, (1, 1, features // 2)).astype(np.float32)
+    y = np.sin(2 * t[None, :, None] + phase).astype(np.float32)
+    return x, y
+
+
+def mlx_throughput(x, y, units, batch_size, epochs, steps_per_execution):
+    ks = ncps.mini_keras
+    model = ks.models.Sequential(
+        [
+            ks.layers.Input(shape=x.shape[1:]),
+            ncps.mlx.CfC(units, return_sequences=True),
+            ks.layers.Dense(1),
+        ]
+    )
+    model.compile(
+        optimizer=ks.optimizers.Adam(learning_rate=0.01),
+        loss="mse",
+        steps_per_execution=steps_per_execution,
+    )
+    history = model.fit(x, y, batch_size=batch_size, epochs=epochs, verbose=0)
+    # The first epoch includes tracing and compilation.
+    return float(np.mean(history.history["samples_per_second"][1:]))
+
+
+def torch_throughput(x, y, units, batch_size, epochs):
+    import torch
+    import ncps.torch
+
+    model = ncps.torch.CfC(x.shape[-1], units, proj_size=1, batch_first=True)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+    x, y = torch.from_numpy(x), torch.from_numpy(y)
+    rates = []
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for i in range(0, len(x), batch_size):
+            optimizer.zero_grad()
+            y_hat, _ = model(x[i : i + batch_size])
+            loss = torch.nn.functional.mse_loss(y_hat, y[i : i + batch_size])
+            loss.backward()
+            optimizer.step()
+        rates.append(len(x) / (time.perf_counter() - start))
+    return float(np.mean(rates[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=256)
+    parser.add_argument("--length", type=int, default=64)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--units", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--epochs", type=int, default=4)
+    parser.add_argument(
+        "--steps-per-execution", type=int, nargs="+", default=[1, 4, 16]
+    )
+    args = parser.parse_args()
+
+    x, y = make_data(args.samples, args.length, args.features)
+    print(f"{'backend':>24} {'samples/s':>12}")
+    for k in args.steps_per_execution:
+        rate = mlx_throughput(
+            x, y, args.units, args.batch_size, args.epochs, k
+        )
+        print(f"{f'mlx (steps_per_exec={k})':>24} {rate:>12.1f}")
+    try:
+        rate = torch_throughput(x, y, args.units, args.batch_size, args.epochs)
+        print(f"{'torch':>24} {rate:>12.1f}")
+    except ImportError:
+        print(f"{'torch':>24} {'not installed':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Training throughput and peak memory of a stateful mixed-memory
+`ncps.mlx.CfC` on long sequences through `Model.fit`, backpropagating through
+the whole sequence versus truncated BPTT windows of a few sizes
+(`fit(..., truncated_bptt_steps=k)`).
+
+Usage::
+
+    python benchmarks/truncated_bptt.py --length 4096 --windows 64 256 1024
+"""
+import argparse
+
+import mlx.core as mx
+import numpy as np
+
+import ncps
+import ncps.mlx
+
+
+def make_data(samples, length, features):
+    t = np.linspace(0, 64 * np.pi, length, dtype=np.float32)
+    phase = np.random.default_rng(0).uniform(0, np.pi, (samples, 1, 1))
+    x = np.concatenate(
+        [np.sin(t[None, :, None] + phase), np.cos(t[None, :, None] + phase)],
+        axis=-1,
+    )
+    x = np.tile(x, (1, 1, features // 2)).astype(np.float32)
+    y = np.sin(2 * t[None, :, None] + phase).astype(np.float32)
+    return x, y
+
+
+def train(x, y, units, batch_size, epochs, window):
+    ks = ncps.mini_keras
+    model = ks.models.Sequential(
+        [
+            ks.layers.Input(batch_shape=(batch_size,) + x.shape[1:]),
+            ncps.mlx.CfC(
+                units,
+                return_sequences=True,
+                mixed_memory=True,
+                stateful=window is not None,
+            ),
+            ks.layers.Dense(1),
+        ]
+    )
+    model.compile(optimizer=ks.optimizers.Adam(learning_rate=0.01), loss="mse")
+    mx.reset_peak_memory()
+    history = model.fit(
+        x,
+        y,
+        batch_size=batch_size,
+        epochs=epochs,
+        verbose=0,
+        shuffle=False,
+        truncated_bptt_steps=window,
+    )
+    # The first epoch includes tracing and compilation.
+    rate = float(np.mean(history.history["samples_per_second"][1:]))
+    return rate, mx.get_peak_memory() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=32)
+    parser.add_argument("--length", type=int, default=4096)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--windows", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+
+    x, y = make_data(args.samples, args.length, args.features)
+    print(f"{'window':>8} {'samples/s':>10} {'peak [MiB]':>11}")
+    for window in [None] + args.windows:
+        rate, peak = train(
+            x, y, args.units, args.batch_size, args.epochs, window
+        )
+        name = "full" if window is None else str(window)
+        print(f"{name:>8} {rate:>10.2f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
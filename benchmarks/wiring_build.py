@@ -0,0 +1,55 @@
+"""Time to construct, build and export (`get_graph`) large wirings.
+
+Usage::
+
+    python benchmarks/wiring_build.py --units 2000 --inputs 64
+"""
+import argparse
+import time
+
+from ncps import wirings
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--outputs", type=int, default=100)
+    parser.add_argument("--inputs", type=int, default=64)
+    parser.add_argument("--sparsity", type=float, default=0.8)
+    parser.add_argument(
+        "--no-graph", action="store_true", help="Skip the networkx export"
+    )
+    args = parser.parse_args()
+
+    factories = {
+        "AutoNCP": lambda: wirings.AutoNCP(
+            args.units, args.outputs, sparsity_level=args.sparsity
+        ),
+        "Random": lambda: wirings.Random(
+            args.units, args.outputs, sparsity_level=args.sparsity
+        ),
+        "FullyConnected": lambda: wirings.FullyConnected(args.units, args.outputs),
+    }
+    print(f"{'wiring':>15} {'synapses':>10} {'build [s]':>10} {'graph [s]':>10}")
+    for name, factory in factories.items():
+        def build():
+            wiring = factory()
+            wiring.build(args.inputs)
+            return wiring
+
+        wiring, build_time = timed(build)
+        graph_time = float("nan")
+        if not args.no_graph:
+            _, graph_time = timed(wiring.get_graph)
+        synapses = wiring.synapse_count + wiring.sensory_synapse_count
+        print(f"{name:>15} {synapses:>10} {build_time:>10.3f} {graph_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Size and time of serializing wirings to JSON configs and restoring them,
+comparing the compact adjacency encoding with the former nested-list one.
+
+Usage::
+
+    python benchmarks/wiring_config.py --units 1000 4000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ncps import wirings
+
+
+def list_config(wiring):
+    config = wirings.Wiring.get_config(wiring)
+    config["adjacency_matrix"] = wiring.adjacency_matrix.tolist()
+    config["sensory_adjacency_matrix"] = wiring.sensory_adjacency_matrix.tolist()
+    return config
+
+
+def measure(wiring, make_config):
+    start = time.perf_counter()
+    text = json.dumps(make_config(wiring))
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = wirings.Wiring.from_config(json.loads(text))
+    lazy_time = time.perf_counter() - start
+    matrix = restored.adjacency_matrix
+    restored.sensory_adjacency_matrix
+    load_time = time.perf_counter() - start
+    assert np.array_equal(matrix, wiring.adjacency_matrix)
+    return len(text), save_time, lazy_time, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--inputs", type=int, default=64)
+    args = parser.parse_args()
+
+    print(
+        f"{'wiring':>16} {'encoding':>9} {'size [KiB]':>11} {'save [ms]':>10} "
+        f"{'from_config [ms]':>17} {'decoded [ms]':>13}"
+    )
+    for units in args.units:
+        cases = {
+            f"AutoNCP({units})": wirings.AutoNCP(units, max(units // 20, 1)),
+            f"FullyConn({units})": wirings.FullyConnected(units),
+        }
+        for name, wiring in cases.items():
+            wiring.build(args.inputs)
+            for encoding, make_config in [
+                ("list", list_config),
+                ("compact", wirings.Wiring.get_config),
+            ]:
+                size, save_time, lazy_time, load_time = measure(wiring, make_config)
+                print(
+                    f"{name:>16} {encoding:>9} {size / 1024:>11.1f} "
+                    f"{1e3 * save_time:>10.1f} {1e3 * lazy_time:>17.2f} "
+                    f"{1e3 * load_time:>13.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
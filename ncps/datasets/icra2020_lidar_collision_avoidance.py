@@ -15,27 +15,19 @@
 import os
 
 import numpy as np
-import hashlib
 import urllib.request
 
+from ncps.datasets.utils import SequenceWindows, md5_checksum
 
-def _augment_data(data):
-    new_data = []
-    for x, y in data:
-        new_data.append((x, y))
-        x2 = x[:, ::-1]  # Mirror lidar signal (reverse on axis 1)
-        y2 = -y  # Invert steering command
-        new_data.append((x2, y2))
-    return new_data
+_URL = "https://github.com/mlech26l/icra_lds/raw/master/icra2020_imitation_data_packed.npz"
+_MD5 = "15ab035e0866fc065acfc0ad781d75c5"
+_NUM_FILES = 29
 
 
-def _unpack(path):
-    all_files = []
-    with np.load(path) as f:
-        for i in range(29):  # there should be exactly 29 files in the npz
-            all_files.append((f["x_{}".format(i)], f["y_{}".format(i)]))
-
-    return all_files
+def _mirror(x, y):
+    x = x[:, :, ::-1]  # Mirror lidar signal (reverse the lidar axis)
+    y = -y  # Invert steering command
+    return x, y
 
 
 def _train_test_split(all_files):
@@ -47,52 +39,111 @@ def _train_test_split(all_files):
     return train_files, test_files
 
 
-def _align_in_sequences(data, seq_len):
-    aligned_x, aligned_y = [], []
-    for x, y in data:
+def _download(local_path):
+    if os.path.isfile(local_path) and md5_checksum(local_path) == _MD5:
+        # No need to download file
+        return
+    print("Downloading file '{}'".format(_URL))
+    with urllib.request.urlopen(_URL) as response, open(local_path, "wb") as out_file:
+        data = response.read()
+        out_file.write(data)
+
+
+def _build_cache(local_path, cache_dir):
+    """Unpacks the npz into uncompressed .npy files that can be memory mapped.
+
+    The recordings are concatenated along the time axis (``x.npy``, ``y.npy``)
+    with an extra axis at the end to make life simpler for working with a 1D
+    ConvNet, ``lengths.npy`` holds the length of every recording. The
+    ``checksum`` file, which marks the cache as complete, is written last.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    with np.load(local_path) as f:
+        names = [("x_{}".format(i), "y_{}".format(i)) for i in range(_NUM_FILES)]
+        lengths = np.array([len(f[y]) for _, y in names])
+        outputs = []
+        for k, name in enumerate(["x", "y"]):
+            first = f[names[0][k]]
+            outputs.append(
+                np.lib.format.open_memmap(
+                    os.path.join(cache_dir, name + ".npy"),
+                    mode="w+",
+                    dtype=first.dtype,
+                    shape=(int(lengths.sum()),) + first.shape[1:] + (1,),
+                )
+            )
+        offset = 0
+        for (x_name, y_name), length in zip(names, lengths):
+            # One recording is decompressed at a time
+            outputs[0][offset : offset + length, ..., 0] = f[x_name]
+            outputs[1][offset : offset + length, ..., 0] = f[y_name]
+            offset += length
+        for output in outputs:
+            output.flush()
+    np.save(os.path.join(cache_dir, "lengths.npy"), lengths)
+    with open(os.path.join(cache_dir, "checksum"), "w") as f:
+        f.write(_MD5)
+
+
+def _is_cached(cache_dir):
+    checksum = os.path.join(cache_dir, "checksum")
+    if not os.path.isfile(checksum):
+        return False
+    with open(checksum) as f:
+        return f.read() == _MD5
+
+
+def _windows(x, y, lengths, files, seq_len):
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    starts, augmented = [], []
+    for i in files:
         # Iterate over file with 75% overlap
-        for i in range(0, x.shape[0] - seq_len, seq_len // 2):
-            # Cut out sequence of exactly ''seq_len'' length
-            aligned_x.append(x[i : i + seq_len])
-            aligned_y.append(y[i : i + seq_len])
-
-    aligned_x = np.stack(aligned_x, axis=0)
-    aligned_y = np.stack(aligned_y, axis=0)
-
-    # Let's add a extra axis at the end to make life simpler for working with a
-    # 1D ConvNet
-    aligned_x = np.expand_dims(aligned_x, axis=-1)
-    aligned_y = np.expand_dims(aligned_y, axis=-1)
-
-    return (aligned_x, aligned_y)
-
-
-def load_data(local_path=None, seq_len=32):
-    url = "https://github.com/mlech26l/icra_lds/raw/master/icra2020_imitation_data_packed.npz"
+        file_starts = offsets[i] + np.arange(0, lengths[i] - seq_len, seq_len // 2)
+        # The windows of a recording are followed by their mirrored copies
+        starts += [file_starts, file_starts]
+        augmented += [np.zeros(len(file_starts), bool), np.ones(len(file_starts), bool)]
+    return SequenceWindows(
+        x,
+        y,
+        np.concatenate(starts),
+        seq_len,
+        augmented=np.concatenate(augmented),
+        augment=_mirror,
+    )
+
+
+def load_sequences(local_path=None, seq_len=32, cache_dir=None):
+    """Loads the dataset as memory mapped windows.
+
+    The npz file is downloaded and unpacked into an uncompressed cache once.
+    Later calls only map the cache into memory, the windows are served as
+    views of the recordings and their mirrored copies are created per batch.
+
+    :param local_path: Path of the npz file (default ``datasets/icra2020_imitation_data_packed.npz``)
+    :param seq_len: Number of time steps of a window
+    :param cache_dir: Directory of the unpacked recordings (default ``local_path`` without the extension)
+    :return: ``(train, test)`` `ncps.datasets.utils.SequenceWindows`, which yield ``(x, y)`` with x of shape (..., seq_len, 541, 1) and y of shape (..., seq_len, 1)
+    """
     if local_path is None:
         os.makedirs("datasets", exist_ok=True)
         local_path = os.path.join("datasets", "icra2020_imitation_data_packed.npz")
-    download_file = True
-    if os.path.isfile(local_path):
-        md5 = hashlib.md5(open(local_path, "rb").read()).hexdigest()
-        if md5 == "15ab035e0866fc065acfc0ad781d75c5":
-            # No need to download file
-            download_file = False
-    if download_file:
-        print("Downloading file '{}'".format(url))
-        with urllib.request.urlopen(url) as response, open(
-            local_path, "wb"
-        ) as out_file:
-            data = response.read()
-            out_file.write(data)
-
-    data = _unpack(local_path)
-    train_data, test_data = _train_test_split(data)
-
-    train_data = _augment_data(train_data)
-    test_data = _augment_data(test_data)
-
-    train_data = _align_in_sequences(train_data, seq_len)
-    test_data = _align_in_sequences(test_data, seq_len)
-
-    return (train_data, test_data)
+    if cache_dir is None:
+        cache_dir = os.path.splitext(local_path)[0]
+    if not _is_cached(cache_dir):
+        _download(local_path)
+        _build_cache(local_path, cache_dir)
+
+    x = np.load(os.path.join(cache_dir, "x.npy"), mmap_mode="r")
+    y = np.load(os.path.join(cache_dir, "y.npy"), mmap_mode="r")
+    lengths = np.load(os.path.join(cache_dir, "lengths.npy"))
+    train_files, test_files = _train_test_split(list(range(_NUM_FILES)))
+    return (
+        _windows(x, y, lengths, train_files, seq_len),
+        _windows(x, y, lengths, test_files, seq_len),
+    )
+
+
+def load_data(local_path=None, seq_len=32):
+    train_data, test_data = load_sequences(local_path, seq_len)
+    # Gathers all windows into arrays
+    return (train_data[:], test_data[:])
@@ -1,9 +1,101 @@
+import hashlib
+import json
+import os
 from urllib.request import urlopen
 from io import BytesIO
 from zipfile import ZipFile
 
+import numpy as np
+
 
 def download_and_unzip(url, extract_to="."):
     http_response = urlopen(url)
     zipfile = ZipFile(BytesIO(http_response.read()))
-    zipfile.extractall(path=extract_to)
\ No newline at end of file
+    zipfile.extractall(path=extract_to)
+
+
+def md5_checksum(path, chunk_size=1 << 20):
+    """MD5 of the file at ``path``, cached in a ``<path>.md5`` sidecar.
+
+    The sidecar records the size and modification time of the file. The file
+    is only hashed again, in chunks of ``chunk_size`` bytes, when they change.
+    """
+    stat = os.stat(path)
+    sidecar = path + ".md5"
+    key = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    try:
+        with open(sidecar) as f:
+            cached = json.load(f)
+        if all(cached.get(k) == v for k, v in key.items()):
+            return cached["md5"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    key["md5"] = md5.hexdigest()
+    try:
+        with open(sidecar, "w") as f:
+            json.dump(key, f)
+    except OSError:
+        # e.g. a read-only dataset directory
+        pass
+    return key["md5"]
+
+
+class SequenceWindows:
+    def __init__(self, x, y, starts, seq_len, augmented=None, augment=None):
+        """Windows of ``seq_len`` steps of the sequences ``x`` and ``y``.
+
+        The windows are strided views of ``x`` and ``y``, which may be memory
+        mapped (e.g. ``np.load(..., mmap_mode="r")``). Indexing with an
+        integer returns the views of one window, indexing with a slice or an
+        array gathers a batch of shape (B, seq_len, ...). Windows flagged in
+        ``augmented`` are passed through ``augment`` when they are served, so
+        augmented copies of the data are never stored.
+
+        :param x: Inputs of shape (time, ...)
+        :param y: Targets of shape (time, ...)
+        :param starts: First time step of every window
+        :param seq_len: Number of time steps of a window
+        :param augmented: Optional boolean array, whether ``augment`` is applied to the window of the same index
+        :param augment: Function mapping a batch ``(x, y)`` to its augmented batch
+        """
+        self.seq_len = seq_len
+        self.starts = np.asarray(starts)
+        self.augmented = None if augmented is None else np.asarray(augmented)
+        self.augment = augment
+        # (time - seq_len + 1, ..., seq_len) -> (time - seq_len + 1, seq_len, ...)
+        self._x_windows = np.moveaxis(
+            np.lib.stride_tricks.sliding_window_view(x, seq_len, axis=0), -1, 1
+        )
+        self._y_windows = np.moveaxis(
+            np.lib.stride_tricks.sliding_window_view(y, seq_len, axis=0), -1, 1
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        starts = self.starts[index]
+        x, y = self._x_windows[starts], self._y_windows[starts]
+        if self.augmented is None:
+            return x, y
+        augmented = self.augmented[index]
+        if np.ndim(augmented) == 0:
+            if augmented:
+                x, y = self.augment(x[None], y[None])
+                x, y = x[0], y[0]
+        elif augmented.any():
+            x[augmented], y[augmented] = self.augment(x[augmented], y[augmented])
+        return x, y
+
+    def batches(self, batch_size, shuffle=False, seed=None):
+        """Yields the windows in batches of ``batch_size``, each gathered by a single indexing operation"""
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for i in range(0, len(order), batch_size):
+            yield self[order[i : i + batch_size]]
@@ -31,6 +31,7 @@ from ncps.mini_keras.backend.mlx import (
     math,
     mlx,
     nn,
+    ode,
     random,
     orthogonal,
     hpc
@@ -38,6 +39,7 @@ from ncps.mini_keras.backend.mlx import (
 
 # RNN operations
 from ncps.mini_keras.backend.mlx.rnn import (
+    compile_cell_call,
     cudnn_ok,
     gru,
     lstm,
@@ -70,10 +72,12 @@ __all__ = [
     "math",
     "mlx",
     "nn",
+    "ode",
     "random",
     "orthogonal",
     "hpc",
     # RNN functions
+    "compile_cell_call",
     "cudnn_ok",
     "gru",
     "lstm", 
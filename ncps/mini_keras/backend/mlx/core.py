@@ -21,10 +21,10 @@ IS_THREAD_SAFE = True
 
 class Variable(KerasVariable):
     def _initialize(self, value):
-        self._value = mx.convert_to_tensor(value)
+        self._value = convert_to_tensor(value)
 
     def _direct_assign(self, value):
-        self._value = mx.convert_to_tensor(value, dtype=self._dtype)
+        self._value = convert_to_tensor(value, dtype=self._dtype)
 
     def _convert_to_tensor(self, value, dtype=None):
         return convert_to_tensor(value, dtype=dtype)
@@ -42,29 +42,42 @@ def convert_to_tensor(x, dtype=None, sparse=None, ragged=None):
         dtype = standardize_dtype(dtype)
     if isinstance(x, Variable):
         if dtype and dtype != x.dtype:
-            return mx.cast(x.value, dtype)
+            return x.value.astype(_to_mlx_dtype(dtype))
         return x.value
-    if not is_tensor(x) and standardize_dtype(dtype) == "bfloat16":
+    if is_tensor(x):
+        if dtype is None:
+            return x
+        return x.astype(_to_mlx_dtype(dtype))
+    if standardize_dtype(dtype) == "bfloat16":
         # Can't create bfloat16 arrays on the fly (e.g. from a h5 Dataset).
         # Instead we convert "as is" (to stored dtype) and cast.
-        return mx.cast(mx.convert_to_tensor(x), dtype)
+        return mx.array(x).astype(mx.bfloat16)
     if dtype is None:
         dtype = result_type(
             *[getattr(item, "dtype", type(item)) for item in tree.flatten(x)]
         )
-    return mx.convert_to_tensor(x, dtype=dtype)
+    return mx.array(x, dtype=_to_mlx_dtype(dtype))
+
+
+def _to_mlx_dtype(dtype):
+    if isinstance(dtype, mx.Dtype):
+        return dtype
+    dtype = standardize_dtype(dtype)
+    if dtype == "bool":
+        return mx.bool_
+    return getattr(mx, dtype)
 
 def convert_to_numpy(x):
     return x.numpy()
 
 def is_tensor(x):
-    return isinstance(x, mx.Tensor)
+    return isinstance(x, mx.array)
 
 def shape(x):
-    return mx.shape(x)
+    return tuple(convert_to_tensor(x).shape)
 
 def cast(x, dtype):
-    return mx.cast(x, dtype=dtype)
+    return convert_to_tensor(x).astype(_to_mlx_dtype(dtype))
 
 def cond(pred, true_fn, false_fn):
     return true_fn() if pred else false_fn()
@@ -157,10 +170,11 @@ def _interleave(a, b, axis):
     b_shape = list(mx.shape(b))
     b_shape[axis] = b.shape[axis] * 2 - 1
 
+    every_other = (builtins.slice(None),) * axis + (builtins.slice(0, None, 2),)
     a_dil = mx.zeros(a_shape, dtype=a.dtype)
-    mx.copyto(slice_along_axis(a_dil, 0, None, 2, axis), a)
+    a_dil[every_other] = a
     b_dil = mx.zeros(b_shape, dtype=b.dtype)
-    mx.copyto(slice_along_axis(b_dil, 0, None, 2, axis), b)
+    b_dil[every_other] = b
 
     a_pad = [[0, 0] for _ in range(a.ndim)]
     a_pad[axis][-1] = 1 if a.shape[axis] == b.shape[axis] else 0
@@ -174,12 +188,144 @@ def _interleave(a, b, axis):
         mx.pad(b_dil, b_pad),
     )
 
-def scan(f, init, xs=None, length=None, reverse=False, unroll=1):
+class ScanReduction:
+    """Summarizes the outputs of `scan` on the fly instead of storing one per step.
+
+    `update(state, y)` folds the output of one step into the running state,
+    which is `None` before the first step. Outputs arrive in processing order.
+    `result(state)` returns the summary with a leading axis in place of the
+    time axis, so memory stays bounded by the size of the summary.
+    """
+
+    def update(self, state, y):
+        raise NotImplementedError
+
+    def result(self, state):
+        raise NotImplementedError
+
+    def output_length(self, time_steps):
+        """Length of the leading axis of the summary of `time_steps` outputs,
+        or `None` when it is not known in advance."""
+        return None
+
+
+class LastOutputs(ScanReduction):
+    """Keeps the last `n` outputs in a preallocated ring buffer of shape (n, ...)."""
+
+    def __init__(self, n):
+        if n < 1:
+            raise ValueError(f"`n` must be a positive integer. Received: n={n}")
+        self.n = n
+
+    def update(self, state, y):
+        if state is None:
+            state = (mx.zeros((self.n,) + tuple(y.shape), dtype=y.dtype), 0)
+        buffer, count = state
+        buffer[count % self.n] = y
+        return buffer, count + 1
+
+    def result(self, state):
+        buffer, count = state
+        if count < self.n:
+            return buffer[:count]
+        # Oldest output first
+        return mx.roll(buffer, -(count % self.n), axis=0)
+
+    def output_length(self, time_steps):
+        if time_steps is None:
+            return self.n
+        return builtins.min(self.n, time_steps)
+
+
+class MeanOutputs(ScanReduction):
+    """Averages the outputs over time, returned with a leading axis of size 1."""
+
+    def update(self, state, y):
+        if state is None:
+            return y, 1
+        total, count = state
+        return total + y, count + 1
+
+    def result(self, state):
+        total, count = state
+        return mx.expand_dims(total / count, axis=0)
+
+    def output_length(self, time_steps):
+        return 1
+
+
+# Number of strided outputs that `ScanOutputs` writes into its buffer at once
+_OUTPUT_BLOCK = 64
+
+
+class ScanOutputs:
+    """Collects the outputs of a scan kept with a stride.
+
+    `append(index, y)` keeps the output of step `index` when
+    `index % stride == stride - 1`, at position `index // stride`. Every
+    write into a preallocated buffer is a scatter whose cotangent spans the
+    whole buffer, so one write per step makes the backward pass quadratic in
+    the number of steps. The outputs are therefore stacked once at the end,
+    and with `stride > 1` written into a `(length // stride, ...)` buffer in
+    blocks of `_OUTPUT_BLOCK` outputs.
+    """
+
+    def __init__(self, length, stride=1):
+        self.length = length // stride
+        self.stride = stride
+        self.buffer = None
+        self.pending = []
+        self.like = None
+
+    def append(self, index, y):
+        self.like = y
+        if index % self.stride != self.stride - 1:
+            return
+        self.pending.append((index // self.stride, y))
+        if self.stride > 1 and len(self.pending) == _OUTPUT_BLOCK:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        y = self.pending[0][1]
+        if self.buffer is None:
+            self.buffer = mx.zeros((self.length,) + tuple(y.shape), dtype=y.dtype)
+        pending = sorted(self.pending, key=lambda p: p[0])
+        first = pending[0][0]
+        self.buffer[first : first + len(pending)] = mx.stack([y for _, y in pending])
+        self.pending = []
+
+    def result(self):
+        if self.buffer is not None:
+            self._flush()
+            return self.buffer
+        if not self.pending:
+            return mx.zeros((0,) + tuple(self.like.shape), dtype=self.like.dtype)
+        return mx.stack([y for _, y in sorted(self.pending, key=lambda p: p[0])])
+
+
+def scan(
+    f,
+    init,
+    xs=None,
+    length=None,
+    reverse=False,
+    unroll=1,
+    stride=1,
+    reduction=None,
+):
     """
     Ref: jax.lax.scan
 
     Scans a function over input sequences using MLX arrays.
     This function has been adapted for the MLX backend.
+
+    The outputs are collected by `ScanOutputs`. With `stride > 1` only the
+    outputs at indices `stride - 1, 2 * stride - 1, ...` are kept, so the
+    last one is included when `length` is a multiple of `stride`. A
+    `ScanReduction` passed as `reduction` replaces them and is applied to
+    every output leaf.
     """
     # Ref: jax.lax.scan
     if not callable(f):
@@ -190,6 +336,10 @@ def scan(f, init, xs=None, length=None, reverse=False, unroll=1):
                 "`unroll` must be an positive integer or boolean. "
                 f"Received: unroll={unroll}"
             )
+    if not isinstance(stride, int) or stride < 1:
+        raise ValueError(
+            f"`stride` must be a positive integer. Received: stride={stride}"
+        )
     if xs is None and length is None:
         raise ValueError("Got no `xs` to scan over and `length` not provided.")
 
@@ -216,18 +366,35 @@ def scan(f, init, xs=None, length=None, reverse=False, unroll=1):
     dummy_y = [mx.zeros_like(init) for init in init_flat]
 
     carry = init
-    ys = []
+    y_structure = None
+    ys_flat = None
     maybe_reversed = reversed if reverse else lambda x: x
     for i in maybe_reversed(range(n)):
         xs_slice = [x[i] for x in xs_flat]
         packed_xs = pack_input(xs_slice) if len(xs_slice) > 0 else None
         carry, y = f(carry, packed_xs)
-        ys.append(y if y is not None else dummy_y)
-    stacked_y = tree.map_structure(
-        lambda *ys: mx.stack(ys), *maybe_reversed(ys)
-    )
-    return carry, stacked_y
-
+        y_structure = y if y is not None else dummy_y
+        y_flat = tree.flatten(y_structure)
+        if reduction is not None:
+            if ys_flat is None:
+                ys_flat = [None] * len(y_flat)
+            ys_flat = [reduction.update(acc, y) for acc, y in zip(ys_flat, y_flat)]
+            continue
+        if ys_flat is None:
+            ys_flat = [ScanOutputs(n, stride) for _ in y_flat]
+        for outputs, y in zip(ys_flat, y_flat):
+            outputs.append(i, y)
+
+    if ys_flat is None:
+        # Nothing was scanned, the outputs are empty
+        return carry, [
+            mx.zeros((0,) + tuple(y.shape), dtype=y.dtype) for y in dummy_y
+        ]
+    if reduction is not None:
+        ys_flat = [reduction.result(acc) for acc in ys_flat]
+    else:
+        ys_flat = [outputs.result() for outputs in ys_flat]
+    return carry, tree.pack_sequence_as(y_structure, ys_flat)
 
 
 def associative_scan(f, elems, reverse=False, axis=0):
@@ -275,10 +442,13 @@ def associative_scan(f, elems, reverse=False, axis=0):
         b_shape = list(b.shape)
         b_shape[axis] = b.shape[axis] * 2 - 1
 
-        a_dil = mx.zeros(a_shape)
-        mx.copyto(slice_along_axis(a_dil, 0, None, 2, axis), a)
-        b_dil = mx.zeros(b_shape)
-        mx.copyto(slice_along_axis(b_dil, 0, None, 2, axis), b)
+        every_other = (builtins.slice(None),) * axis + (
+            builtins.slice(0, None, 2),
+        )
+        a_dil = mx.zeros(a_shape, dtype=a.dtype)
+        a_dil[every_other] = a
+        b_dil = mx.zeros(b_shape, dtype=b.dtype)
+        b_dil[every_other] = b
 
         a_pad = [[0, 0] for _ in range(a.ndim)]
         a_pad[axis][-1] = 1 if a.shape[axis] == b.shape[axis] else 0
@@ -1,84 +1,85 @@
-import jax
+import math
+
+import mlx.core as mx
 import numpy as np
-from jax import lax
 
 from keras.src import backend
 from keras.src.backend.common.backend_utils import (
     compute_conv_transpose_padding_args_for_jax,
 )
-from keras.src.backend.numpy.core import cast
-from keras.src.backend.numpy.core import convert_to_tensor
-from keras.src.backend.numpy.core import is_tensor
-from keras.src.utils.module_utils import scipy
+from ncps.mini_keras.backend.mlx.core import cast
+from ncps.mini_keras.backend.mlx.core import convert_to_tensor
+
+
+def _to_float(x):
+    # Integer and boolean inputs are promoted to float32, floats keep their
+    # precision
+    if mx.issubdtype(x.dtype, mx.floating):
+        return x
+    return x.astype(mx.float32)
 
 
 def relu(x):
     x = convert_to_tensor(x)
-    return np.maximum(x, np.array(0.0, x.dtype))
+    return mx.maximum(x, 0)
 
 
 def relu6(x):
     x = convert_to_tensor(x)
-    # np.clip incorrectly promote bfloat16 to float32, so we replace it with
-    # np.minimum and np.maximum here
-    return np.minimum(
-        np.maximum(x, np.array(0.0, x.dtype)), np.array(6.0, x.dtype)
-    )
+    return mx.minimum(mx.maximum(x, 0), 6)
 
 
 def sigmoid(x):
     x = convert_to_tensor(x)
-    return np.array(1.0, x.dtype) / (np.array(1.0, x.dtype) + np.exp(-x))
+    return mx.sigmoid(x)
 
 
 def tanh(x):
-    return np.tanh(x)
+    x = convert_to_tensor(x)
+    return mx.tanh(x)
 
 
 def tanh_shrink(x):
     x = convert_to_tensor(x)
-    return x - np.tanh(x)
+    return x - mx.tanh(x)
 
 
 def softplus(x):
     x = convert_to_tensor(x)
-    return np.logaddexp(x, np.array(0.0, x.dtype))
+    return mx.logaddexp(x, mx.zeros_like(x))
 
 
 def softsign(x):
     x = convert_to_tensor(x)
-    return x / (np.array(1.0, x.dtype) + np.abs(x))
+    return x / (1 + mx.abs(x))
 
 
 def soft_shrink(x, threshold=0.5):
-    return np.where(
+    x = convert_to_tensor(x)
+    return mx.where(
         x > threshold,
-        np.array(x - threshold, dtype=x.dtype),
-        np.where(
-            x < -threshold,
-            np.array(x + threshold, dtype=x.dtype),
-            np.array(0.0, dtype=x.dtype),
-        ),
+        x - threshold,
+        mx.where(x < -threshold, x + threshold, mx.zeros_like(x)),
     )
 
 
 def sparse_plus(x):
-    return np.where(
+    x = convert_to_tensor(x)
+    return mx.where(
         x <= -1,
-        np.zeros_like(x, dtype=x.dtype),
-        np.where(x < 1, np.array((1 / 4) * (x + 1) ** 2, dtype=x.dtype), x),
+        mx.zeros_like(x),
+        mx.where(x < 1, (1 / 4) * (x + 1) ** 2, x),
     )
 
 
 def silu(x):
     x = convert_to_tensor(x)
-    return x * sigmoid(x)
+    return x * mx.sigmoid(x)
 
 
 def squareplus(x, b=4):
     x = convert_to_tensor(x)
-    b = convert_to_tensor(b, dtype=x.dtype)
-    y = x + np.sqrt(x**2 + b)
+    y = x + mx.sqrt(mx.square(x) + b)
     return y / 2
 
 
@@ -89,29 +90,22 @@ def log_sigmoid(x):
 
 def leaky_relu(x, negative_slope=0.2):
     x = convert_to_tensor(x)
-    return np.maximum(x, np.array(negative_slope, x.dtype) * x)
+    return mx.maximum(x, negative_slope * x)
 
 
 def hard_sigmoid(x):
-    # python numbers will be promoted to float64 by np, so it's necessary to
-    # first convert the python numbers to np scalars
-    x = x / np.array(6.0, x.dtype) + np.array(0.5, x.dtype)
-    return np.where(
-        x <= 0.0,
-        np.array(0.0, x.dtype),
-        np.where(x >= 1.0, np.array(1.0, x.dtype), x),
-    )
+    x = convert_to_tensor(x)
+    return mx.clip(x / 6.0 + 0.5, 0.0, 1.0)
 
 
 def hard_silu(x):
+    x = convert_to_tensor(x)
     return x * hard_sigmoid(x)
 
 
 def elu(x, alpha=1.0):
     x = convert_to_tensor(x)
-    return np.where(
-        x >= np.array(0.0, x.dtype), x, np.array(alpha, x.dtype) * np.expm1(x)
-    )
+    return mx.where(x >= 0, x, alpha * mx.expm1(x))
 
 
 def selu(
@@ -120,37 +114,23 @@ def selu(
     scale=1.0507009873554804934193349852946,
 ):
     x = convert_to_tensor(x)
-    return np.array(scale, x.dtype) * elu(x, alpha)
+    return scale * elu(x, alpha)
 
 
 def gelu(x, approximate=True):
     x = convert_to_tensor(x)
     # followed by JAX's implementation
     if approximate:
-        sqrt_2_over_pi = np.sqrt(2 / np.pi).astype(x.dtype)
-        cdf = np.array(0.5, x.dtype) * (
-            np.array(1.0, x.dtype)
-            + np.tanh(
-                sqrt_2_over_pi
-                * (x + np.array(0.044715, x.dtype) * (x**3).astype(x.dtype))
-            )
-        )
+        sqrt_2_over_pi = math.sqrt(2 / math.pi)
+        cdf = 0.5 * (1.0 + mx.tanh(sqrt_2_over_pi * (x + 0.044715 * x**3)))
         return x * cdf
     else:
-        sqrt_2 = np.sqrt(2).astype(x.dtype)
-        return (
-            x
-            * (scipy.special.erf(x / sqrt_2) + 1).astype(x.dtype)
-            / np.array(2, x.dtype)
-        )
+        return x * (mx.erf(x / math.sqrt(2)) + 1) / 2
 
 
 def celu(x, alpha=1.0):
     x = convert_to_tensor(x)
-    alpha = np.array(alpha, x.dtype)
-    return np.maximum(x, np.array(0.0, dtype=x.dtype)) + alpha * np.expm1(
-        np.minimum(x, np.array(0.0, dtype=x.dtype)) / alpha
-    )
+    return mx.maximum(x, 0) + alpha * mx.expm1(mx.minimum(x, 0) / alpha)
 
 
 def glu(x, axis=-1):
@@ -160,75 +140,108 @@ def glu(x, axis=-1):
             "axis size must be divisible by 2. "
             f"Received: x.shape={x.shape} with axis={axis}"
         )
-    x1, x2 = np.split(x, 2, axis)
-    return x1 * (1 / (1 + np.exp(-x2)))
+    x1, x2 = mx.split(x, 2, axis)
+    return x1 * mx.sigmoid(x2)
 
 
 def hard_tanh(x):
     x = convert_to_tensor(x)
-    min_val = np.asarray(-1.0, x.dtype)
-    max_val = np.asarray(1.0, x.dtype)
-    return np.array(np.clip(x, min_val, max_val), dtype=x.dtype)
+    return mx.clip(x, -1.0, 1.0)
 
 
 def hard_shrink(x, threshold=0.5):
     x = convert_to_tensor(x)
-    threshold = np.asarray(threshold, x.dtype)
-    return np.array(
-        np.where(np.abs(x) > threshold, x, np.array(0.0, dtype=x.dtype)),
-        dtype=x.dtype,
-    )
+    return mx.where(mx.abs(x) > threshold, x, mx.zeros_like(x))
 
 
 def threshold(x, threshold, default_value):
     x = convert_to_tensor(x)
-    return np.where(x > threshold, x, np.array(default_value, dtype=x.dtype))
+    return mx.where(x > threshold, x, mx.array(default_value, dtype=x.dtype))
 
 
 def softmax(x, axis=None):
-    exp_x = np.exp(x - np.max(x, axis=axis, keepdims=True))
-    return exp_x / np.sum(exp_x, axis=axis, keepdims=True)
+    x = convert_to_tensor(x)
+    return mx.softmax(x, axis=axis, precise=True)
 
 
 def log_softmax(x, axis=None):
-    max_x = np.max(x, axis=axis, keepdims=True)
-    logsumexp = np.log(np.exp(x - max_x).sum(axis=axis, keepdims=True))
-    return x - max_x - logsumexp
+    x = convert_to_tensor(x)
+    return x - mx.logsumexp(x, axis=axis, keepdims=True)
 
 
 def sparsemax(logits, axis=-1):
     # Sort logits along the specified axis in descending order
     logits = convert_to_tensor(logits)
-    logits_sorted = -1.0 * np.sort(-1.0 * logits, axis=axis)
-    logits_cumsum = np.cumsum(logits_sorted, axis=axis)
-    r = np.arange(1, logits.shape[axis] + 1)
+    logits_sorted = -mx.sort(-logits, axis=axis)
+    logits_cumsum = mx.cumsum(logits_sorted, axis=axis)
     r_shape = [1] * logits.ndim
     r_shape[axis] = -1  # Broadcast to match the target axis
-    r = r.reshape(r_shape)
+    r = mx.arange(1, logits.shape[axis] + 1, dtype=logits.dtype).reshape(r_shape)
     support = logits_sorted - (logits_cumsum - 1) / r > 0
     # Find the threshold
-    k = np.sum(support, axis=axis, keepdims=True)
-    logits_cumsum_safe = np.where(support, logits_cumsum, 0.0)
-    tau = (np.sum(logits_cumsum_safe, axis=axis, keepdims=True) - 1) / k
-    output = np.maximum(logits - tau, 0.0)
+    k = mx.sum(support, axis=axis, keepdims=True)
+    logits_cumsum_safe = mx.where(support, logits_cumsum, 0.0)
+    tau = (mx.sum(logits_cumsum_safe, axis=axis, keepdims=True) - 1) / k
+    output = mx.maximum(logits - tau, 0.0)
     return output
 
 
-def _convert_to_spatial_operand(
-    x,
-    num_spatial_dims,
-    data_format="channels_last",
-    include_batch_and_channels=True,
-):
+def _convert_to_spatial_operand(x, num_spatial_dims):
     # Helper function that converts an operand to a spatial operand.
-    x = (x,) * num_spatial_dims if isinstance(x, int) else x
-    if not include_batch_and_channels:
-        return x
+    return (x,) * num_spatial_dims if isinstance(x, int) else tuple(x)
+
+
+def _to_channels_last(inputs, data_format):
+    # MLX convolutions expect (N, ..., C)
     if data_format == "channels_last":
-        x = (1,) + x + (1,)
-    else:
-        x = (1,) + (1,) + x
-    return x
+        return inputs
+    return mx.moveaxis(inputs, 1, -1)
+
+
+def _from_channels_last(outputs, data_format):
+    if data_format == "channels_last":
+        return outputs
+    return mx.moveaxis(outputs, -1, 1)
+
+
+def _same_padding(input_spatial_shape, window_shape, strides, dilation_rate=None):
+    """Low and high paddings of XLA's "SAME" padding, which yield
+    `ceil(input / stride)` outputs per spatial dimension."""
+    dilation_rate = dilation_rate or (1,) * len(window_shape)
+    low, high = [], []
+    for size, window, stride, dilation in zip(
+        input_spatial_shape, window_shape, strides, dilation_rate
+    ):
+        window = (window - 1) * dilation + 1
+        output_size = -(-size // stride)
+        total = max((output_size - 1) * stride + window - size, 0)
+        low.append(total // 2)
+        high.append(total - total // 2)
+    return low, high
+
+
+def _sliding_windows(x, window_shape, window_strides):
+    """Strided view of shape (N, *output_spatial, *window_shape, C) over a
+    channels-last input."""
+    spatial_shape = x.shape[1:-1]
+    output_shape = [
+        (size - window) // stride + 1
+        for size, window, stride in zip(spatial_shape, window_shape, window_strides)
+    ]
+    strides = [1]
+    for size in reversed(x.shape[1:]):
+        strides.insert(0, strides[0] * size)
+    spatial_strides = strides[1:-1]
+    return mx.as_strided(
+        x,
+        shape=[x.shape[0], *output_shape, *window_shape, x.shape[-1]],
+        strides=[
+            strides[0],
+            *[s * w for s, w in zip(spatial_strides, window_strides)],
+            *spatial_strides,
+            strides[-1],
+        ],
+    )
 
 
 def _pool(
@@ -242,9 +255,9 @@ def _pool(
     """Helper function to define pooling functions.
 
     Args:
-        inputs: input data of shape `N+2`.
-        initial_value: the initial value for the reduction.
-        reduce_fn: a reduce function of the form `(T, T) -> T`.
+        inputs: channels-last input data of shape `N+2`.
+        initial_value: the value the input is padded with.
+        reduce_fn: a reduction of the form `(array, axes) -> array`.
         pool_size: a sequence of `N` integers, representing the window size to
             reduce over.
         strides: a sequence of `N` integers, representing the inter-window
@@ -258,17 +271,18 @@ def _pool(
         raise ValueError(
             f"Invalid padding '{padding}', must be 'same' or 'valid'."
         )
-    padding = padding.upper()
-    return np.array(
-        lax.reduce_window(
+    num_spatial_dims = inputs.ndim - 2
+    strides = strides or (1,) * num_spatial_dims
+    if padding == "same":
+        low, high = _same_padding(inputs.shape[1:-1], pool_size, strides)
+        inputs = mx.pad(
             inputs,
-            initial_value,
-            reduce_fn,
-            pool_size,
-            strides,
-            padding,
+            [(0, 0), *zip(low, high), (0, 0)],
+            constant_values=initial_value,
         )
-    )
+    windows = _sliding_windows(inputs, pool_size, strides)
+    window_axes = tuple(range(1 + num_spatial_dims, 1 + 2 * num_spatial_dims))
+    return reduce_fn(windows, window_axes)
 
 
 def max_pool(
@@ -279,15 +293,20 @@ def max_pool(
     data_format=None,
 ):
     data_format = backend.standardize_data_format(data_format)
+    inputs = convert_to_tensor(inputs)
     num_spatial_dims = inputs.ndim - 2
-    pool_size = _convert_to_spatial_operand(
-        pool_size, num_spatial_dims, data_format
-    )
+    pool_size = _convert_to_spatial_operand(pool_size, num_spatial_dims)
     strides = pool_size if strides is None else strides
-    strides = _convert_to_spatial_operand(
-        strides, num_spatial_dims, data_format
+    strides = _convert_to_spatial_operand(strides, num_spatial_dims)
+    pooled = _pool(
+        _to_channels_last(inputs, data_format),
+        -float("inf"),
+        mx.max,
+        pool_size,
+        strides,
+        padding,
     )
-    return _pool(inputs, -np.inf, lax.max, pool_size, strides, padding)
+    return _from_channels_last(pooled, data_format)
 
 
 def average_pool(
@@ -298,61 +317,24 @@ def average_pool(
     data_format=None,
 ):
     data_format = backend.standardize_data_format(data_format)
+    inputs = convert_to_tensor(inputs)
     num_spatial_dims = inputs.ndim - 2
-    pool_size = _convert_to_spatial_operand(
-        pool_size, num_spatial_dims, data_format
-    )
+    pool_size = _convert_to_spatial_operand(pool_size, num_spatial_dims)
     strides = pool_size if strides is None else strides
-    strides = _convert_to_spatial_operand(
-        strides, num_spatial_dims, data_format
-    )
+    strides = _convert_to_spatial_operand(strides, num_spatial_dims)
 
-    pooled = _pool(inputs, 0.0, lax.add, pool_size, strides, padding)
+    inputs = _to_channels_last(inputs, data_format)
+    pooled = _pool(inputs, 0.0, mx.sum, pool_size, strides, padding)
     if padding == "valid":
-        # Avoid the extra reduce_window.
-        return pooled / np.prod(pool_size)
+        # Avoid the extra reduction
+        pooled = pooled / math.prod(pool_size)
     else:
-        # Count the number of valid entries at each input point, then use that
-        # for computing average. Assumes that any two arrays of same shape will
-        # be padded the same. Avoid broadcasting on axis where pooling is
-        # skipped.
-        shape = [
-            (a if b != 1 else 1) for (a, b) in zip(inputs.shape, pool_size)
-        ]
-        window_counts = _pool(
-            np.ones(shape, inputs.dtype),
-            0.0,
-            lax.add,
-            pool_size,
-            strides,
-            padding,
-        )
-        return pooled / window_counts
-
-
-def _convert_to_lax_conv_dimension_numbers(
-    num_spatial_dims,
-    data_format="channels_last",
-    transpose=False,
-):
-    """Create a `lax.ConvDimensionNumbers` for the given inputs."""
-    num_dims = num_spatial_dims + 2
-
-    if data_format == "channels_last":
-        spatial_dims = tuple(range(1, num_dims - 1))
-        inputs_dn = (0, num_dims - 1) + spatial_dims
-    else:
-        spatial_dims = tuple(range(2, num_dims))
-        inputs_dn = (0, 1) + spatial_dims
-
-    if transpose:
-        kernel_dn = (num_dims - 2, num_dims - 1) + tuple(range(num_dims - 2))
-    else:
-        kernel_dn = (num_dims - 1, num_dims - 2) + tuple(range(num_dims - 2))
-
-    return lax.ConvDimensionNumbers(
-        lhs_spec=inputs_dn, rhs_spec=kernel_dn, out_spec=inputs_dn
-    )
+        # Count the number of valid entries in each window, which only
+        # depends on the spatial shape
+        ones = mx.ones((1, *inputs.shape[1:-1], 1), inputs.dtype)
+        window_counts = _pool(ones, 0.0, mx.sum, pool_size, strides, padding)
+        pooled = pooled / window_counts
+    return _from_channels_last(pooled, data_format)
 
 
 def conv(
@@ -364,28 +346,13 @@ def conv(
     dilation_rate=1,
 ):
     data_format = backend.standardize_data_format(data_format)
+    inputs = convert_to_tensor(inputs)
+    kernel = convert_to_tensor(kernel)
     num_spatial_dims = inputs.ndim - 2
-    dimension_numbers = _convert_to_lax_conv_dimension_numbers(
-        num_spatial_dims,
-        data_format,
-        transpose=False,
-    )
-    strides = _convert_to_spatial_operand(
-        strides,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
-    dilation_rate = _convert_to_spatial_operand(
-        dilation_rate,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
-    if data_format == "channels_last":
-        channels = inputs.shape[-1]
-    else:
-        channels = inputs.shape[1]
+    strides = _convert_to_spatial_operand(strides, num_spatial_dims)
+    dilation_rate = _convert_to_spatial_operand(dilation_rate, num_spatial_dims)
+    inputs = _to_channels_last(inputs, data_format)
+    channels = inputs.shape[-1]
     kernel_in_channels = kernel.shape[-2]
     if channels % kernel_in_channels > 0:
         raise ValueError(
@@ -394,17 +361,22 @@ def conv(
             f"kernel in_channels {kernel_in_channels}. "
         )
     feature_group_count = channels // kernel_in_channels
-    return np.array(
-        jax.lax.conv_general_dilated(
-            inputs,
-            kernel if is_tensor(kernel) else kernel.numpy(),
-            strides,
-            padding,
-            rhs_dilation=dilation_rate,
-            dimension_numbers=dimension_numbers,
-            feature_group_count=feature_group_count,
+    if padding.lower() == "same":
+        padding = _same_padding(
+            inputs.shape[1:-1], kernel.shape[:-2], strides, dilation_rate
         )
+    else:
+        padding = 0
+    # Keras kernels are (*spatial, in, out), MLX expects (out, *spatial, in)
+    outputs = mx.conv_general(
+        inputs,
+        mx.moveaxis(kernel, -1, 0),
+        stride=strides,
+        padding=padding,
+        kernel_dilation=dilation_rate,
+        groups=feature_group_count,
     )
+    return _from_channels_last(outputs, data_format)
 
 
 def depthwise_conv(
@@ -416,42 +388,16 @@ def depthwise_conv(
     dilation_rate=1,
 ):
     data_format = backend.standardize_data_format(data_format)
-    num_spatial_dims = inputs.ndim - 2
-    dimension_numbers = _convert_to_lax_conv_dimension_numbers(
-        num_spatial_dims,
-        data_format,
-        transpose=False,
-    )
-    strides = _convert_to_spatial_operand(
-        strides,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
-    dilation_rate = _convert_to_spatial_operand(
-        dilation_rate,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
+    inputs = convert_to_tensor(inputs)
+    kernel = convert_to_tensor(kernel)
     feature_group_count = (
         inputs.shape[-1] if data_format == "channels_last" else inputs.shape[1]
     )
-    kernel = np.reshape(
-        kernel if is_tensor(kernel) else kernel.numpy(),
+    kernel = mx.reshape(
+        kernel,
         kernel.shape[:-2] + (1, feature_group_count * kernel.shape[-1]),
     )
-    return np.array(
-        jax.lax.conv_general_dilated(
-            inputs,
-            kernel,
-            strides,
-            padding,
-            rhs_dilation=dilation_rate,
-            dimension_numbers=dimension_numbers,
-            feature_group_count=feature_group_count,
-        )
-    )
+    return conv(inputs, kernel, strides, padding, data_format, dilation_rate)
 
 
 def separable_conv(
@@ -492,6 +438,8 @@ def conv_transpose(
     dilation_rate=1,
 ):
     data_format = backend.standardize_data_format(data_format)
+    inputs = convert_to_tensor(inputs)
+    kernel = convert_to_tensor(kernel)
     num_spatial_dims = inputs.ndim - 2
     padding_values = compute_conv_transpose_padding_args_for_jax(
         input_shape=inputs.shape,
@@ -501,78 +449,55 @@ def conv_transpose(
         output_padding=output_padding,
         dilation_rate=dilation_rate,
     )
-    dimension_numbers = _convert_to_lax_conv_dimension_numbers(
-        num_spatial_dims,
-        data_format,
-        transpose=False,
-    )
-    strides = _convert_to_spatial_operand(
-        strides,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
-    dilation_rate = _convert_to_spatial_operand(
-        dilation_rate,
-        num_spatial_dims,
-        data_format,
-        include_batch_and_channels=False,
-    )
-
-    return np.array(
-        jax.lax.conv_transpose(
-            inputs,
-            kernel if is_tensor(kernel) else kernel.numpy(),
-            strides,
-            padding=padding_values,
-            rhs_dilation=dilation_rate,
-            dimension_numbers=dimension_numbers,
-            transpose_kernel=True,
-        )
+    strides = _convert_to_spatial_operand(strides, num_spatial_dims)
+    dilation_rate = _convert_to_spatial_operand(dilation_rate, num_spatial_dims)
+
+    # A transposed convolution is a convolution of the stride-dilated input
+    # with the flipped kernel. Keras kernels are (*spatial, out, in).
+    outputs = mx.conv_general(
+        _to_channels_last(inputs, data_format),
+        mx.moveaxis(kernel, -2, 0),
+        stride=1,
+        padding=([p[0] for p in padding_values], [p[1] for p in padding_values]),
+        kernel_dilation=dilation_rate,
+        input_dilation=strides,
+        flip=True,
     )
+    return _from_channels_last(outputs, data_format)
 
 
 def one_hot(x, num_classes, axis=-1, dtype="float32", sparse=False):
     if sparse:
-        raise ValueError("Unsupported value `sparse=True` with numpy backend")
+        raise ValueError("Unsupported value `sparse=True` with mlx backend")
     x = convert_to_tensor(x)
-    input_shape = x.shape
-
-    x = x.reshape(-1)
     if not num_classes:
-        num_classes = np.max(x) + 1
-
-    batch_size = x.shape[0]
-    categorical = np.zeros((batch_size, num_classes), dtype=dtype)
-    valid_indices = x >= 0
-    categorical[np.arange(batch_size)[valid_indices], x[valid_indices]] = 1
-
-    # First, reshape the array with the extra dimension at the end
-    output_shape = input_shape + (num_classes,)
-    categorical = np.reshape(categorical, output_shape)
+        num_classes = int(mx.max(x).item()) + 1
+    # Negative indices match no class and become all-zero rows
+    categorical = mx.expand_dims(x, -1) == mx.arange(num_classes, dtype=x.dtype)
+    categorical = cast(categorical, dtype)
 
-    # Then, move this new dimension to the right place (according to axis)
+    # Move the new dimension to the right place (according to axis)
     if axis != -1:
-        categorical = np.moveaxis(categorical, -1, axis)
+        categorical = mx.moveaxis(categorical, -1, axis)
 
     return categorical
 
 
 def multi_hot(x, num_classes, axis=-1, dtype="float32", sparse=False):
     if sparse:
-        raise ValueError("Unsupported value `sparse=True` with numpy backend")
+        raise ValueError("Unsupported value `sparse=True` with mlx backend")
     x = convert_to_tensor(x)
     reduction_axis = 1 if len(x.shape) > 1 else 0
-    outputs = np.max(
-        one_hot(cast(x, "int32"), num_classes, axis=axis, dtype=dtype),
+    outputs = mx.max(
+        one_hot(cast(x, mx.int32), num_classes, axis=axis, dtype=dtype),
         axis=reduction_axis,
     )
     return outputs
 
 
 def categorical_crossentropy(target, output, from_logits=False, axis=-1):
-    target = np.array(target)
-    output = np.array(output)
+    target = convert_to_tensor(target)
+    output = convert_to_tensor(output)
 
     if target.shape != output.shape:
         raise ValueError(
@@ -590,17 +515,17 @@ def categorical_crossentropy(target, output, from_logits=False, axis=-1):
     if from_logits:
         log_prob = log_softmax(output, axis=axis)
     else:
-        output = output / np.sum(output, axis, keepdims=True)
-        output = np.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
-        log_prob = np.log(output)
-    return -np.sum(target * log_prob, axis=axis)
+        output = output / mx.sum(output, axis, keepdims=True)
+        output = mx.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
+        log_prob = mx.log(output)
+    return -mx.sum(target * log_prob, axis=axis)
 
 
 def sparse_categorical_crossentropy(target, output, from_logits=False, axis=-1):
-    target = np.array(target, dtype="int32")
-    output = np.array(output)
+    target = convert_to_tensor(target, dtype="int32")
+    output = convert_to_tensor(output)
     if len(target.shape) == len(output.shape) and target.shape[-1] == 1:
-        target = np.squeeze(target, axis=-1)
+        target = mx.squeeze(target, axis=-1)
 
     if len(output.shape) < 1:
         raise ValueError(
@@ -617,16 +542,20 @@ def sparse_categorical_crossentropy(target, output, from_logits=False, axis=-1):
     if from_logits:
         log_prob = log_softmax(output, axis=axis)
     else:
-        output = output / np.sum(output, axis, keepdims=True)
-        output = np.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
-        log_prob = np.log(output)
-    target = one_hot(target, output.shape[axis], axis=axis)
-    return -np.sum(target * log_prob, axis=axis)
+        output = output / mx.sum(output, axis, keepdims=True)
+        output = mx.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
+        log_prob = mx.log(output)
+    # Pick the log-probability of the target class instead of multiplying
+    # with a one-hot matrix
+    log_prob = mx.moveaxis(log_prob, axis, -1)
+    return -mx.take_along_axis(
+        log_prob, mx.expand_dims(target, -1), axis=-1
+    ).squeeze(-1)
 
 
 def binary_crossentropy(target, output, from_logits=False):
-    target = np.array(target)
-    output = np.array(output)
+    target = convert_to_tensor(target)
+    output = convert_to_tensor(output)
 
     if target.shape != output.shape:
         raise ValueError(
@@ -638,63 +567,61 @@ def binary_crossentropy(target, output, from_logits=False):
     if from_logits:
         output = sigmoid(output)
 
-    output = np.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
-    bce = target * np.log(output)
-    bce += (1.0 - target) * np.log(1.0 - output)
+    output = mx.clip(output, backend.epsilon(), 1.0 - backend.epsilon())
+    bce = target * mx.log(output)
+    bce += (1.0 - target) * mx.log(1.0 - output)
     return -bce
 
 
 def moments(x, axes, keepdims=False, synchronized=False):
     if synchronized:
         raise NotImplementedError(
-            "Argument synchronized=True is not supported with NumPy."
+            "Argument synchronized=True is not supported with MLX."
         )
+    x = convert_to_tensor(x)
     axes = tuple(axes) if isinstance(axes, list) else axes
     # The dynamic range of float16 is too limited for statistics. As a
     # workaround, we simply perform the operations on float32 and convert back
     # to float16
-    need_cast = False
-    ori_dtype = backend.standardize_dtype(x.dtype)
-    if ori_dtype == "float16":
-        need_cast = True
-        x = cast(x, "float32")
+    ori_dtype = x.dtype
+    need_cast = ori_dtype == mx.float16
+    if need_cast:
+        x = cast(x, mx.float32)
 
-    mean = np.mean(x, axes, keepdims=True)
+    mean = mx.mean(x, axes, keepdims=True)
 
     # The variance is computed using $Var = E[|x|^2] - |E[x]|^2$, It is faster
     # but less numerically stable.
-    variance = np.mean(np.square(x), axis=axes, keepdims=True) - np.square(mean)
+    variance = mx.mean(mx.square(x), axis=axes, keepdims=True) - mx.square(mean)
 
     if not keepdims:
-        mean = np.squeeze(mean, axes)
-        variance = np.squeeze(variance, axes)
+        mean = mx.squeeze(mean, axes)
+        variance = mx.squeeze(variance, axes)
     if need_cast:
         # avoid overflow and underflow when casting from float16 to float32
-        mean = np.clip(mean, np.finfo(np.float16).min, np.finfo(np.float16).max)
-        variance = np.clip(
-            variance, np.finfo(np.float16).min, np.finfo(np.float16).max
-        )
-        mean = cast(mean, ori_dtype)
-        variance = cast(variance, ori_dtype)
+        finfo = mx.finfo(mx.float16)
+        mean = cast(mx.clip(mean, finfo.min, finfo.max), ori_dtype)
+        variance = cast(mx.clip(variance, finfo.min, finfo.max), ori_dtype)
     return mean, variance
 
 
 def batch_normalization(
     x, mean, variance, axis, offset=None, scale=None, epsilon=1e-3
 ):
+    x = convert_to_tensor(x)
     shape = [1] * len(x.shape)
     shape[axis] = mean.shape[0]
-    mean = np.reshape(mean, shape)
-    variance = np.reshape(variance, shape)
+    mean = mx.reshape(mean, shape)
+    variance = mx.reshape(variance, shape)
 
-    inv = 1.0 / np.sqrt(variance + epsilon)
+    inv = mx.rsqrt(variance + epsilon)
     if scale is not None:
-        scale = np.reshape(scale, shape)
+        scale = mx.reshape(scale, shape)
         inv = inv * scale
 
     res = -mean * inv
     if offset is not None:
-        offset = np.reshape(offset, shape)
+        offset = mx.reshape(offset, shape)
         res = res + offset
 
     return x * inv + res
@@ -704,24 +631,21 @@ def ctc_loss(target, output, target_length, output_length, mask_index=0):
     # Ref: https://github.com/google-deepmind/optax
     # optax.ctc_loss_with_forward_probs
     target = convert_to_tensor(target, dtype="int32")
-    output = convert_to_tensor(output)
+    # Ensure that the dtype promotion behavior matches that of `tf.nn.ctc_loss`
+    output = _to_float(convert_to_tensor(output))
     target_length = convert_to_tensor(target_length, "int32")
     output_length = convert_to_tensor(output_length, "int32")
     batch_size, max_input_length, num_classes = output.shape
     batch_size, max_label_length = target.shape
     log_epsilon = -1e5
 
-    # Ensure that the dtype promotion behavior matches that of `tf.nn.ctc_loss`
-    dtype = backend.result_type(output.dtype, "float32")
-    output = output.astype(dtype)
-
     def _lengths_to_paddings(lengths, max_length):
-        indices = np.arange(max_length).reshape(
+        indices = mx.arange(max_length).reshape(
             (1,) * lengths.ndim + (max_length,)
         )
-        lengths = np.expand_dims(lengths, axis=-1)
+        lengths = mx.expand_dims(lengths, axis=-1)
         elem_valid = indices < lengths
-        return np.logical_not(elem_valid)
+        return mx.logical_not(elem_valid)
 
     target_paddings = _lengths_to_paddings(target_length, max_label_length)
     output_paddings = _lengths_to_paddings(output_length, max_input_length)
@@ -729,36 +653,42 @@ def ctc_loss(target, output, target_length, output_length, mask_index=0):
     output_paddings = output_paddings.astype(output.dtype)
 
     logprobs = log_softmax(output, axis=-1)
-    label_lengths = max_label_length - np.sum(target_paddings, axis=1).astype(
-        np.int32
+    label_lengths = max_label_length - mx.sum(target_paddings, axis=1).astype(
+        mx.int32
     )
 
     # repeat[b, n] == 1.0 when label[b, n] == label[b, n+1].
-    repeat = (target[:, :-1] == target[:, 1:]).astype(np.float32)
-    repeat = np.pad(repeat, ((0, 0), (0, 1)))
+    repeat = (target[:, :-1] == target[:, 1:]).astype(output.dtype)
+    repeat = mx.pad(repeat, ((0, 0), (0, 1)))
 
     logprobs_phi = logprobs[:, :, mask_index : mask_index + 1]  # [B, T, 1]
-    logprobs_phi = np.transpose(logprobs_phi, (1, 0, 2))  # [T, B, 1]
+    logprobs_phi = mx.transpose(logprobs_phi, (1, 0, 2))  # [T, B, 1]
 
-    _one_hot = one_hot(target, num_classes=num_classes)  # [B, N, K]
-    logprobs_emit = np.einsum("btk,bnk->btn", logprobs, _one_hot)
-    logprobs_emit = np.transpose(logprobs_emit, (1, 0, 2))  # [T, B, N]
+    # [B, T, N], gathered instead of contracted with a one-hot tensor
+    emit_indices = mx.broadcast_to(
+        target[:, None, :], (batch_size, max_input_length, max_label_length)
+    )
+    logprobs_emit = mx.take_along_axis(logprobs, emit_indices, axis=2)
+    logprobs_emit = mx.transpose(logprobs_emit, (1, 0, 2))  # [T, B, N]
 
     # [B, N]
-    logalpha_phi_init = (
-        np.ones((batch_size, max_label_length + 1), dtype=output.dtype)
-        * log_epsilon
+    logalpha_phi_init = mx.concatenate(
+        [
+            mx.zeros((batch_size, 1), dtype=output.dtype),
+            mx.full(
+                (batch_size, max_label_length), log_epsilon, dtype=output.dtype
+            ),
+        ],
+        axis=1,
     )
-    logalpha_phi_init[:, 0] = 0.0
-    logalpha_emit_init = (
-        np.ones((batch_size, max_label_length), dtype=output.dtype)
-        * log_epsilon
+    logalpha_emit_init = mx.full(
+        (batch_size, max_label_length), log_epsilon, dtype=output.dtype
     )
 
     def update_phi_score(phi, added_score):
         # Update `phi[:, 1:]`` with adding `added_score` in log space.
-        return np.concatenate(
-            [phi[:, :1], np.logaddexp(phi[:, 1:], added_score)], axis=-1
+        return mx.concatenate(
+            [phi[:, :1], mx.logaddexp(phi[:, 1:], added_score)], axis=-1
         )
 
     def loop_body(prev, x):
@@ -770,7 +700,7 @@ def ctc_loss(target, output, target_length, output_length, mask_index=0):
         logprob_emit, logprob_phi, pad = x
 
         # phi-to-emit transition
-        next_emit = np.logaddexp(
+        next_emit = mx.logaddexp(
             prev_phi[:, :-1] + logprob_emit, prev_emit + logprob_emit
         )
         # self-loop transition
@@ -784,32 +714,25 @@ def ctc_loss(target, output, target_length, output_length, mask_index=0):
         next_emit = pad * prev_emit + (1.0 - pad) * next_emit
         next_phi = pad * prev_phi_orig + (1.0 - pad) * next_phi
 
-        return (next_phi, next_emit), (next_phi, next_emit)
-
-    def np_scan(f, init, xs):
-        carry = init
-        ys = []
-        for x in zip(*xs):
-            carry, y = f(carry, x)
-            ys.append(y)
-        result = []
-        for i in range(len(ys[0])):
-            result.append(np.stack([y[i] for y in ys]))
-        return carry, result
-
-    xs = (logprobs_emit, logprobs_phi, output_paddings.transpose((1, 0)))
-    _, (logalpha_phi, logalpha_emit) = np_scan(
-        loop_body, (logalpha_phi_init, logalpha_emit_init), xs
-    )
+        return next_phi, next_emit
+
+    # Only the final forward variables are needed, so the lazy graph of the
+    # recursion is evaluated once at the end
+    carry = (logalpha_phi_init, logalpha_emit_init)
+    output_paddings = mx.transpose(output_paddings, (1, 0))
+    for t in range(max_input_length):
+        carry = loop_body(
+            carry, (logprobs_emit[t], logprobs_phi[t], output_paddings[t])
+        )
+    logalpha_phi, logalpha_emit = carry
 
     # last row needs to be updated with the last epsilon transition
-    logalpha_phi_last = update_phi_score(logalpha_phi[-1], logalpha_emit[-1])
-    logalpha_phi[-1] = logalpha_phi_last
+    logalpha_phi_last = update_phi_score(logalpha_phi, logalpha_emit)
 
     # extract per_seq_loss
-    # [B, N+1]
-    _one_hot = one_hot(label_lengths, num_classes=max_label_length + 1)
-    per_seq_loss = -np.einsum("bn,bn->b", logalpha_phi_last, _one_hot)
+    per_seq_loss = -mx.take_along_axis(
+        logalpha_phi_last, label_lengths[:, None], axis=1
+    ).squeeze(1)
     return per_seq_loss
 
 
@@ -826,33 +749,34 @@ def _ctc_greedy_decode(
     if mask_index is None:
         mask_index = num_classes - 1
 
-    indices = np.argmax(inputs, axis=-1).astype("int32")
-    scores = np.max(inputs, axis=-1)
+    indices = mx.argmax(inputs, axis=-1).astype(mx.int32)
+    scores = mx.max(inputs, axis=-1)
 
-    seqlen_mask = np.arange(max_length)[None, :]
+    seqlen_mask = mx.arange(max_length)[None, :]
     seqlen_mask = seqlen_mask >= sequence_lengths[:, None]
 
-    indices = np.where(seqlen_mask, mask_index, indices)
-    scores = np.where(seqlen_mask, 0.0, scores)
+    indices = mx.where(seqlen_mask, mask_index, indices)
+    scores = mx.where(seqlen_mask, 0.0, scores)
 
     if merge_repeated:
         repeat_mask = indices[:, 1:] == indices[:, :-1]
-        repeat_mask = np.pad(repeat_mask, ((0, 0), (1, 0)))
-        indices = np.where(repeat_mask, mask_index, indices)
+        repeat_mask = mx.pad(repeat_mask, ((0, 0), (1, 0)))
+        indices = mx.where(repeat_mask, mask_index, indices)
 
     # We set to -1 for blank labels
     invalid_mask = indices == mask_index
-    indices = np.where(invalid_mask, -1, indices)
+    indices = mx.where(invalid_mask, -1, indices)
 
     # We rearrange the indices by moving `mask_index` to the end of the array
-    order = np.expand_dims(np.arange(max_length), axis=0)  # [1, N]
-    order = np.tile(order, (batch_size, 1))  # [B, N]
-    order = np.where(invalid_mask, max_length, order)
-    order = np.argsort(order, axis=-1)
-    indices = np.take_along_axis(indices, order, axis=-1)
-
-    scores = -np.sum(scores, axis=1)[:, None]
-    indices = np.expand_dims(indices, axis=0)
+    order = mx.broadcast_to(
+        mx.arange(max_length)[None, :], (batch_size, max_length)
+    )
+    order = mx.where(invalid_mask, max_length, order)
+    order = mx.argsort(order, axis=-1)
+    indices = mx.take_along_axis(indices, order, axis=-1)
+
+    scores = -mx.sum(scores, axis=1)[:, None]
+    indices = mx.expand_dims(indices, axis=0)
     return indices, scores
 
 
@@ -863,11 +787,12 @@ def _ctc_beam_search_decode(
     top_paths=1,
     mask_index=None,
 ):
-    inputs = convert_to_tensor(inputs)
-    sequence_lengths = convert_to_tensor(sequence_lengths)
+    # The beam is pruned with data-dependent shapes (np.unique), so the search
+    # itself runs on the host
+    inputs = np.array(log_softmax(convert_to_tensor(inputs), axis=-1))
+    sequence_lengths = np.array(convert_to_tensor(sequence_lengths))
 
     batch_size, max_seq_len, num_classes = inputs.shape
-    inputs = log_softmax(inputs, axis=-1)
     seqlen_mask = np.arange(max_seq_len)[None, :] >= sequence_lengths[:, None]
 
     if mask_index is None:
@@ -929,8 +854,7 @@ def _ctc_beam_search_decode(
         scores_max = np.max(scores)
         scores_exp = np.exp(scores - scores_max)
         scores = np.zeros_like(scores)
-        for i, u in enumerate(unique_inverse):
-            scores[u] += scores_exp[i]
+        np.add.at(scores, unique_inverse, scores_exp)
         scores = np.log(scores) + scores_max
         return scores
 
@@ -964,32 +888,14 @@ def _ctc_beam_search_decode(
 
         return paths, scores, masked
 
-    def _decode_step(paths, scores, masked, x):
-        paths, scores, masked = _extend_paths(paths, scores, masked, x)
-        paths, scores, masked = _prune_paths(paths, scores, masked)
-        return paths, scores, masked
-
-    def _step(prev, x):
-        paths, scores, masked = prev
-        x, seqlen_mask = x
-        if not seqlen_mask:
-            paths, scores, masked = _decode_step(paths, scores, masked, x)
-        return (paths, scores, masked), None
-
     def _decode_batch(
         init_paths, init_scores, init_masked, inputs, seqlen_mask
     ):
-        def np_scan_only_carry(f, init, xs):
-            carry = init
-            for x in zip(*xs):
-                carry, y = f(carry, x)
-            return carry, None
-
-        (paths, scores, masked), _ = np_scan_only_carry(
-            _step,
-            (init_paths, init_scores, init_masked),
-            (inputs[1:], seqlen_mask[1:]),
-        )
+        paths, scores, masked = init_paths, init_scores, init_masked
+        for x, masked_step in zip(inputs[1:], seqlen_mask[1:]):
+            if not masked_step:
+                paths, scores, masked = _extend_paths(paths, scores, masked, x)
+                paths, scores, masked = _prune_paths(paths, scores, masked)
 
         paths, unique_inverse = np.unique(paths, return_inverse=True, axis=0)
         pad_size = (2 * num_classes * beam_width) - len(paths)
@@ -1018,7 +924,7 @@ def _ctc_beam_search_decode(
     # convert classes back to the correct indices
     paths = np.where(paths == _pad, _pad, num_classes - paths - 1)
     paths = np.transpose(paths, [1, 0, 2])
-    return paths, scores
+    return mx.array(paths), mx.array(scores)
 
 
 def ctc_decode(
@@ -1030,9 +936,7 @@ def ctc_decode(
     merge_repeated=True,
     mask_index=0,
 ):
-    inputs = convert_to_tensor(inputs)
-    dtype = backend.result_type(inputs.dtype, "float32")
-    inputs = cast(inputs, dtype)
+    inputs = _to_float(convert_to_tensor(inputs))
 
     if strategy == "greedy":
         return _ctc_greedy_decode(
@@ -1057,6 +961,8 @@ def ctc_decode(
 
 
 def psnr(x1, x2, max_val):
+    x1 = convert_to_tensor(x1)
+    x2 = convert_to_tensor(x2)
     if x1.shape != x2.shape:
         raise ValueError(
             f"Input shapes {x1.shape} and {x2.shape} must "
@@ -1064,64 +970,28 @@ def psnr(x1, x2, max_val):
         )
 
     max_val = convert_to_tensor(max_val, dtype=x2.dtype)
-    mse = np.mean(np.square(x1 - x2))
-    psnr = 20 * np.log10(max_val) - 10 * np.log10(mse)
+    mse = mx.mean(mx.square(x1 - x2))
+    psnr = 20 * mx.log10(max_val) - 10 * mx.log10(mse)
     return psnr
 
 
 def _get_large_negative(dtype):
-    dtype = backend.standardize_dtype(dtype)
-    val = 65500.0 if dtype == "float16" else 3.38953e38
-    return np.asarray(val * -0.7, dtype=dtype)
+    return mx.finfo(dtype).min * 0.7
 
 
-def _apply_masks(logits, mask, is_causal):
+def _combined_mask(mask, is_causal, target_length, source_length):
     if mask is None and not is_causal:
-        return logits
-
-    combined_mask = np.ones_like(logits, dtype=np.bool_)
+        return None
+    combined_mask = None
     if mask is not None:
-        combined_mask = np.logical_and(combined_mask, mask)
-
+        combined_mask = convert_to_tensor(mask).astype(mx.bool_)
     if is_causal:
-        T, S = logits.shape[2], logits.shape[3]
-        mask = np.tril(np.ones((T, S), dtype=np.bool_))
-        mask = mask[None, None, :, :]
-        combined_mask = np.logical_and(combined_mask, mask)
-
-    padded_logits = np.where(
-        combined_mask, logits, _get_large_negative(logits.dtype)
-    )
-    return padded_logits
-
-
-def _dot_product_attention_xla(query, key, value, bias, mask, is_causal, scale):
-    original_dtype = key.dtype
-    logits_dtype = np.promote_types(query.dtype, np.float32)
-    if backend.standardize_dtype(key.dtype) == "bfloat16":
-        # `np.einsum` doesn't support bfloat16
-        key = key.astype("float32")
-        value = value.astype("float32")
-    logits = np.einsum("BTNH,BSNH->BNTS", query, key)
-    logits = logits.astype(logits_dtype)
-    logits *= np.array(scale, dtype=logits.dtype)
-
-    if bias is not None:
-        logits = (logits + bias).astype(logits.dtype)
-
-    padded_logits = _apply_masks(logits, mask, is_causal)
-
-    # Softmax and it is always carried out in fp32.
-    padded_logits = padded_logits.astype(np.float32)
-    probs = softmax(padded_logits, axis=-1).astype(original_dtype)
-    encoded_dtype = probs.dtype
-    if backend.standardize_dtype(probs.dtype) == "bfloat16":
-        # `np.einsum` doesn't support bfloat16
-        probs = probs.astype("float32")
-        value = value.astype("float32")
-    encoded = np.einsum("BNTS,BSNH->BTNH", probs, value)
-    encoded = encoded.astype(encoded_dtype)
-    return encoded
+        causal = mx.tril(mx.ones((target_length, source_length), dtype=mx.bool_))
+        if combined_mask is None:
+            combined_mask = causal
+        else:
+            combined_mask = mx.logical_and(combined_mask, causal)
+    return combined_mask
 
 
 def dot_product_attention(
@@ -1137,7 +1007,7 @@ def dot_product_attention(
     if flash_attention is None:
         flash_attention = False
     if flash_attention:
-        raise ValueError("Flash attention is not supported in numpy backend.")
+        raise ValueError("Flash attention is not supported in mlx backend.")
 
     # Ref: jax.nn.dot_product_attention
     # https://github.com/jax-ml/jax/blob/jax-v0.4.32/jax/_src/nn/functions.py#L828
@@ -1151,8 +1021,21 @@ def dot_product_attention(
             f"Received: query.shape={query.shape}, key.shape={key.shape}, "
             f"value.shape={value.shape}."
         )
-    _, _, _, H = key.shape
-    scale = (1.0 / np.sqrt(H)) if scale is None else scale
-    return _dot_product_attention_xla(
-        query, key, value, bias, mask, is_causal, scale
+    _, T, _, H = query.shape
+    S = key.shape[1]
+    scale = (1.0 / math.sqrt(H)) if scale is None else scale
+
+    # The fused kernel takes (B, N, T, H) and accumulates the softmax in fp32
+    query, key, value = (mx.swapaxes(a, 1, 2) for a in (query, key, value))
+    combined_mask = _combined_mask(mask, is_causal, T, S)
+    if bias is not None:
+        additive = convert_to_tensor(bias).astype(query.dtype)
+        if combined_mask is not None:
+            additive = mx.where(
+                combined_mask, additive, _get_large_negative(query.dtype)
+            )
+        combined_mask = additive
+    encoded = mx.fast.scaled_dot_product_attention(
+        query, key, value, scale=scale, mask=combined_mask
     )
+    return mx.swapaxes(encoded, 1, 2)
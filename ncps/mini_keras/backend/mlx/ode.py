@@ -1,5 +1,52 @@
 import mlx.core as mx
 
+# Embedded Runge-Kutta pairs: nodes `c`, stage matrix `a`, weights `b` of the
+# propagated solution, weights `e` of the difference to the embedded
+# solution (the local error estimate) and the order of the error estimate,
+# which sets the exponent of the step size control. `fsal` marks pairs whose
+# last stage is the derivative at the end of the step.
+TABLEAUS = {
+    "rkf45": {
+        "c": [0.0, 1 / 4, 3 / 8, 12 / 13, 1.0, 1 / 2],
+        "a": [
+            [],
+            [1 / 4],
+            [3 / 32, 9 / 32],
+            [1932 / 2197, -7200 / 2197, 7296 / 2197],
+            [439 / 216, -8.0, 3680 / 513, -845 / 4104],
+            [-8 / 27, 2.0, -3544 / 2565, 1859 / 4104, -11 / 40],
+        ],
+        "b": [16 / 135, 0.0, 6656 / 12825, 28561 / 56430, -9 / 50, 2 / 55],
+        "e": [1 / 360, 0.0, -128 / 4275, -2197 / 75240, 1 / 50, 2 / 55],
+        "order": 5,
+        "fsal": False,
+    },
+    "dopri5": {
+        "c": [0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0],
+        "a": [
+            [],
+            [1 / 5],
+            [3 / 40, 9 / 40],
+            [44 / 45, -56 / 15, 32 / 9],
+            [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+            [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+            [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+        ],
+        "b": [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0],
+        "e": [
+            71 / 57600,
+            0.0,
+            -71 / 16695,
+            71 / 1920,
+            -17253 / 339200,
+            22 / 525,
+            -1 / 40,
+        ],
+        "order": 5,
+        "fsal": True,
+    },
+}
+
 def rk4_solve(f, y0, t0, dt):
     """RK4 solver using MLX ops exclusively."""
     k1 = f(t0, y0)
@@ -32,126 +79,7 @@ def rk4_solve(f, y0, t0, dt):
 
 def rk45_solve(f, y0, t0, dt):
     """RK45 solver using MLX ops exclusively."""
-    # Butcher tableau coefficients as MLX constants
-    a2 = mx.array(1.0/4.0)
-    a3 = mx.array(3.0/8.0)
-    a4 = mx.array(12.0/13.0)
-    a5 = mx.array(1.0)
-    a6 = mx.array(1.0/2.0)
-    
-    b21 = mx.array(1.0/4.0)
-    b31 = mx.array(3.0/32.0)
-    b32 = mx.array(9.0/32.0)
-    b41 = mx.array(1932.0/2197.0)
-    b42 = mx.array(-7200.0/2197.0)
-    b43 = mx.array(7296.0/2197.0)
-    b51 = mx.array(439.0/216.0)
-    b52 = mx.array(-8.0)
-    b53 = mx.array(3680.0/513.0)
-    b54 = mx.array(-845.0/4104.0)
-    b61 = mx.array(-8.0/27.0)
-    b62 = mx.array(2.0)
-    b63 = mx.array(-3544.0/2565.0)
-    b64 = mx.array(1859.0/4104.0)
-    b65 = mx.array(-11.0/40.0)
-    
-    k1 = f(t0, y0)
-    
-    t2 = mx.add(t0, mx.multiply(dt, a2))
-    y2 = mx.add(y0, mx.multiply(dt, mx.multiply(k1, b21)))
-    k2 = f(t2, y2)
-    
-    t3 = mx.add(t0, mx.multiply(dt, a3))
-    y3 = mx.add(
-        y0,
-        mx.multiply(dt, 
-            mx.add(
-                mx.multiply(k1, b31),
-                mx.multiply(k2, b32)
-            )
-        )
-    )
-    k3 = f(t3, y3)
-    
-    t4 = mx.add(t0, mx.multiply(dt, a4))
-    y4 = mx.add(
-        y0,
-        mx.multiply(dt,
-            mx.add(
-                mx.add(
-                    mx.multiply(k1, b41),
-                    mx.multiply(k2, b42)
-                ),
-                mx.multiply(k3, b43)
-            )
-        )
-    )
-    k4 = f(t4, y4)
-    
-    t5 = mx.add(t0, mx.multiply(dt, a5))
-    y5 = mx.add(
-        y0,
-        mx.multiply(dt,
-            mx.add(
-                mx.add(
-                    mx.add(
-                        mx.multiply(k1, b51),
-                        mx.multiply(k2, b52)
-                    ),
-                    mx.multiply(k3, b53)
-                ),
-                mx.multiply(k4, b54)
-            )
-        )
-    )
-    k5 = f(t5, y5)
-    
-    t6 = mx.add(t0, mx.multiply(dt, a6))
-    y6 = mx.add(
-        y0,
-        mx.multiply(dt,
-            mx.add(
-                mx.add(
-                    mx.add(
-                        mx.add(
-                            mx.multiply(k1, b61),
-                            mx.multiply(k2, b62)
-                        ),
-                        mx.multiply(k3, b63)
-                    ),
-                    mx.multiply(k4, b64)
-                ),
-                mx.multiply(k5, b65)
-            )
-        )
-    )
-    k6 = f(t6, y6)
-    
-    # 5th order solution coefficients
-    c1 = mx.array(16.0/135.0)
-    c3 = mx.array(6656.0/12825.0)
-    c4 = mx.array(28561.0/56430.0)
-    c5 = mx.array(-9.0/50.0)
-    c6 = mx.array(2.0/55.0)
-    
-    return mx.add(
-        y0,
-        mx.multiply(dt,
-            mx.add(
-                mx.add(
-                    mx.add(
-                        mx.add(
-                            mx.multiply(k1, c1),
-                            mx.multiply(k3, c3)
-                        ),
-                        mx.multiply(k4, c4)
-                    ),
-                    mx.multiply(k5, c5)
-                ),
-                mx.multiply(k6, c6)
-            )
-        )
-    )
+    return embedded_rk_step(f, y0, t0, dt, "rkf45")[0]
 
 def euler_solve(f, y0, t0, dt):
     """Euler solver using MLX ops exclusively."""
@@ -191,3 +119,122 @@ def semi_implicit_solve(f, y0, t0, dt):
     f_eval = f(t0, y0)
     diff = mx.subtract(f_eval, y0)
     return mx.add(y0, mx.multiply(dt, diff))
+
+
+def embedded_rk_step(f, y0, t0, dt, method="dopri5", k1=None):
+    """One step of an embedded Runge-Kutta pair from `TABLEAUS`.
+
+    `dt` may be a scalar or broadcast against `y0`, e.g. one step size per
+    batch element. `k1 = f(t0, y0)` is evaluated unless it is given.
+
+    Returns the solution, its local error estimate and the derivative of the
+    last stage, which for FSAL pairs (`dopri5`) is `f(t0 + dt, y1)`.
+    """
+    tableau = TABLEAUS[method]
+    k = [f(t0, y0) if k1 is None else k1]
+    for c, a in zip(tableau["c"][1:], tableau["a"][1:]):
+        increment = sum(a_j * k_j for a_j, k_j in zip(a, k) if a_j != 0.0)
+        k.append(f(t0 + c * dt, y0 + dt * increment))
+    y1 = y0 + dt * sum(b * k_j for b, k_j in zip(tableau["b"], k) if b != 0.0)
+    error = dt * sum(e * k_j for e, k_j in zip(tableau["e"], k) if e != 0.0)
+    return y1, error, k[-1]
+
+
+def adaptive_solve(
+    f,
+    y0,
+    t0,
+    t1,
+    method="dopri5",
+    rtol=1e-3,
+    atol=1e-6,
+    first_step=None,
+    max_steps=64,
+    safety=0.9,
+    min_factor=0.2,
+    max_factor=10.0,
+):
+    """Integrates `dy/dt = f(t, y)` from `t0` to `t1` with an adaptive
+    embedded Runge-Kutta pair (`"dopri5"` or `"rkf45"`).
+
+    Every batch element (leading axis of `y0`) has its own time, step size
+    and error control; `t0` and `t1` may be scalars or one value per batch
+    element, e.g. irregular sampling intervals. The batch is stepped
+    together and elements that have reached `t1` or rejected their step are
+    masked out of the update, so the loop ends once the stiffest element is
+    done. A step is accepted when the RMS norm of its error estimate scaled
+    by `atol + rtol * |y|` is at most 1. Elements still short of `t1` after
+    `max_steps` attempted steps finish with one uncontrolled step.
+
+    The loop checks on the host whether any element is still active, so the
+    solver cannot be traced by `mx.compile`. Gradients flow through the
+    accepted steps; the step size control is treated as constant.
+
+    Returns `y(t1)` and the number of evaluations of `f` spent on each batch
+    element.
+    """
+    tableau = TABLEAUS[method]
+    batch_size = y0.shape[0]
+
+    def per_element(v):
+        # (B,) -> broadcastable against y0
+        return mx.reshape(v, (batch_size,) + (1,) * (y0.ndim - 1))
+
+    def rms(v):
+        axes = tuple(range(1, v.ndim))
+        return mx.sqrt(mx.mean(mx.square(v), axis=axes)) if axes else mx.abs(v)
+
+    t = mx.broadcast_to(mx.array(t0, dtype=y0.dtype), (batch_size,))
+    t1 = mx.broadcast_to(mx.array(t1, dtype=y0.dtype), (batch_size,))
+    y = y0
+    k1 = f(per_element(t), y)
+    nfe = mx.ones((batch_size,), dtype=mx.int32)
+
+    if first_step is None:
+        # Step whose Euler increment is about 1% of the state (Hairer et al.)
+        scale = mx.stop_gradient(atol + rtol * mx.abs(y))
+        d0 = rms(mx.stop_gradient(y) / scale)
+        d1 = rms(mx.stop_gradient(k1) / scale)
+        h = mx.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / d1)
+    else:
+        h = mx.full((batch_size,), first_step, dtype=y0.dtype)
+    h = mx.minimum(h, t1 - t)
+    stages = len(tableau["c"]) - (1 if tableau["fsal"] else 0)
+    exponent = -1.0 / tableau["order"]
+
+    active = t < t1
+    for _ in range(max_steps):
+        if not mx.any(active).item():
+            break
+        remaining = t1 - t
+        dt = mx.where(active, mx.minimum(h, remaining), 0.0)
+        y_new, error, k_last = embedded_rk_step(
+            f, y, per_element(t), per_element(dt), method, k1=k1
+        )
+        scale = atol + rtol * mx.maximum(mx.abs(y), mx.abs(y_new))
+        error_norm = mx.stop_gradient(rms(error / scale))
+        accept = active & (error_norm <= 1.0)
+
+        y = mx.where(per_element(accept), y_new, y)
+        # Land exactly on t1 instead of accumulating rounding errors
+        t = mx.where(accept, mx.where(dt >= remaining, t1, t + dt), t)
+        if tableau["fsal"]:
+            k1 = mx.where(per_element(accept), k_last, k1)
+        else:
+            k1 = mx.where(per_element(accept), f(per_element(t), y), k1)
+        nfe = nfe + mx.where(active, stages, 0)
+
+        factor = safety * mx.power(mx.maximum(error_norm, 1e-10), exponent)
+        factor = mx.clip(factor, min_factor, max_factor)
+        factor = mx.where(accept, factor, mx.minimum(factor, 1.0))
+        h = mx.stop_gradient(mx.where(active, dt * factor, h))
+        active = t < t1
+
+    if mx.any(active).item():
+        dt = mx.where(active, t1 - t, 0.0)
+        y_new = embedded_rk_step(
+            f, y, per_element(t), per_element(dt), method, k1=k1
+        )[0]
+        y = mx.where(per_element(active), y_new, y)
+        nfe = nfe + mx.where(active, stages, 0)
+    return y, nfe
@@ -0,0 +1 @@
+from ncps.mini_keras.backend.mlx.optimizers.mlx_optimizer import MLXOptimizer
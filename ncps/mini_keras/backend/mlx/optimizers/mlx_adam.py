@@ -0,0 +1,62 @@
+import mlx.core as mx
+
+from ncps.mini_keras import ops
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.backend.mlx.optimizers import mlx_parallel_optimizer
+
+
+def _adam_update(grad, value, slots, hyperparameters, amsgrad):
+    beta_1 = hyperparameters["beta_1"]
+    beta_2 = hyperparameters["beta_2"]
+    m = slots[0] + (grad - slots[0]) * (1 - beta_1)
+    v = slots[1] + (mx.square(grad) - slots[1]) * (1 - beta_2)
+    new_slots = [m, v]
+    if amsgrad:
+        v = mx.maximum(slots[2], v)
+        new_slots.append(v)
+    value = value - (m * hyperparameters["alpha"]) / (
+        mx.sqrt(v) + hyperparameters["epsilon"]
+    )
+    return value, new_slots
+
+
+class Adam(mlx_parallel_optimizer.MLXParallelOptimizer, optimizers.Adam):
+    def _parallel_update_step(
+        self,
+        grads,
+        variables,
+        learning_rate,
+    ):
+        local_step = ops.cast(self.iterations + 1, "float32")
+        beta_1_power = ops.power(ops.cast(self.beta_1, "float32"), local_step)
+        beta_2_power = ops.power(ops.cast(self.beta_2, "float32"), local_step)
+        alpha = (
+            ops.cast(learning_rate, "float32")
+            * ops.sqrt(1 - beta_2_power)
+            / (1 - beta_1_power)
+        )
+
+        slots = [
+            [self._momentums[self._get_variable_index(v)] for v in variables],
+            [self._velocities[self._get_variable_index(v)] for v in variables],
+        ]
+        if self.amsgrad:
+            slots.append(
+                [
+                    self._velocity_hats[self._get_variable_index(v)]
+                    for v in variables
+                ]
+            )
+        self._fused_update(
+            _adam_update,
+            grads,
+            variables,
+            slots,
+            {
+                "alpha": alpha,
+                "beta_1": self.beta_1,
+                "beta_2": self.beta_2,
+                "epsilon": self.epsilon,
+            },
+            amsgrad=self.amsgrad,
+        )
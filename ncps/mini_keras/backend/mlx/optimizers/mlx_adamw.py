@@ -0,0 +1,6 @@
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.backend.mlx.optimizers import mlx_adam
+
+
+class AdamW(mlx_adam.Adam, optimizers.AdamW):
+    pass
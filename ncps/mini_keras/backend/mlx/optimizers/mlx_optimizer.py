@@ -0,0 +1,42 @@
+import mlx.core as mx
+
+from ncps.mini_keras import ops
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.optimizers.base_optimizer import BaseOptimizer
+
+
+@mx.compile
+def _decay(values, scale):
+    return [value * scale.astype(value.dtype) for value in values]
+
+
+class MLXOptimizer(BaseOptimizer):
+    def __new__(cls, *args, **kwargs):
+        # Import locally to avoid circular imports.
+        from ncps.mini_keras.backend.mlx.optimizers import mlx_adam
+        from ncps.mini_keras.backend.mlx.optimizers import mlx_adamw
+        from ncps.mini_keras.backend.mlx.optimizers import mlx_rmsprop
+        from ncps.mini_keras.backend.mlx.optimizers import mlx_sgd
+
+        OPTIMIZERS = {
+            optimizers.Adam: mlx_adam.Adam,
+            optimizers.AdamW: mlx_adamw.AdamW,
+            optimizers.RMSprop: mlx_rmsprop.RMSprop,
+            optimizers.SGD: mlx_sgd.SGD,
+        }
+
+        if cls in OPTIMIZERS:
+            return OPTIMIZERS[cls](*args, **kwargs)
+        return super().__new__(cls)
+
+    def _apply_weight_decay(self, variables):
+        if self.weight_decay is None:
+            return
+
+        variables = [v for v in variables if self._use_weight_decay(v)]
+        scale = 1 - ops.convert_to_tensor(
+            self.weight_decay
+        ) * ops.convert_to_tensor(self.learning_rate)
+        values = _decay([v.value for v in variables], scale)
+        for variable, value in zip(variables, values):
+            variable.assign(value)
@@ -0,0 +1,149 @@
+import math
+
+import mlx.core as mx
+import numpy as np
+
+from ncps.mini_keras import ops
+from ncps.mini_keras.optimizers.base_optimizer import BaseOptimizer
+
+
+def _flatten(arrays):
+    return mx.concatenate([mx.reshape(x, (-1,)) for x in arrays])
+
+
+def _unflatten(flat, shapes):
+    offsets = np.cumsum([math.prod(shape) for shape in shapes])[:-1]
+    return [
+        mx.reshape(x, shape)
+        for x, shape in zip(mx.split(flat, offsets.tolist()), shapes)
+    ]
+
+
+def _compiled_update(update, constraints, **options):
+    """`update` applied to the concatenation of a group of variables.
+
+    `update(grad, value, slots, hyperparameters, **options)` returns the new
+    value and slot values of flat buffers. The variables, their gradients
+    and their slots are flattened and the results split up again inside one
+    `mx.compile` trace, so the whole group is updated by one fused kernel.
+    The new values are projected by `constraints`, one per variable (or
+    `None`), inside the same trace.
+    """
+
+    def flat_update(grads, values, slot_values, decay, hyperparameters):
+        shapes = [value.shape for value in values]
+        value = _flatten(values)
+        grad = _flatten(grads).astype(value.dtype)
+        hyperparameters = {
+            name: h.astype(value.dtype) for name, h in hyperparameters.items()
+        }
+        if decay:
+            # Decoupled weight decay of the variables selected by the mask
+            mask, weight_decay, learning_rate = decay
+            weight_decay = weight_decay.astype(value.dtype)
+            learning_rate = learning_rate.astype(value.dtype)
+            mask = mask.astype(value.dtype)
+            value = value - value * weight_decay * learning_rate * mask
+        value, slots = update(
+            grad,
+            value,
+            [_flatten(slot) for slot in slot_values],
+            hyperparameters,
+            **options,
+        )
+        values = [
+            value if constraint is None else constraint(value)
+            for value, constraint in zip(_unflatten(value, shapes), constraints)
+        ]
+        return values, [_unflatten(slot, shapes) for slot in slots]
+
+    return mx.compile(flat_update)
+
+
+class MLXParallelOptimizer(BaseOptimizer):
+    """Updates all variables of a dtype with one compiled kernel.
+
+    Subclasses implement `_parallel_update_step` with `_fused_update`, which
+    concatenates the variables, gradients and optimizer slots into flat
+    buffers instead of running `update_step` once per variable. Weight decay
+    and the constraints of the variables are folded into the same kernel, so
+    the constraints must be traceable by `mx.compile` (e.g. `NonNeg`).
+    """
+
+    def _backend_update_step(self, grads, trainable_variables, learning_rate):
+        self._parallel_update_step(
+            grads,
+            trainable_variables,
+            learning_rate,
+        )
+
+    def _apply_weight_decay(self, variables):
+        # Applied by `_fused_update`
+        return
+
+    def _apply_constraints(self, variables):
+        # Applied by `_fused_update`
+        return
+
+    def _fused_update(
+        self, update, grads, variables, slots, hyperparameters, **options
+    ):
+        """Runs `update` on the flattened variables of each dtype.
+
+        Args:
+            update: Function `update(grad, value, slots, hyperparameters,
+                **options)` of flat buffers returning the new value and the
+                new slot values.
+            grads: Gradients of `variables`.
+            variables: Variables to update.
+            slots: One list of optimizer variables per slot, aligned with
+                `variables`.
+            hyperparameters: Dict of scalar hyperparameters. They are
+                passed as arrays, so changing them does not retrace.
+            options: Python values the trace depends on.
+        """
+        hyperparameters = {
+            name: ops.convert_to_tensor(h, dtype="float32")
+            for name, h in hyperparameters.items()
+        }
+        decay = []
+        if self.weight_decay is not None:
+            decay = [
+                ops.convert_to_tensor(self.weight_decay, dtype="float32"),
+                ops.convert_to_tensor(self.learning_rate, dtype="float32"),
+            ]
+        # Traces by update rule, options and constraints of the group
+        if not hasattr(self, "_fused_updates"):
+            self._fused_updates = dict()
+
+        groups = {}
+        for index, variable in enumerate(variables):
+            groups.setdefault(variable.dtype, []).append(index)
+        for indices in groups.values():
+            group = [variables[i] for i in indices]
+            constraints = tuple(v.constraint for v in group)
+            key = (update, constraints) + tuple(sorted(options.items()))
+            if key not in self._fused_updates:
+                self._fused_updates[key] = _compiled_update(
+                    update, constraints, **options
+                )
+            compiled = self._fused_updates[key]
+            group_decay = []
+            if decay:
+                mask = np.repeat(
+                    [float(self._use_weight_decay(v)) for v in group],
+                    [math.prod(v.shape) for v in group],
+                )
+                group_decay = [mx.array(mask, dtype=mx.float32)] + decay
+            values, slot_values = compiled(
+                [grads[i] for i in indices],
+                [v.value for v in group],
+                [[slot[i].value for i in indices] for slot in slots],
+                group_decay,
+                hyperparameters,
+            )
+            for variable, value in zip(group, values):
+                variable.assign(value)
+            for slot, new_values in zip(slots, slot_values):
+                for i, value in zip(indices, new_values):
+                    slot[i].assign(value)
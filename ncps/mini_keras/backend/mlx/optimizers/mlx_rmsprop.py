@@ -0,0 +1,68 @@
+import mlx.core as mx
+
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.backend.mlx.optimizers import mlx_parallel_optimizer
+
+
+def _rmsprop_update(grad, value, slots, hyperparameters, centered, momentum):
+    rho = hyperparameters["rho"]
+    velocity, *slots = slots
+    velocity = rho * velocity + (1 - rho) * mx.square(grad)
+    new_slots = [velocity]
+    if centered:
+        average_grad, *slots = slots
+        average_grad = rho * average_grad + (1 - rho) * grad
+        new_slots.append(average_grad)
+        denominator = velocity - mx.square(average_grad)
+        denominator = denominator + hyperparameters["epsilon"]
+    else:
+        denominator = velocity + hyperparameters["epsilon"]
+    increment = (hyperparameters["learning_rate"] * grad) / mx.sqrt(
+        denominator
+    )
+    if momentum:
+        increment = hyperparameters["momentum"] * slots[0] + increment
+        new_slots.append(increment)
+    return value - increment, new_slots
+
+
+class RMSprop(
+    mlx_parallel_optimizer.MLXParallelOptimizer, optimizers.RMSprop
+):
+    def _parallel_update_step(
+        self,
+        grads,
+        variables,
+        learning_rate,
+    ):
+        slots = [
+            [self._velocities[self._get_variable_index(v)] for v in variables]
+        ]
+        if self.centered:
+            slots.append(
+                [
+                    self._average_gradients[self._get_variable_index(v)]
+                    for v in variables
+                ]
+            )
+        if self.momentum > 0:
+            slots.append(
+                [
+                    self._momentums[self._get_variable_index(v)]
+                    for v in variables
+                ]
+            )
+        self._fused_update(
+            _rmsprop_update,
+            grads,
+            variables,
+            slots,
+            {
+                "learning_rate": learning_rate,
+                "rho": self.rho,
+                "momentum": self.momentum,
+                "epsilon": self.epsilon,
+            },
+            centered=self.centered,
+            momentum=self.momentum > 0,
+        )
@@ -0,0 +1,35 @@
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.backend.mlx.optimizers import mlx_parallel_optimizer
+
+
+def _sgd_update(grad, value, slots, hyperparameters, nesterov):
+    learning_rate = hyperparameters["learning_rate"]
+    if not slots:
+        return value - grad * learning_rate, []
+    momentum = hyperparameters["momentum"]
+    m = slots[0] * momentum - grad * learning_rate
+    if nesterov:
+        return value + (m * momentum - grad * learning_rate), [m]
+    return value + m, [m]
+
+
+class SGD(mlx_parallel_optimizer.MLXParallelOptimizer, optimizers.SGD):
+    def _parallel_update_step(
+        self,
+        grads,
+        variables,
+        learning_rate,
+    ):
+        slots = []
+        if self.momentum != 0:
+            slots.append(
+                [self.momentums[self._get_variable_index(v)] for v in variables]
+            )
+        self._fused_update(
+            _sgd_update,
+            grads,
+            variables,
+            slots,
+            {"learning_rate": learning_rate, "momentum": self.momentum},
+            nesterov=self.nesterov,
+        )
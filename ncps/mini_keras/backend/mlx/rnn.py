@@ -1,7 +1,10 @@
-import numpy as np
+import mlx.core as mx
 
 from keras.src import tree
 
+from ncps.mini_keras.backend.common.stateless_scope import StatelessScope
+from ncps.mini_keras.backend.mlx.core import ScanOutputs
+
 
 def rnn(
     step_function,
@@ -15,12 +18,25 @@ def rnn(
     time_major=False,
     zero_output_for_mask=False,
     return_all_outputs=True,
+    output_stride=1,
+    output_reduction=None,
+    checkpoint_every=None,
+    checkpoint_variables=None,
 ):
+    """MLX implementation of `ncps.mini_keras.backend.rnn`.
+
+    Besides the arguments of the other backends, `output_stride` keeps only
+    every `output_stride`-th output of `return_all_outputs` and
+    `output_reduction` summarizes the outputs on the fly with a
+    `ncps.mini_keras.backend.mlx.core.ScanReduction` (e.g. `LastOutputs` or
+    `MeanOutputs`), so long rollouts do not store one output per step.
+    `checkpoint_every` and `checkpoint_variables` rematerialize the steps in
+    chunks during the backward pass, see `mlx_scan`.
+    """
+
     def swap_batch_timestep(input_t):
         # Swap the batch and timestep dim for the incoming tensor.
-        axes = list(range(len(input_t.shape)))
-        axes[0], axes[1] = 1, 0
-        return np.transpose(input_t, axes)
+        return mx.swapaxes(input_t, 0, 1)
 
     if not time_major:
         inputs = tree.map_structure(swap_batch_timestep, inputs)
@@ -29,17 +45,17 @@ def rnn(
     time_steps = flattened_inputs[0].shape[0]
 
     if mask is not None:
-        if mask.dtype != "bool":
-            mask = mask.astype("bool")
+        if mask.dtype != mx.bool_:
+            mask = mask.astype(mx.bool_)
         if len(mask.shape) == 2:
-            mask = np.expand_dims(mask, axis=-1)
+            mask = mx.expand_dims(mask, axis=-1)
         if not time_major:
             mask = swap_batch_timestep(mask)
 
     if constants is None:
         constants = []
 
-    def _expand_mask(mask_t, input_t, fixed_dim=1):
+    def _expand_mask(mask_t, input_t):
         if tree.is_nested(mask_t):
             raise ValueError(
                 f"mask_t is expected to be tensor, but got {mask_t}"
@@ -48,147 +64,90 @@ def rnn(
             raise ValueError(
                 f"input_t is expected to be tensor, but got {input_t}"
             )
+        # `mx.where` broadcasts, so the mask only needs a matching rank.
         rank_diff = len(input_t.shape) - len(mask_t.shape)
-        for _ in range(rank_diff):
-            mask_t = np.expand_dims(mask_t, -1)
-        multiples = [1] * fixed_dim + list(input_t.shape[fixed_dim:])
-        return np.tile(mask_t, multiples)
+        if rank_diff > 0:
+            mask_t = mx.reshape(mask_t, mask_t.shape + (1,) * rank_diff)
+        return mask_t
 
     if unroll:
         if not time_steps:
             raise ValueError("Unrolling requires a fixed number of timesteps.")
-        states = tuple(initial_states)
-        successive_states = []
-        successive_outputs = []
-
-        # Process the input tensors. The input tensor need to be split on the
-        # time_step dim, and reverse if go_backwards is True. In the case of
-        # nested input, the input is flattened and then transformed
-        # individually.  The result of this will be a tuple of lists, each of
-        # the item in tuple is list of the tensor with shape (batch, feature)
-        def _process_single_input_t(input_t):
-            input_t = unstack(input_t)  # unstack for time_step dim
-            if go_backwards:
-                input_t.reverse()
-            return input_t
-
-        if tree.is_nested(inputs):
-            processed_input = tree.map_structure(
-                _process_single_input_t, inputs
-            )
-        else:
-            processed_input = (_process_single_input_t(inputs),)
-
-        def _get_input_tensor(time):
-            inp = [t_[time] for t_ in processed_input]
-            return tree.pack_sequence_as(inputs, inp)
 
-        if mask is not None:
-            mask_list = unstack(mask)
-            if go_backwards:
-                mask_list.reverse()
-
-            for i in range(time_steps):
-                inp = _get_input_tensor(i)
-                mask_t = mask_list[i]
-                output, new_states = step_function(
-                    inp, tuple(states) + tuple(constants)
-                )
-                tiled_mask_t = _expand_mask(mask_t, output)
-
-                if not successive_outputs:
-                    prev_output = np.zeros_like(output)
-                else:
-                    prev_output = successive_outputs[-1]
-
-                output = np.where(tiled_mask_t, output, prev_output)
+        def _step(states, current_input, prev_output):
+            if mask is not None:
+                current_input, mask_t = current_input
+            output, new_states = step_function(
+                current_input, tuple(states) + tuple(constants)
+            )
+            if mask is None:
+                return new_states, output
 
-                flat_states = tree.flatten(states)
-                flat_new_states = tree.flatten(new_states)
-                tiled_mask_t = tuple(
-                    _expand_mask(mask_t, s) for s in flat_states
-                )
-                flat_final_states = tuple(
-                    np.where(m, s, ps)
-                    for m, s, ps in zip(
-                        tiled_mask_t, flat_new_states, flat_states
-                    )
-                )
-                states = tree.pack_sequence_as(states, flat_final_states)
+            if prev_output is None:
+                prev_output = mx.zeros_like(output)
+            output = mx.where(
+                _expand_mask(mask_t, output), output, prev_output
+            )
+            flat_states = tree.flatten(states)
+            flat_new_states = tree.flatten(new_states)
+            flat_final_states = [
+                mx.where(_expand_mask(mask_t, s), ns, s)
+                for s, ns in zip(flat_states, flat_new_states)
+            ]
+            new_states = tree.pack_sequence_as(states, flat_final_states)
+            return new_states, output
 
-                if return_all_outputs:
-                    successive_outputs.append(output)
-                    successive_states.append(states)
-                else:
-                    successive_outputs = [output]
-                    successive_states = [states]
-            last_output = successive_outputs[-1]
-            new_states = successive_states[-1]
-            outputs = np.stack(successive_outputs)
-
-        else:  # mask is None
-            for i in range(time_steps):
-                inp = _get_input_tensor(i)
-                output, states = step_function(
-                    inp, tuple(states) + tuple(constants)
-                )
-                if return_all_outputs:
-                    successive_outputs.append(output)
-                    successive_states.append(states)
-                else:
-                    successive_outputs = [output]
-                    successive_states = [states]
-            last_output = successive_outputs[-1]
-            new_states = successive_states[-1]
-            outputs = np.stack(successive_outputs)
+        states = tuple(initial_states)
 
-    else:  # Unroll == False
+    else:
         if mask is not None:
 
-            def _step(states, current_input):
+            def _step(states, current_input, prev_output):
                 current_input, current_mask = current_input
-                is_masked = np.all(
-                    np.logical_not(current_mask), axis=-1, keepdims=True
+                is_masked = mx.all(
+                    mx.logical_not(current_mask), axis=-1, keepdims=True
                 )
 
                 output_t, new_states = step_function(current_input, states)
 
                 if zero_output_for_mask:
-                    masked_outs = np.where(
-                        is_masked, np.zeros_like(output_t), output_t
+                    masked_outs = mx.where(
+                        is_masked, mx.zeros_like(output_t), output_t
                     )
                 else:
                     # Assume the first state is the previous output.
                     output_tm1 = states[0]
-                    masked_outs = np.where(is_masked, output_tm1, output_t)
+                    masked_outs = mx.where(is_masked, output_tm1, output_t)
 
                 new_states = [
-                    np.where(is_masked, s, ns)
+                    mx.where(is_masked, s, ns)
                     for s, ns in zip(states, new_states)
                 ]
-                return (new_states, masked_outs)
-
-            scan_xs = (inputs, mask)
+                return new_states, masked_outs
 
         else:
 
-            def _step(states, current_input):
+            def _step(states, current_input, prev_output):
                 output_t, new_states = step_function(current_input, states)
                 return new_states, output_t
 
-            scan_xs = inputs
-
-        new_states, outputs = numpy_scan(
-            f=_step,
-            init=initial_states,
-            xs=scan_xs,
-            reverse=go_backwards,
-            mask=mask,
-        )
-
-        if go_backwards:
-            outputs = np.flip(outputs, axis=0)
-        last_output = outputs[-1]
+        states = initial_states
+
+    scan_xs = (inputs, mask) if mask is not None else inputs
+    new_states, outputs, last_output = mlx_scan(
+        f=_step,
+        init=states,
+        xs=scan_xs,
+        reverse=go_backwards,
+        mask=mask,
+        return_all_outputs=return_all_outputs,
+        stride=output_stride,
+        reduction=output_reduction,
+        checkpoint_every=checkpoint_every,
+        checkpoint_variables=checkpoint_variables,
+    )
+    # `mlx_scan` stores the outputs in processing order, which is the order
+    # the reversed sequence is returned in when `go_backwards=True`.
 
     if not time_major:
         outputs = tree.map_structure(swap_batch_timestep, outputs)
@@ -196,6 +155,32 @@ def rnn(
     return last_output, outputs, new_states
 
 
+def compile_cell_call(call, variables):
+    """Traces `call(inputs, states)` with `mx.compile` as a pure function of
+    the values of `variables`, the inputs and the states.
+
+    `call` must read the weights it uses through `variables` (reading other
+    arrays bakes them into the trace as constants), must not draw random
+    numbers or assign variables and must not synchronize with the host.
+    Returns a function of `(inputs, states)` that passes the current values
+    of `variables`, e.g. those bound by an enclosing `StatelessScope`, into
+    the traced call. The trace is reused while the shapes and dtypes of the
+    arguments stay the same.
+    """
+    variables = list(variables)
+
+    def pure_call(values, inputs, states):
+        with StatelessScope(state_mapping=list(zip(variables, values))):
+            return call(inputs, states)
+
+    compiled = mx.compile(pure_call)
+
+    def compiled_call(inputs, states):
+        return compiled([v.value for v in variables], inputs, states)
+
+    return compiled_call
+
+
 def lstm(*args, **kwargs):
     raise NotImplementedError
 
@@ -208,31 +193,171 @@ def unstack(x, axis=0):
     return [x.take(i, axis) for i in range(x.shape[axis])]
 
 
-def numpy_scan(f, init, xs, reverse=False, mask=None):
-    states = init
-    outputs = []
-
+def mlx_scan(
+    f,
+    init,
+    xs,
+    reverse=False,
+    mask=None,
+    return_all_outputs=True,
+    stride=1,
+    reduction=None,
+    checkpoint_every=None,
+    checkpoint_variables=None,
+):
+    """Scans `f(states, x_t, prev_output)` over the leading axis of `xs`.
+
+    All carried state stays in `mx.array`s. The outputs are collected by a
+    `ScanOutputs` in processing order, keeping the outputs of steps
+    `stride - 1, 2 * stride - 1, ...`. With `return_all_outputs=False` only
+    the final output is kept and the returned outputs have a time dimension
+    of 1. A `ScanReduction` given as `reduction` replaces the outputs.
+
+    With `checkpoint_every=k` the steps run in chunks of `k` that are
+    rematerialized: only the states between chunks are kept for the
+    backward pass and the intermediates of a chunk are recomputed from them.
+    Arrays that `f` reads through a closure receive no gradient from a
+    rematerialized chunk, so the Keras variables `f` uses must be listed in
+    `checkpoint_variables`; their values are passed into each chunk and
+    bound to the variables with a `StatelessScope`.
+
+    Returns the final states, the outputs and the output of the last step.
+    """
+    if not isinstance(stride, int) or stride < 1:
+        raise ValueError(
+            f"`stride` must be a positive integer. Received: stride={stride}"
+        )
+    if checkpoint_every is not None and (
+        not isinstance(checkpoint_every, int) or checkpoint_every < 1
+    ):
+        raise ValueError(
+            "`checkpoint_every` must be a positive integer. "
+            f"Received: checkpoint_every={checkpoint_every}"
+        )
     if mask is not None:
-        x, mask = xs
-        x = np.flip(x, axis=0) if reverse else x
-        mask = np.flip(mask, axis=0) if reverse else mask
+        xs, mask = xs
+    flat_xs = tree.flatten(xs)
+    time_steps = flat_xs[0].shape[0]
+    indices = range(time_steps - 1, -1, -1) if reverse else range(time_steps)
+
+    outputs = ScanOutputs(time_steps, stride)
+    summary = None
+
+    def record(start, step_outputs):
+        # Records the outputs of the steps from position `start` on
+        nonlocal summary
+        if reduction is not None:
+            for output in step_outputs:
+                summary = reduction.update(summary, output)
+        elif return_all_outputs:
+            for position, output in enumerate(step_outputs, start):
+                outputs.append(position, output)
+
+    states = init
+    output = None
+    if checkpoint_every is None:
+        for position, index in enumerate(indices):
+            x_t = _step_input(xs, flat_xs, mask, index)
+            states, output = f(states, x_t, output)
+            record(position, [output])
+    else:
+        checkpoint_variables = list(checkpoint_variables or [])
+        values = [v.value for v in checkpoint_variables]
+        for start in range(0, time_steps, checkpoint_every):
+            chunk = indices[start : start + checkpoint_every]
+            lo, hi = min(chunk), max(chunk) + 1
+            args = (
+                values,
+                states,
+                [] if output is None else [output],
+                [x[lo:hi] for x in flat_xs],
+                [] if mask is None else [mask[lo:hi]],
+            )
+            run_chunk, layout = _scan_chunk(
+                f, xs, checkpoint_variables, args, reverse
+            )
+            returned = run_chunk(*tree.flatten(args))
+            structure, aliases = layout
+            states, chunk_outputs = tree.pack_sequence_as(
+                structure, [returned[i] for i in aliases]
+            )
+            output = chunk_outputs[-1]
+            record(start, chunk_outputs)
 
-        for each_x, each_mask in zip(x, mask):
-            states, output = f(states, (each_x, each_mask))
-            outputs.append(output)
+    if reduction is not None:
+        outputs = reduction.result(summary)
+    elif return_all_outputs:
+        outputs = outputs.result()
     else:
-        xs = np.flip(xs, axis=0) if reverse else xs
+        outputs = mx.expand_dims(output, axis=0)
+    return states, outputs, output
 
-        for x in xs:
-            states, output = f(states, x)
-            outputs.append(output)
 
-    outputs = np.array(outputs)
+def _step_input(xs, flat_xs, mask, index):
+    x_t = tree.pack_sequence_as(xs, [x[index] for x in flat_xs])
+    if mask is not None:
+        x_t = (x_t, mask[index])
+    return x_t
+
 
-    if reverse:
-        outputs = np.flip(outputs, axis=0)
+def _scan_chunk(f, xs, variables, args, reverse):
+    """Returns a rematerialized function that runs `f` over one chunk of a
+    `mlx_scan`, taking the flattened `(values, states, prev_output,
+    chunk_xs, chunk_mask)` in `args`, and the layout of its outputs, which
+    is filled in when the function is called."""
+    layout = []
 
-    return states, outputs
+    def run_chunk(*flat_args):
+        values, states, prev_output, chunk_xs, chunk_mask = (
+            tree.pack_sequence_as(args, flat_args)
+        )
+        chunk_mask = chunk_mask[0] if chunk_mask else None
+        output = prev_output[0] if prev_output else None
+        chunk_outputs = []
+        length = chunk_xs[0].shape[0]
+        with StatelessScope(state_mapping=list(zip(variables, values))):
+            for i in range(length - 1, -1, -1) if reverse else range(length):
+                x_t = _step_input(xs, chunk_xs, chunk_mask, i)
+                states, output = f(states, x_t, output)
+                chunk_outputs.append(output)
+        # A custom function loses the cotangent of an array that it returns
+        # more than once, and the output of a cell is usually also its
+        # state. Each array is returned once and the aliases are restored
+        # by the caller.
+        leaves = tree.flatten((states, chunk_outputs))
+        positions = {}
+        layout[:] = [
+            (states, chunk_outputs),
+            [positions.setdefault(id(a), len(positions)) for a in leaves],
+        ]
+        unique = {id(a): a for a in leaves}
+        return [unique[i] for i in positions]
+
+    return _rematerialize(run_chunk), layout
+
+
+def _rematerialize(fn):
+    """Wraps `fn`, a function of arrays returning a list of arrays, so that
+    its intermediates are recomputed in the backward pass.
+
+    Unlike `mx.checkpoint`, the recomputation waits for the incoming
+    cotangents and all gradients of one call are finished together. Otherwise
+    the weight gradients of every chunk of a recurrence are only summed at
+    the very end of the backward pass and keep all the recomputed
+    intermediates alive.
+    """
+
+    @mx.custom_function
+    def rematerialized(*args):
+        return fn(*args)
+
+    @rematerialized.vjp
+    def rematerialized_vjp(primals, cotangents, outputs):
+        primals = mx.depends(list(primals), list(cotangents))
+        _, grads = mx.vjp(fn, primals, list(cotangents))
+        return tuple(mx.depends(grads, grads))
+
+    return rematerialized
 
 
 def cudnn_ok(*args, **kwargs):
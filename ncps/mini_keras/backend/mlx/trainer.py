@@ -1,22 +1,147 @@
+import time
+
+import mlx.core as mx
 import numpy as np
 
 from keras.src import backend
 from keras.src import callbacks as callbacks_module
+from keras.src import optimizers as optimizers_module
 from keras.src import tree
 from keras.src.backend.common import standardize_dtype
 from keras.src.backend.common.keras_tensor import KerasTensor
 from keras.src.backend.numpy.core import is_tensor
 from keras.src.trainers import trainer as base_trainer
+from keras.src.trainers.data_adapters import array_slicing
 from keras.src.trainers.data_adapters import data_adapter_utils
 from keras.src.trainers.epoch_iterator import EpochIterator
 from keras.src.utils import traceback_utils
 
 
-class NumpyTrainer(base_trainer.Trainer):
+class MLXTrainer(base_trainer.Trainer):
     def __init__(self):
         super().__init__()
+        self.train_function = None
         self.test_function = None
         self.predict_function = None
+        self._mlx_state = None
+        self._mlx_state_synced = True
+
+    def compute_loss_and_updates(
+        self,
+        trainable_variables,
+        non_trainable_variables,
+        metrics_variables,
+        x,
+        y,
+        sample_weight,
+        training=False,
+        optimizer_variables=None,
+    ):
+        """This method is stateless and is intended for use with
+        `mx.value_and_grad`."""
+        kwargs = {}
+        if self._call_has_training_arg:
+            kwargs["training"] = training
+
+        # Run stateless forward pass
+        y_pred, non_trainable_variables, losses = self.stateless_call(
+            trainable_variables,
+            non_trainable_variables,
+            x,
+            return_losses=True,
+            **kwargs,
+        )
+        if losses:
+            # Make forward pass losses available to compute_loss.
+            self._losses_override.clear()
+            self._losses_override = losses
+
+        loss, variables = self.stateless_compute_loss(
+            trainable_variables,
+            non_trainable_variables,
+            metrics_variables,
+            x=x,
+            y=y,
+            y_pred=y_pred,
+            sample_weight=sample_weight,
+            training=training,
+        )
+        if losses:
+            self._losses_override.clear()
+        (trainable_variables, non_trainable_variables, metrics_variables) = (
+            variables
+        )
+
+        # Handle loss scaling
+        unscaled_loss = loss
+        if training and self.optimizer is not None:
+            # Scale loss with a StatelessScope, to use an update scale variable.
+            mapping = list(zip(self.optimizer.variables, optimizer_variables))
+            with backend.StatelessScope(state_mapping=mapping):
+                loss = self.optimizer.scale_loss(loss)
+        return loss, (
+            unscaled_loss,
+            y_pred,
+            non_trainable_variables,
+            metrics_variables,
+        )
+
+    def train_step(self, state, data):
+        (
+            trainable_variables,
+            non_trainable_variables,
+            optimizer_variables,
+            metrics_variables,
+        ) = state
+        x, y, sample_weight = data_adapter_utils.unpack_x_y_sample_weight(data)
+        grad_fn = mx.value_and_grad(self.compute_loss_and_updates)
+        (loss, aux), grads = grad_fn(
+            trainable_variables,
+            non_trainable_variables,
+            metrics_variables,
+            x,
+            y,
+            sample_weight,
+            training=True,
+            optimizer_variables=optimizer_variables,
+        )
+        (unscaled_loss, y_pred, non_trainable_variables, metrics_variables) = (
+            aux
+        )
+
+        (
+            trainable_variables,
+            optimizer_variables,
+        ) = self.optimizer.stateless_apply(
+            optimizer_variables, grads, trainable_variables
+        )
+
+        with backend.StatelessScope(
+            state_mapping=[
+                (ref_v, v)
+                for ref_v, v in zip(self.metrics_variables, metrics_variables)
+            ]
+        ) as scope:
+            self._loss_tracker.update_state(
+                unscaled_loss, sample_weight=tree.flatten(x)[0].shape[0]
+            )
+            logs = self.compute_metrics(x, y, y_pred, sample_weight)
+
+        new_metrics_variables = []
+        for ref_v in self.metrics_variables:
+            new_v = scope.get_current_value(ref_v)
+            if new_v is None:
+                new_v = ref_v.value
+            new_metrics_variables.append(new_v)
+        metrics_variables = new_metrics_variables
+
+        state = (
+            trainable_variables,
+            non_trainable_variables,
+            optimizer_variables,
+            metrics_variables,
+        )
+        return logs, state
 
     def test_step(self, data):
         (
@@ -44,6 +169,36 @@ class NumpyTrainer(base_trainer.Trainer):
             y_pred = self(x)
         return y_pred
 
+    def make_train_function(self, force=False):
+        if self.train_function is not None and not force:
+            return self.train_function
+
+        def multi_step_on_data(state, data):
+            """Runs one training step per batch in `data`, threading the
+            state through, so that `steps_per_execution` batches are traced
+            into a single graph."""
+            logs = {}
+            for single_step_data in data:
+                logs, state = self.train_step(state, single_step_data)
+            return logs, state
+
+        if not self.run_eagerly and self.jit_compile:
+            # `mx.compile` retraces when the number of batches changes, i.e.
+            # at most once more for a trailing partial step group.
+            train_function = mx.compile(multi_step_on_data)
+        else:
+            train_function = multi_step_on_data
+
+        def step_function(state, data):
+            data = tree.map_structure(_convert_data_to_mlx, list(data))
+            logs, state = train_function(state, data)
+            # Nothing is evaluated until here: one sync per step group.
+            mx.eval(logs, state)
+            return logs, state
+
+        self.train_function = step_function
+        return self.train_function
+
     def make_test_function(self, force=False):
         if self.test_function is not None and not force:
             return self.test_function
@@ -165,8 +320,171 @@ class NumpyTrainer(base_trainer.Trainer):
         validation_steps=None,
         validation_batch_size=None,
         validation_freq=1,
+        truncated_bptt_steps=None,
     ):
-        raise NotImplementedError("fit not implemented for NumPy backend.")
+        self._assert_compile_called("fit")
+        self._eval_epoch_iterator = None
+        if validation_split and validation_data is None:
+            # Create the validation data using the training data. Only supported
+            # for numpy/mlx arrays.
+            (
+                (x, y, sample_weight),
+                validation_data,
+            ) = array_slicing.train_validation_split(
+                (x, y, sample_weight), validation_split=validation_split
+            )
+
+        if validation_data is not None:
+            (
+                val_x,
+                val_y,
+                val_sample_weight,
+            ) = data_adapter_utils.unpack_x_y_sample_weight(validation_data)
+
+        # Create an iterator that yields batches for one epoch.
+        epoch_iterator = EpochIterator(
+            x=x,
+            y=y,
+            sample_weight=sample_weight,
+            batch_size=batch_size,
+            steps_per_epoch=steps_per_epoch,
+            shuffle=shuffle,
+            class_weight=class_weight,
+            steps_per_execution=self.steps_per_execution,
+        )
+
+        # Build the model, metrics and loss on one batch of data.
+        for _, data in epoch_iterator:
+            self._symbolic_build(data[0])
+            break
+        epoch_iterator.reset()
+        if self.optimizer is not None and not self.optimizer.built:
+            self.optimizer.build(self.trainable_variables)
+        if truncated_bptt_steps is not None:
+            if truncated_bptt_steps < 1:
+                raise ValueError(
+                    "`truncated_bptt_steps` must be a positive integer. "
+                    f"Received: truncated_bptt_steps={truncated_bptt_steps}"
+                )
+            rnn_state_indices = self._rnn_state_indices()
+            if not rnn_state_indices:
+                raise ValueError(
+                    "`truncated_bptt_steps` requires at least one RNN layer "
+                    "created with `stateful=True`, whose state is carried "
+                    "from one window to the next."
+                )
+
+        # Container that configures and calls callbacks.
+        if not isinstance(callbacks, callbacks_module.CallbackList):
+            callbacks = callbacks_module.CallbackList(
+                callbacks,
+                add_history=True,
+                add_progbar=verbose != 0,
+                verbose=verbose,
+                epochs=epochs,
+                steps=epoch_iterator.num_batches,
+                model=self,
+            )
+
+        self.make_train_function()
+        self.stop_training = False
+        training_logs = {}
+        callbacks.on_train_begin()
+        initial_epoch = self._initial_epoch or initial_epoch
+        for epoch in range(initial_epoch, epochs):
+            self.reset_metrics()
+            callbacks.on_epoch_begin(epoch)
+
+            self._mlx_state_synced = True
+            logs = {}
+            num_samples = 0
+            epoch_start = time.perf_counter()
+            for step, data in epoch_iterator:
+                # Callbacks
+                callbacks.on_train_batch_begin(step)
+
+                # Train step
+                if self._mlx_state_synced:
+                    # The state may have been synced by a callback.
+                    state = self._get_mlx_state()
+                    self._mlx_state_synced = False
+
+                if truncated_bptt_steps is None:
+                    logs, state = self.train_function(state, data)
+                else:
+                    logs, state = self._truncated_bptt_step(
+                        state, data, truncated_bptt_steps, rnn_state_indices
+                    )
+                num_samples += sum(
+                    tree.flatten(batch)[0].shape[0] for batch in data
+                )
+
+                # Setting _mlx_state enables callbacks to force a state sync
+                # if they need to.
+                self._mlx_state = state
+
+                # Callbacks
+                callbacks.on_train_batch_end(step, logs)
+                if self.stop_training:
+                    break
+            epoch_time = time.perf_counter() - epoch_start
+
+            # Reattach state to the model (if not already done by a callback).
+            self.mlx_state_sync()
+
+            # Override with model metrics instead of last step logs if needed.
+            epoch_logs = dict(self._get_metrics_result_or_logs(logs))
+            epoch_logs["samples_per_second"] = num_samples / max(
+                epoch_time, 1e-12
+            )
+
+            # Run validation.
+            if validation_data is not None and self._should_eval(
+                epoch, validation_freq
+            ):
+                # Create EpochIterator for evaluation and cache it.
+                if getattr(self, "_eval_epoch_iterator", None) is None:
+                    self._eval_epoch_iterator = EpochIterator(
+                        x=val_x,
+                        y=val_y,
+                        sample_weight=val_sample_weight,
+                        batch_size=validation_batch_size or batch_size,
+                        steps_per_execution=self.steps_per_execution,
+                        steps_per_epoch=validation_steps,
+                        shuffle=False,
+                    )
+                val_logs = self.evaluate(
+                    x=val_x,
+                    y=val_y,
+                    sample_weight=val_sample_weight,
+                    batch_size=validation_batch_size or batch_size,
+                    steps=validation_steps,
+                    callbacks=callbacks,
+                    return_dict=True,
+                    _use_cached_eval_dataset=True,
+                )
+                val_logs = {
+                    "val_" + name: val for name, val in val_logs.items()
+                }
+                epoch_logs.update(val_logs)
+
+            callbacks.on_epoch_end(epoch, epoch_logs)
+            training_logs = epoch_logs
+            if self.stop_training:
+                break
+
+        if (
+            isinstance(self.optimizer, optimizers_module.Optimizer)
+            and epochs > 0
+        ):
+            self.optimizer.finalize_variable_values(self.trainable_weights)
+
+        # If _eval_epoch_iterator exists, delete it after all epochs are done.
+        if getattr(self, "_eval_epoch_iterator", None) is not None:
+            del self._eval_epoch_iterator
+        callbacks.on_train_end(logs=training_logs)
+        self._mlx_state = None
+        return self.history
 
     @traceback_utils.filter_traceback
     def predict(
@@ -299,9 +617,36 @@ class NumpyTrainer(base_trainer.Trainer):
         class_weight=None,
         return_dict=False,
     ):
-        raise NotImplementedError(
-            "train_on_batch not implemented for NumPy backend."
-        )
+        self._assert_compile_called("train_on_batch")
+        if class_weight is not None:
+            if sample_weight is not None:
+                raise ValueError(
+                    "Arguments `sample_weight` and `class_weight` "
+                    "cannot be specified at the same time. "
+                    f"Received: sample_weight={sample_weight}, "
+                    f"class_weight={class_weight}"
+                )
+            sample_weight = data_adapter_utils.class_weight_to_sample_weights(
+                y, class_weight
+            )
+
+        data = (x, y, sample_weight)
+
+        # Maybe build model
+        self._symbolic_build(data)
+        if self.optimizer is not None and not self.optimizer.built:
+            self.optimizer.build(self.trainable_variables)
+        self.make_train_function()
+
+        logs, state = self.train_function(self._get_mlx_state(), [data])
+        self._mlx_state = state
+        self._mlx_state_synced = False
+        self.mlx_state_sync()
+
+        logs = tree.map_structure(lambda x: np.array(x), logs)
+        if return_dict:
+            return logs
+        return self._flatten_metrics_in_order(logs)
 
     def test_on_batch(
         self,
@@ -331,3 +676,108 @@ class NumpyTrainer(base_trainer.Trainer):
             backend.convert_to_numpy, batch_outputs
         )
         return batch_outputs
+
+    def mlx_state_sync(self):
+        if self._mlx_state is None or self._mlx_state_synced:
+            return
+
+        (
+            trainable_variables,
+            non_trainable_variables,
+            optimizer_variables,
+            metrics_variables,
+        ) = self._mlx_state
+        for ref_v, v in zip(self.trainable_variables, trainable_variables):
+            ref_v.assign(v)
+        for ref_v, v in zip(
+            self.non_trainable_variables, non_trainable_variables
+        ):
+            ref_v.assign(v)
+        for ref_v, v in zip(self.optimizer.variables, optimizer_variables):
+            ref_v.assign(v)
+        for ref_v, v in zip(self.metrics_variables, metrics_variables):
+            ref_v.assign(v)
+        self._mlx_state_synced = True
+
+    def _rnn_state_indices(self):
+        """Positions of the state variables of stateful RNN layers in
+        `non_trainable_variables`."""
+        state_ids = set()
+        for layer in self._flatten_layers():
+            if getattr(layer, "stateful", False) and layer.states is not None:
+                state_ids.update(id(v) for v in tree.flatten(layer.states))
+        return [
+            i
+            for i, v in enumerate(self.non_trainable_variables)
+            if id(v) in state_ids
+        ]
+
+    def _truncated_bptt_step(self, state, data, window_steps, state_indices):
+        """Trains on each batch in `data` in windows of `window_steps` time
+        steps, one optimizer update per window.
+
+        The stateful RNN layers start every batch from a zero state, which is
+        then carried from one window to the next with its gradient stopped,
+        so only one window of activations is alive at a time.
+        """
+        logs = {}
+        for batch in data:
+            state = _carry_rnn_states(state, state_indices, reset=True)
+            for window in _time_windows(batch, window_steps):
+                logs, state = self.train_function(state, [window])
+                state = _carry_rnn_states(state, state_indices)
+        return logs, state
+
+    def _get_mlx_state(self):
+        return (
+            [v.value for v in self.trainable_variables],
+            [v.value for v in self.non_trainable_variables],
+            [v.value for v in self.optimizer.variables],
+            [v.value for v in self.metrics_variables],
+        )
+
+
+def _carry_rnn_states(state, state_indices, reset=False):
+    trainable, non_trainable, optimizer_variables, metrics = state
+    non_trainable = list(non_trainable)
+    for i in state_indices:
+        value = non_trainable[i]
+        non_trainable[i] = (
+            mx.zeros_like(value) if reset else mx.stop_gradient(value)
+        )
+    return trainable, non_trainable, optimizer_variables, metrics
+
+
+def _time_windows(data, window_steps):
+    """Splits a `(x, y, sample_weight)` batch along the time axis."""
+    x, y, sample_weight = data_adapter_utils.unpack_x_y_sample_weight(data)
+    timesteps = tree.flatten(x)[0].shape[1]
+    for v in tree.flatten(y):
+        if len(v.shape) < 2 or v.shape[1] != timesteps:
+            raise ValueError(
+                "`truncated_bptt_steps` requires per-step targets of shape "
+                f"(batch, {timesteps}, ...). Received a target of shape "
+                f"{tuple(v.shape)}"
+            )
+
+    def window(v, start):
+        if v is None:
+            return None
+        if len(v.shape) < 2 or v.shape[1] != timesteps:
+            # Per-sample weights apply to every window
+            return v
+        return v[:, start : start + window_steps]
+
+    for start in range(0, timesteps, window_steps):
+        yield data_adapter_utils.pack_x_y_sample_weight(
+            *(
+                tree.map_structure(lambda v: window(v, start), d)
+                for d in (x, y, sample_weight)
+            )
+        )
+
+
+def _convert_data_to_mlx(x):
+    if isinstance(x, np.ndarray):
+        return mx.array(x)
+    return x
@@ -1,8 +1,12 @@
+import contextlib
+import functools
+
 from ncps.mini_keras import backend
 from ncps.mini_keras import ops
 from ncps.mini_keras import tree
 from ncps.mini_keras.api_export import keras_mini_export
 from ncps.mini_keras.layers.layer import Layer
+from ncps.mini_keras.layers.regularization.dropout import Dropout
 from ncps.mini_keras.layers.rnn.dropout_rnn_cell import DropoutRNNCell
 from ncps.mini_keras.layers.rnn.stacked_rnn_cells import StackedRNNCells
 from ncps.mini_keras.saving import serialization_lib
@@ -61,6 +65,32 @@ class RNN(Layer):
             It can useful if you want to reuse the raw output sequence of
             the RNN without interference from the masked timesteps, e.g.,
             merging bidirectional RNNs.
+        checkpoint_every: Integer or `None` (default `None`). If set, only
+            the state every `checkpoint_every` timesteps is kept for the
+            backward pass and the steps in between are recomputed from it,
+            trading compute for memory on long sequences. Only supported by
+            the MLX backend.
+        compile_cell: Boolean (default `False`). The steps after the first
+            one call the `call()` method of a built cell (or its
+            `call_projected()` method) directly instead of going through
+            `Layer.__call__`. If `True`, that call is traced once with
+            `mx.compile` as a pure function of the cell's variable values,
+            inputs and states, and the trace is reused by every step. The
+            cell must read its weights through its variables and must not
+            synchronize with the host (e.g. the adaptive solvers of
+            `ncps.mlx.EnhancedLTCCell`). The trace is not used in training
+            if the cell applies dropout. Only supported by the MLX backend.
+        output_stride: Integer (default `1`). With `return_sequences`, only
+            the outputs of timesteps `output_stride - 1,
+            2 * output_stride - 1, ...` are kept, so the returned sequence
+            has `timesteps // output_stride` steps. Only supported by the
+            MLX backend.
+        output_reduction: A
+            `ncps.mini_keras.backend.mlx.core.ScanReduction` or `None`
+            (default `None`). With `return_sequences`, summarizes the outputs
+            on the fly (e.g. `LastOutputs(n)` or `MeanOutputs()`) instead of
+            returning one per timestep. It is not serialized by
+            `get_config()`. Only supported by the MLX backend.
 
     Call arguments:
         sequences: A 3-D tensor with shape `(batch_size, timesteps, features)`.
@@ -181,6 +211,10 @@ class RNN(Layer):
         stateful=False,
         unroll=False,
         zero_output_for_mask=False,
+        checkpoint_every=None,
+        compile_cell=False,
+        output_stride=1,
+        output_reduction=None,
         **kwargs,
     ):
         if isinstance(cell, (list, tuple)):
@@ -197,6 +231,44 @@ class RNN(Layer):
                 "one integer per RNN state). "
                 f"Received: cell={cell}"
             )
+        if checkpoint_every is not None:
+            if not isinstance(checkpoint_every, int) or checkpoint_every < 1:
+                raise ValueError(
+                    "`checkpoint_every` must be a positive integer. "
+                    f"Received: checkpoint_every={checkpoint_every}"
+                )
+            if backend.backend() != "mlx":
+                raise ValueError(
+                    "`checkpoint_every` is only supported by the MLX backend. "
+                    f"Current backend: {backend.backend()}"
+                )
+        if compile_cell and backend.backend() != "mlx":
+            raise ValueError(
+                "`compile_cell` is only supported by the MLX backend. "
+                f"Current backend: {backend.backend()}"
+            )
+        if not isinstance(output_stride, int) or output_stride < 1:
+            raise ValueError(
+                "`output_stride` must be a positive integer. "
+                f"Received: output_stride={output_stride}"
+            )
+        if output_stride != 1 or output_reduction is not None:
+            if output_stride != 1 and output_reduction is not None:
+                raise ValueError(
+                    "`output_stride` and `output_reduction` cannot be "
+                    "combined."
+                )
+            if not return_sequences:
+                raise ValueError(
+                    "`output_stride` and `output_reduction` require "
+                    "`return_sequences=True`."
+                )
+            if backend.backend() != "mlx":
+                raise ValueError(
+                    "`output_stride` and `output_reduction` are only "
+                    "supported by the MLX backend. "
+                    f"Current backend: {backend.backend()}"
+                )
         super().__init__(**kwargs)
 
         # If True, the output for masked timestep will be zeros, whereas in the
@@ -209,6 +281,12 @@ class RNN(Layer):
         self.go_backwards = go_backwards
         self.stateful = stateful
         self.unroll = unroll
+        self.checkpoint_every = checkpoint_every
+        self.compile_cell = compile_cell
+        self.output_stride = output_stride
+        self.output_reduction = output_reduction
+        # Traced cell calls of `compile_cell`, by method and training mode
+        self._compiled_cell_calls = {}
 
         self.supports_masking = True
         self.input_spec = None
@@ -246,6 +324,10 @@ class RNN(Layer):
             output_size = self.state_size[0]
         if not isinstance(output_size, int):
             raise ValueError("output_size must be an integer.")
+        if self.output_reduction is not None:
+            length = self.output_reduction.output_length(length)
+        elif length is not None:
+            length //= self.output_stride
         if self.return_sequences:
             output_shape = (batch_size, length, output_size)
         else:
@@ -261,6 +343,12 @@ class RNN(Layer):
         # must be skipped for all inputs.
         mask = tree.flatten(mask)[0]
         output_mask = mask if self.return_sequences else None
+        if self.output_reduction is not None:
+            output_mask = None
+        elif output_mask is not None and self.output_stride > 1:
+            output_mask = output_mask[
+                :, self.output_stride - 1 :: self.output_stride
+            ]
         if self.return_state:
             state_mask = [None for _ in self.state_size]
             return [output_mask] + state_mask
@@ -330,8 +418,24 @@ class RNN(Layer):
         if isinstance(self.cell, Layer) and self.cell._call_has_training_arg:
             cell_kwargs["training"] = training
 
+        cell_fn = self.cell
+        autocast_scope = contextlib.nullcontext()
+        project_inputs = getattr(self.cell, "project_inputs", None)
+        if project_inputs is not None and not tree.is_nested(sequences):
+            # The input-side projections of the cell do not depend on the
+            # state, so they are computed for the whole sequence with one
+            # batched matmul and only the recurrent part remains in the loop.
+            sequences = project_inputs(sequences)
+            cell_fn = self._hot_cell_fn(self.cell.call_projected, cell_kwargs)
+        elif self._can_bypass_cell_call(sequences):
+            cell_fn = self._hot_cell_fn(
+                self.cell.call, cell_kwargs, first_call=self.cell
+            )
+            # Entered once for the whole scan instead of once per step
+            autocast_scope = self._cell_autocast_scope()
+
         def step(inputs, states):
-            output, new_states = self.cell(inputs, states, **cell_kwargs)
+            output, new_states = cell_fn(inputs, states, **cell_kwargs)
             if not tree.is_nested(new_states):
                 new_states = [new_states]
             return output, new_states
@@ -339,18 +443,95 @@ class RNN(Layer):
         if not tree.is_nested(initial_state):
             initial_state = [initial_state]
 
-        return backend.rnn(
-            step,
-            sequences,
-            initial_state,
-            go_backwards=self.go_backwards,
-            mask=mask,
-            unroll=self.unroll,
-            input_length=sequences.shape[1],
-            zero_output_for_mask=self.zero_output_for_mask,
-            return_all_outputs=self.return_sequences,
+        rnn_kwargs = {}
+        if self.checkpoint_every is not None:
+            # The recomputed steps read the cell weights through these
+            # variables, see `ncps.mini_keras.backend.mlx.rnn.mlx_scan`.
+            rnn_kwargs["checkpoint_every"] = self.checkpoint_every
+            rnn_kwargs["checkpoint_variables"] = self.cell.variables
+        if self.output_stride != 1:
+            rnn_kwargs["output_stride"] = self.output_stride
+        if self.output_reduction is not None:
+            rnn_kwargs["output_reduction"] = self.output_reduction
+
+        with autocast_scope:
+            return backend.rnn(
+                step,
+                sequences,
+                initial_state,
+                go_backwards=self.go_backwards,
+                mask=mask,
+                unroll=self.unroll,
+                input_length=sequences.shape[1],
+                zero_output_for_mask=self.zero_output_for_mask,
+                return_all_outputs=self.return_sequences,
+                **rnn_kwargs,
+            )
+
+    def _can_bypass_cell_call(self, sequences):
+        """Whether the steps may call `cell.call` directly.
+
+        `Layer.__call__` converts and validates the arguments, infers the
+        training mode and enters name and autocast scopes on every step. A
+        built cell layer needs none of that after the first step, as long
+        as it has no activity regularizer and the steps see concrete
+        tensors.
+        """
+        return (
+            isinstance(self.cell, Layer)
+            and self.cell.built
+            and self.cell.activity_regularizer is None
+            and all(backend.is_tensor(x) for x in tree.flatten(sequences))
         )
 
+    def _hot_cell_fn(self, call, cell_kwargs, first_call=None):
+        """The cell method `call` for the steps of a scan, traced once if
+        `compile_cell` is set. If given, `first_call` runs the first step
+        instead, e.g. `Layer.__call__` of the cell to validate the
+        arguments."""
+        cell = self.cell
+        training = cell_kwargs.get("training")
+        if (
+            self.compile_cell
+            and isinstance(training, (bool, type(None)))
+            and not (training and _uses_dropout(cell))
+        ):
+            key = (call.__name__, training)
+            if key not in self._compiled_cell_calls:
+                self._compiled_cell_calls[key] = backend.compile_cell_call(
+                    functools.partial(call, **cell_kwargs), cell.variables
+                )
+            compiled_call = self._compiled_cell_calls[key]
+            call = lambda inputs, states, **kwargs: compiled_call(
+                inputs, states
+            )
+        if first_call is None:
+            return call
+        validated = []
+
+        def hot_cell(inputs, states, **kwargs):
+            if not validated:
+                validated.append(True)
+                return first_call(inputs, states, **kwargs)
+            return call(inputs, states, **kwargs)
+
+        return hot_cell
+
+    def _cell_autocast_scope(self):
+        """The autocast scope `Layer.__call__` would enter for the cell"""
+        current_scope = backend.get_autocast_scope()
+        cell = self.cell
+        if current_scope is not None:
+            if not cell.autocast or not backend.is_float_dtype(
+                cell.compute_dtype
+            ):
+                return backend.AutocastScope(None)
+            if current_scope.dtype != cell.compute_dtype:
+                return backend.AutocastScope(cell.compute_dtype)
+        elif cell.compute_dtype != cell.variable_dtype:
+            return backend.AutocastScope(cell.compute_dtype)
+        return contextlib.nullcontext()
+
     def call(
         self,
         sequences,
@@ -461,6 +642,9 @@ class RNN(Layer):
             "stateful": self.stateful,
             "unroll": self.unroll,
             "zero_output_for_mask": self.zero_output_for_mask,
+            "checkpoint_every": self.checkpoint_every,
+            "compile_cell": self.compile_cell,
+            "output_stride": self.output_stride,
         }
         config["cell"] = serialization_lib.serialize_keras_object(self.cell)
         base_config = super().get_config()
@@ -473,3 +657,15 @@ class RNN(Layer):
         )
         layer = cls(cell, **config)
         return layer
+
+
+def _uses_dropout(cell):
+    """Whether `cell` or one of its sublayers draws a dropout mask"""
+    for layer in cell._flatten_layers():
+        if isinstance(layer, Dropout) and layer.rate > 0:
+            return True
+        if getattr(layer, "dropout", 0) or getattr(
+            layer, "recurrent_dropout", 0
+        ):
+            return True
+    return False
@@ -146,6 +146,50 @@ def semi_implicit_solve(f, y0, t0, dt):
     return backend.ode.semi_implicit_solve(f, y0, t0, dt)
 
 
+class AdaptiveSolve(Operation):
+    def __init__(self, method="dopri5", rtol=1e-3, atol=1e-6, max_steps=64):
+        super().__init__()
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.max_steps = max_steps
+
+    def call(self, f, y0, t0, t1):
+        return backend.ode.adaptive_solve(
+            f,
+            y0,
+            t0,
+            t1,
+            method=self.method,
+            rtol=self.rtol,
+            atol=self.atol,
+            max_steps=self.max_steps,
+        )
+
+    def compute_output_spec(self, f, y0, t0, t1):
+        return (
+            KerasTensor(y0.shape, dtype=y0.dtype),
+            KerasTensor(y0.shape[:1], dtype="int32"),
+        )
+
+
+@keras_mini_export(["ncps.mini_keras.ops.adaptive_solve", "ncps.mini_keras.ops.ode.adaptive_solve"])
+def adaptive_solve(f, y0, t0, t1, method="dopri5", rtol=1e-3, atol=1e-6, max_steps=64):
+    """Adaptive Dormand-Prince ("dopri5") or Runge-Kutta-Fehlberg ("rkf45")
+    integration from `t0` to `t1` with per-batch-element error control.
+
+    Returns the solution at `t1` and the number of function evaluations
+    spent on each batch element.
+    """
+    if any_symbolic_tensors((y0,)):
+        return AdaptiveSolve(method, rtol, atol, max_steps).symbolic_call(
+            f, y0, t0, t1
+        )
+    return backend.ode.adaptive_solve(
+        f, y0, t0, t1, method=method, rtol=rtol, atol=atol, max_steps=max_steps
+    )
+
+
 SOLVERS = {
     "euler": euler_solve,
     "heun": heun_solve,
@@ -155,3 +199,5 @@ SOLVERS = {
     "rk45": rk45_solve,
     "semi_implicit": semi_implicit_solve,
 }
+
+ADAPTIVE_SOLVERS = ("dopri5", "rkf45")
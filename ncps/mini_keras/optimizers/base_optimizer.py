@@ -447,9 +447,17 @@ class BaseOptimizer(KerasSaveable):
             # Apply gradient updates.
             self._backend_apply_gradients(grads, trainable_variables)
             # Apply variable constraints after applying gradients.
-            for variable in trainable_variables:
-                if variable.constraint is not None:
-                    variable.assign(variable.constraint(variable))
+            self._apply_constraints(trainable_variables)
+
+    def _apply_constraints(self, variables):
+        """Projects `variables` onto their constraints.
+
+        Backends that apply the constraints inside their update step
+        override it.
+        """
+        for variable in variables:
+            if variable.constraint is not None:
+                variable.assign(variable.constraint(variable))
 
     def _backend_apply_gradients(self, grads, trainable_variables):
         """Apply method that can be overridden by different backends.
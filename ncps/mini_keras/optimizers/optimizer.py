@@ -12,6 +12,10 @@ elif backend.backend() == "torch":
     )
 elif backend.backend() == "jax":
     from keras.src.backend.jax.optimizer import JaxOptimizer as BackendOptimizer
+elif backend.backend() == "mlx":
+    from ncps.mini_keras.backend.mlx.optimizers import (
+        MLXOptimizer as BackendOptimizer,
+    )
 else:
 
     class BackendOptimizer(base_optimizer.BaseOptimizer):
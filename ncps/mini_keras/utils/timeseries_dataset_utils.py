@@ -1,7 +1,10 @@
+import queue
+import threading
+
 import numpy as np
 
 from keras.src.api_export import keras_export
-from keras.src.utils.module_utils import tensorflow as tf
+from keras.src.trainers.data_adapters.py_dataset_adapter import PyDataset
 
 
 @keras_export(
@@ -21,6 +24,7 @@ def timeseries_dataset_from_array(
     seed=None,
     start_index=None,
     end_index=None,
+    prefetch_buffer_size=2,
 ):
     """Creates a dataset of sliding windows over a timeseries provided as array.
 
@@ -52,7 +56,8 @@ def timeseries_dataset_from_array(
             (except maybe the last one). If `None`, the data will not be batched
             (the dataset will yield individual samples).
         shuffle: Whether to shuffle output samples,
-            or instead draw them in chronological order.
+            or instead draw them in chronological order. The order is
+            drawn again at the end of every epoch.
         seed: Optional int; random seed for shuffling.
         start_index: Optional int; data points earlier (exclusive)
             than `start_index` will not be used
@@ -61,12 +66,19 @@ def timeseries_dataset_from_array(
         end_index: Optional int; data points later (exclusive) than `end_index`
             will not be used in the output sequences.
             This is useful to reserve part of the data for test or validation.
+        prefetch_buffer_size: Number of batches a background thread prepares
+            ahead while the dataset is iterated over. `0` prepares the batches
+            on demand.
 
     Returns:
 
-    A `tf.data.Dataset` instance. If `targets` was passed, the dataset yields
+    A `TimeseriesDataset` instance, a `keras.utils.PyDataset` that does not
+    depend on TensorFlow. If `targets` was passed, the dataset yields
     tuple `(batch_of_sequences, batch_of_targets)`. If not, the dataset yields
-    only `batch_of_sequences`.
+    only `batch_of_sequences`. The batches are NumPy arrays of shape
+    `(batch_size, sequence_length) + data.shape[1:]`, each one gathered
+    with a single vectorized indexing operation from a strided view of
+    `data`, so the windows are never materialized as a whole.
 
     Example 1:
 
@@ -193,69 +205,161 @@ def timeseries_dataset_from_array(
     if end_index is None:
         end_index = len(data)
 
-    # Determine the lowest dtype to store start positions (to lower memory
-    # usage).
     num_seqs = end_index - start_index - (sequence_length - 1) * sampling_rate
     if targets is not None:
         num_seqs = min(num_seqs, len(targets))
-    if num_seqs < 2147483647:
-        index_dtype = "int32"
-    else:
-        index_dtype = "int64"
+    # Data shorter than one window gives an empty dataset
+    num_seqs = max(num_seqs, 0)
 
     # Generate start positions
-    start_positions = np.arange(0, num_seqs, sequence_stride, dtype=index_dtype)
-    if shuffle:
-        if seed is None:
-            seed = np.random.randint(1e6)
-        rng = np.random.RandomState(seed)
-        rng.shuffle(start_positions)
-
-    sequence_length = tf.cast(sequence_length, dtype=index_dtype)
-    sampling_rate = tf.cast(sampling_rate, dtype=index_dtype)
-
-    positions_ds = tf.data.Dataset.from_tensors(start_positions).repeat()
-
-    # For each initial window position, generates indices of the window elements
-    indices = tf.data.Dataset.zip(
-        (tf.data.Dataset.range(len(start_positions)), positions_ds)
-    ).map(
-        lambda i, positions: tf.range(
-            positions[i],
-            positions[i] + sequence_length * sampling_rate,
-            sampling_rate,
-        ),
-        num_parallel_calls=tf.data.AUTOTUNE,
+    start_positions = np.arange(0, num_seqs, sequence_stride)
+    return TimeseriesDataset(
+        data,
+        targets,
+        start_positions,
+        sequence_length=sequence_length,
+        sampling_rate=sampling_rate,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        seed=seed,
+        start_index=start_index,
+        end_index=end_index,
+        prefetch_buffer_size=prefetch_buffer_size,
     )
 
-    dataset = sequences_from_indices(data, indices, start_index, end_index)
-    if targets is not None:
-        indices = tf.data.Dataset.zip(
-            (tf.data.Dataset.range(len(start_positions)), positions_ds)
-        ).map(
-            lambda i, positions: positions[i],
-            num_parallel_calls=tf.data.AUTOTUNE,
-        )
-        target_ds = sequences_from_indices(
-            targets, indices, start_index, end_index
-        )
-        dataset = tf.data.Dataset.zip((dataset, target_ds))
-    dataset = dataset.prefetch(tf.data.AUTOTUNE)
-    if batch_size is not None:
-        if shuffle:
-            # Shuffle locally at each iteration
-            dataset = dataset.shuffle(buffer_size=batch_size * 8, seed=seed)
-        dataset = dataset.batch(batch_size)
-    else:
+
+class TimeseriesDataset(PyDataset):
+    """Batches of sliding windows over a timeseries.
+
+    Returned by `timeseries_dataset_from_array`. The windows are a strided,
+    read-only view of `data[start_index:end_index]`, batch `i` gathers the
+    windows starting at `start_positions[order[i * batch_size:...]]` with one
+    indexing operation. With `shuffle`, `order` is a permutation of the
+    windows that is drawn again by `on_epoch_end`.
+
+    Iterating over the dataset runs one epoch and prepares up to
+    `prefetch_buffer_size` batches ahead in a background thread. `fit()`
+    reads the batches through `__getitem__` and prefetches them with its
+    own `workers`.
+    """
+
+    def __init__(
+        self,
+        data,
+        targets,
+        start_positions,
+        sequence_length,
+        sampling_rate=1,
+        batch_size=128,
+        shuffle=False,
+        seed=None,
+        start_index=0,
+        end_index=None,
+        prefetch_buffer_size=2,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        data = np.asarray(data)[start_index:end_index]
+        window_length = (sequence_length - 1) * sampling_rate + 1
+        if len(data) < window_length:
+            self._windows = np.empty(
+                (0, sequence_length) + data.shape[1:], dtype=data.dtype
+            )
+        else:
+            windows = np.lib.stride_tricks.sliding_window_view(
+                data, window_length, axis=0
+            )
+            # (windows, features..., window_length) -> (windows, steps, features...)
+            self._windows = np.moveaxis(windows, -1, 1)[:, ::sampling_rate]
+        self._targets = None
+        if targets is not None:
+            self._targets = np.asarray(targets)[start_index:end_index]
+        self._start_positions = start_positions
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.prefetch_buffer_size = prefetch_buffer_size
+        if shuffle and seed is None:
+            seed = np.random.randint(1e6)
+        self._rng = np.random.default_rng(seed)
+        self._order = np.arange(len(start_positions))
         if shuffle:
-            dataset = dataset.shuffle(buffer_size=1024, seed=seed)
-    return dataset
+            self._rng.shuffle(self._order)
 
+    def __len__(self):
+        if self.batch_size is None:
+            return len(self._order)
+        return -(-len(self._order) // self.batch_size)
 
-def sequences_from_indices(array, indices_ds, start_index, end_index):
-    dataset = tf.data.Dataset.from_tensors(array[start_index:end_index])
-    dataset = tf.data.Dataset.zip((dataset.repeat(), indices_ds)).map(
-        lambda steps, inds: tf.gather(steps, inds),
-        num_parallel_calls=tf.data.AUTOTUNE,
-    )
-    return dataset
+    def __getitem__(self, index):
+        if index < 0 or index >= len(self):
+            raise IndexError(
+                f"Batch index {index} is out of range for a dataset of "
+                f"{len(self)} batches"
+            )
+        if self.batch_size is None:
+            positions = self._start_positions[self._order[index]]
+        else:
+            positions = self._start_positions[
+                self._order[index * self.batch_size : (index + 1) * self.batch_size]
+            ]
+        if self._targets is None:
+            return self._windows[positions]
+        return self._windows[positions], self._targets[positions]
+
+    def __iter__(self):
+        batches = (self[index] for index in range(len(self)))
+        try:
+            if self.prefetch_buffer_size:
+                yield from _prefetch(batches, self.prefetch_buffer_size)
+            else:
+                yield from batches
+        finally:
+            self.on_epoch_end()
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._rng.shuffle(self._order)
+
+
+def _prefetch(iterator, buffer_size):
+    """Yields the items of `iterator`, produced ahead by a background thread.
+
+    The thread holds at most `buffer_size` items and stops when the consumer
+    closes the generator. Exceptions of `iterator` are raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((end, e))
+            return
+        put((end, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
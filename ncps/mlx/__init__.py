@@ -19,6 +19,8 @@ from .cfc import CfC
 from .ltc import LTC
 from .ltc_cell import LTCCell
 from .eltc_cell import EnhancedLTCCell
+from .serving import StatefulInferenceEngine
+from .ensemble import Ensemble
 #from packaging.version import parse
 
 try:
@@ -40,4 +42,4 @@ except:  # noqa: E722
 #         "ok.".format(version=tf.__version__)
 #     )
 __all__ = ["CfC", "CfCCell", "LTC", "LTCCell", "MixedMemoryRNN", "WiredCfCCell", "custom_qr", "orthogonal", "lecun_tanh",
-           "add_double_single", "mx", "EnhancedLTCCell"]
+           "add_double_single", "mx", "EnhancedLTCCell", "StatefulInferenceEngine", "Ensemble"]
@@ -15,6 +15,8 @@
 # limitations under the License.
 
 
+import warnings
+
 import ncps
 from ncps.mlx import CfCCell, MixedMemoryRNN, WiredCfCCell  # Importing custom cell implementations
 from typing import Union
@@ -37,6 +39,14 @@ class CfC(ncps.mini_keras.layers.RNN):  # Now inherits from CfCCell instead of E
         stateful: bool = False,
         unroll: bool = False,
         time_major: bool = False,
+        parallel_scan: bool = False,
+        parallel_scan_iterations: int = 32,
+        parallel_scan_tolerance: float = 1e-5,
+        fused_projection: bool = False,
+        checkpoint_every: int = None,
+        compile_cell: bool = False,
+        output_stride: int = 1,
+        output_reduction=None,
         **kwargs,
     ):
         """Applies a `Closed-form Continuous-time <https://arxiv.org/abs/2106.13898>`_ RNN to an input sequence.
@@ -62,9 +72,40 @@ class CfC(ncps.mini_keras.layers.RNN):  # Now inherits from CfCCell instead of E
         :param stateful: Whether to remember the last hidden state of the previous inference/training batch and use it as initial state for the next inference/training batch (default False)
         :param unroll: Whether to unroll the graph, i.e., may increase speed at the cost of more memory (default False)
         :param time_major: Whether the time or batch dimension is the first (0-th) dimension (default False)
+        :param parallel_scan: Whether to evaluate unmasked, regularly sampled sequences in parallel over time. The cell is linearized around the current trajectory and the resulting linear recurrence is solved with an associative scan, which is repeated until the trajectory is a fixed point. The convergence is checked on the host, so models with a parallel scan are trained without `jit_compile`. Requires mode "no_gate" or "pure" and backbone_layers=0 (default False)
+        :param parallel_scan_iterations: Maximum number of fixed-point refinements before falling back to the sequential scan (default 32)
+        :param parallel_scan_tolerance: Largest change of the trajectory between two refinements that counts as converged (default 1e-5)
+        :param fused_projection: Whether the cell computes its four projection heads with a single matmul, see `ncps.mlx.CfCCell` (default False)
+        :param checkpoint_every: If set, only the hidden state every checkpoint_every steps is kept for backpropagation and the steps in between are recomputed during the backward pass, trading compute for memory on long sequences. Applies to the sequential scan (default None)
+        :param compile_cell: Whether the steps of the sequential scan call a trace of the cell compiled with `mx.compile` instead of the cell layer, see `ncps.mini_keras.layers.RNN` (default False)
+        :param output_stride: With return_sequences, only every output_stride-th output of the sequential scan is returned (default 1)
+        :param output_reduction: A `ncps.mini_keras.backend.mlx.core.ScanReduction` that summarizes the outputs of the sequential scan on the fly when return_sequences is set, e.g. `LastOutputs(n)` or `MeanOutputs()` (default None)
         :param kwargs:
         """
         
+        if parallel_scan:
+            if isinstance(units, ncps.wirings.Wiring):
+                raise ValueError("Cannot use parallel_scan in wired mode")
+            if mixed_memory:
+                raise ValueError("Cannot use parallel_scan with mixed_memory")
+            if mode not in ["no_gate", "pure"]:
+                raise ValueError(
+                    f"parallel_scan requires mode 'no_gate' or 'pure', got '{mode}'"
+                )
+            if backbone_layers != 0:
+                raise ValueError("parallel_scan requires backbone_layers=0")
+            if checkpoint_every is not None:
+                raise ValueError("Cannot use checkpoint_every with parallel_scan")
+            if output_stride != 1 or output_reduction is not None:
+                raise ValueError(
+                    "Cannot use output_stride or output_reduction with parallel_scan"
+                )
+        self.parallel_scan = parallel_scan
+        self.parallel_scan_iterations = parallel_scan_iterations
+        self.parallel_scan_tolerance = parallel_scan_tolerance
+
+        # The cells follow the dtype policy of the layer, e.g. "mixed_float16"
+        dtype = kwargs.get("dtype")
         if isinstance(units, ncps.wirings.Wiring):
             if backbone_units is not None:
                 raise ValueError("Cannot use backbone_units in wired mode")
@@ -72,7 +113,9 @@ class CfC(ncps.mini_keras.layers.RNN):  # Now inherits from CfCCell instead of E
                 raise ValueError("Cannot use backbone_layers in wired mode")
             if backbone_dropout is not None:
                 raise ValueError("Cannot use backbone_dropout in wired mode")
-            cell = WiredCfCCell(units, mode=mode, activation=activation)
+            if fused_projection:
+                raise ValueError("Cannot use fused_projection in wired mode")
+            cell = WiredCfCCell(units, mode=mode, activation=activation, dtype=dtype)
         else:
             backbone_units = 128 if backbone_units is None else backbone_units
             backbone_layers = 1 if backbone_layers is None else backbone_layers
@@ -84,9 +127,11 @@ class CfC(ncps.mini_keras.layers.RNN):  # Now inherits from CfCCell instead of E
                 backbone_units=backbone_units,
                 backbone_layers=backbone_layers,
                 backbone_dropout=backbone_dropout,
+                fused_projection=fused_projection,
+                dtype=dtype,
             )
         if mixed_memory:
-                cell = MixedMemoryRNN(cell)
+                cell = MixedMemoryRNN(cell, dtype=dtype)
         super(CfC, self).__init__(
             cell,
             return_sequences,
@@ -95,5 +140,59 @@ class CfC(ncps.mini_keras.layers.RNN):  # Now inherits from CfCCell instead of E
             stateful,
             unroll,
             time_major,
+            checkpoint_every=checkpoint_every,
+            compile_cell=compile_cell,
+            output_stride=output_stride,
+            output_reduction=output_reduction,
             **kwargs,
         )
+        if parallel_scan:
+            # `model.compile()` falls back to eager training steps
+            self.supports_jit = False
+
+    def inner_loop(self, sequences, initial_state, mask, training=False):
+        if (
+            not self.parallel_scan
+            or mask is not None
+            or isinstance(sequences, (tuple, list))
+        ):
+            return super().inner_loop(sequences, initial_state, mask, training)
+
+        ops = ncps.mini_keras.ops
+        # Outputs are returned in processing order, as in the sequential scan
+        inputs = ops.flip(sequences, axis=1) if self.go_backwards else sequences
+        h0 = ops.expand_dims(initial_state[0], axis=1)
+
+        def combine(earlier, later):
+            # Composes h -> a1 * h + b1 followed by h -> a2 * h + b2
+            a1, b1 = earlier
+            a2, b2 = later
+            return a1 * a2, a2 * b1 + b2
+
+        hidden = ops.repeat(h0, inputs.shape[1], axis=1)
+        for _ in range(self.parallel_scan_iterations):
+            prev_hidden = ops.concatenate([h0, hidden[:, :-1]], axis=1)
+            new_hidden, jacobian = self.cell.linearize(inputs, prev_hidden)
+            # First-order model h_t = a_t * h_{t-1} + b_t around the current
+            # trajectory. The first step starts from the exact initial state,
+            # and clipping keeps the linear recurrence from blowing up.
+            a = ops.clip(jacobian, -1.0, 1.0)
+            a = ops.concatenate([ops.zeros_like(a[:, :1]), a[:, 1:]], axis=1)
+            b = new_hidden - a * prev_hidden
+            _, refined = ops.associative_scan(combine, (a, b), axis=1)
+            delta = float(ops.max(ops.abs(refined - hidden)))
+            hidden = refined
+            if delta <= self.parallel_scan_tolerance:
+                break
+        else:
+            warnings.warn(
+                f"CfC parallel scan did not converge within "
+                f"{self.parallel_scan_iterations} iterations, falling back "
+                "to the sequential scan.",
+                stacklevel=2,
+            )
+            return super().inner_loop(sequences, initial_state, mask, training)
+
+        last_output = hidden[:, -1]
+        outputs = hidden if self.return_sequences else hidden[:, -1:]
+        return last_output, outputs, [last_output]
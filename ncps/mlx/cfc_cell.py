@@ -11,9 +11,42 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
+
+import numpy as np
+
 import ncps.mini_keras
 
 
+class _FusedHead(ncps.mini_keras.layers.Layer):
+    """Weightless stand-in for the time_a/time_b Dense layers of a fused `CfCCell`.
+
+    Exposes the head's slice of the fused kernel as ``kernel`` and ``bias``, and
+    loads the Dense weights of checkpoints with separate heads into the fused kernel.
+    """
+
+    def __init__(self, weights_fn, assign_fn, **kwargs):
+        super().__init__(**kwargs)
+        self._weights_fn = weights_fn
+        self._assign_fn = assign_fn
+        self.built = True
+
+    @property
+    def kernel(self):
+        return self._weights_fn()[0]
+
+    @property
+    def bias(self):
+        return self._weights_fn()[1]
+
+    def save_own_variables(self, store):
+        pass
+
+    def load_own_variables(self, store):
+        if len(store.keys()) > 0:
+            self._assign_fn(store["0"], store["1"])
+
+
 @ncps.mini_keras.utils.register_keras_serializable(package="ncps", name="CfCCell")
 class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
     def __init__(
@@ -25,6 +58,7 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
         backbone_layers=1,
         backbone_dropout=0.1,
         sparsity_mask=None,
+        fused_projection=False,
         **kwargs,
     ):
         """A `Closed-form Continuous-time <https://arxiv.org/abs/2106.13898>`_ cell.
@@ -41,6 +75,7 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
         :param backbone_layers: Number of backbone layers (default 1)
         :param backbone_dropout: Dropout rate in the backbone layers (default 0.1)
         :param sparsity_mask: Optional sparsity mask for the weights
+        :param fused_projection: Whether to pack the ff1, ff2, time_a and time_b projections into one kernel that is applied with a single matmul. Without a backbone, the kernel is split into an input and a recurrent part, so no concatenation is needed. Checkpoints of the separate-weight layout are converted when loaded (default False)
         :param kwargs: Additional keyword arguments
         """
         super().__init__(**kwargs)
@@ -55,6 +90,8 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
         if mode not in allowed_modes:
             raise ValueError(f"Unknown mode '{mode}', valid options are {str(allowed_modes)}")
         self.mode = mode
+        self.fused_projection = fused_projection
+        self._num_heads = 1 if mode == "pure" else 4
         self.backbone_fn = None
         self._activation = ncps.mini_keras.activations.get(activation)
         self._backbone_units = backbone_units
@@ -76,14 +113,21 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
         if self._backbone_layers > 0:
             backbone_layers = []
             for i in range(self._backbone_layers):
-                backbone_layers.append(ncps.mini_keras.layers.Dense(self._backbone_units, self._activation, name=f"backbone{i}"))
-                backbone_layers.append(ncps.mini_keras.layers.Dropout(self._backbone_dropout))
+                backbone_layers.append(ncps.mini_keras.layers.Dense(self._backbone_units, self._activation, name=f"backbone{i}", dtype=self.dtype_policy))
+                backbone_layers.append(ncps.mini_keras.layers.Dropout(self._backbone_dropout, dtype=self.dtype_policy))
                 
             self.backbone_fn = ncps.mini_keras.models.Sequential(backbone_layers)
             self.backbone_fn.build((None, self.state_size + input_dim))
             cat_shape = int(self._backbone_units)
         else:
             cat_shape = int(self.state_size + input_dim)
+        self._input_dim = input_dim
+        self._cat_shape = cat_shape
+
+        if self.fused_projection:
+            self._build_fused(input_dim, cat_shape)
+            self.built = True
+            return
 
         self.ff1_kernel = self.add_weight(
             shape=(cat_shape, self.state_size), 
@@ -119,8 +163,8 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
                 name="ff2_bias", 
             )
 
-            self.time_a = ncps.mini_keras.layers.Dense(self.state_size, name="time_a")
-            self.time_b = ncps.mini_keras.layers.Dense(self.state_size, name="time_b")
+            self.time_a = ncps.mini_keras.layers.Dense(self.state_size, name="time_a", dtype=self.dtype_policy)
+            self.time_b = ncps.mini_keras.layers.Dense(self.state_size, name="time_b", dtype=self.dtype_policy)
             input_shape = (None, self.state_size + input_dim)
             if self._backbone_layers > 0:
                 input_shape = self.backbone_fn.output_shape
@@ -128,6 +172,162 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
             self.time_b.build(input_shape)
         self.built = True
 
+    def _build_fused(self, input_dim, cat_shape):
+        units = self.state_size
+        # Every head is initialized like its separate counterpart
+        glorot = ncps.mini_keras.initializers.GlorotUniform()
+        kernel = np.concatenate(
+            [np.asarray(glorot((cat_shape, units))) for _ in range(self._num_heads)],
+            axis=1,
+        )
+
+        def constant(value):
+            return lambda shape, dtype=None: value
+
+        if self._backbone_layers > 0:
+            self.kernel = self.add_weight(
+                shape=kernel.shape,
+                initializer=constant(kernel),
+                name="kernel",
+            )
+        else:
+            self.input_kernel = self.add_weight(
+                shape=(input_dim, kernel.shape[1]),
+                initializer=constant(kernel[:input_dim]),
+                name="input_kernel",
+            )
+            self.recurrent_kernel = self.add_weight(
+                shape=(units, kernel.shape[1]),
+                initializer=constant(kernel[input_dim:]),
+                name="recurrent_kernel",
+            )
+        self.bias = self.add_weight(
+            shape=(kernel.shape[1],),
+            initializer="zeros",
+            name="bias",
+        )
+        self._fused_mask = None
+        if self.sparsity_mask is not None:
+            # The mask applies to ff1 and ff2, but not to the time heads
+            mask = np.asarray(self.sparsity_mask, dtype=np.float32)
+            heads = [mask] * min(self._num_heads, 2) + [np.ones_like(mask)] * (
+                self._num_heads - 2
+            )
+            mask = np.concatenate(heads, axis=1)
+            self._fused_mask = (
+                ncps.mini_keras.ops.convert_to_tensor(
+                    mask[:input_dim], dtype=self.compute_dtype
+                ),
+                ncps.mini_keras.ops.convert_to_tensor(
+                    mask[input_dim:], dtype=self.compute_dtype
+                ),
+            )
+
+        if self.mode == "pure":
+            self.w_tau = self.add_weight(
+                shape=(1, self.state_size),
+                initializer=ncps.mini_keras.initializers.Zeros(),
+                name="w_tau",
+            )
+            self.A = self.add_weight(
+                shape=(1, self.state_size),
+                initializer=ncps.mini_keras.initializers.Ones(),
+                name="A",
+            )
+        else:
+            self.time_a = _FusedHead(
+                functools.partial(self._head_weights, 2),
+                functools.partial(self._assign_head, 2),
+                name="time_a",
+            )
+            self.time_b = _FusedHead(
+                functools.partial(self._head_weights, 3),
+                functools.partial(self._assign_head, 3),
+                name="time_b",
+            )
+
+    def _fused_heads(self, inputs, hidden):
+        ops = ncps.mini_keras.ops
+        if self._backbone_layers > 0:
+            x = self.backbone_fn(ops.concatenate([inputs, hidden], axis=-1))
+            projected = ops.matmul(x, self.kernel)
+        else:
+            input_kernel, recurrent_kernel = self.input_kernel, self.recurrent_kernel
+            if self._fused_mask is not None:
+                input_kernel = input_kernel * self._fused_mask[0]
+                recurrent_kernel = recurrent_kernel * self._fused_mask[1]
+            projected = ops.matmul(inputs, input_kernel) + ops.matmul(
+                hidden, recurrent_kernel
+            )
+        return ops.split(projected + self.bias, self._num_heads, axis=-1)
+
+    def _head_weights(self, index):
+        """Kernel of shape (cat_shape, units) and bias of head ``index`` (ff1, ff2, time_a, time_b) with the sparsity mask applied"""
+        ops = ncps.mini_keras.ops
+        if not self.fused_projection:
+            if index < 2:
+                kernel = getattr(self, f"ff{index + 1}_kernel")
+                bias = getattr(self, f"ff{index + 1}_bias")
+            else:
+                head = self.time_a if index == 2 else self.time_b
+                kernel, bias = head.kernel, head.bias
+            if index < 2 and self.sparsity_mask is not None:
+                kernel = self._masked(kernel)
+            return ops.convert_to_tensor(kernel), ops.convert_to_tensor(bias)
+
+        columns = slice(index * self.state_size, (index + 1) * self.state_size)
+        if self._backbone_layers > 0:
+            kernel = ops.convert_to_tensor(self.kernel)
+        else:
+            input_kernel = ops.convert_to_tensor(self.input_kernel)
+            recurrent_kernel = ops.convert_to_tensor(self.recurrent_kernel)
+            if self._fused_mask is not None:
+                input_kernel = input_kernel * self._fused_mask[0]
+                recurrent_kernel = recurrent_kernel * self._fused_mask[1]
+            kernel = ops.concatenate([input_kernel, recurrent_kernel], axis=0)
+        return kernel[:, columns], ops.convert_to_tensor(self.bias)[columns]
+
+    def _masked(self, kernel):
+        """``kernel`` times the sparsity mask, which is cast to the dtype of the (autocast) kernel"""
+        ops = ncps.mini_keras.ops
+        kernel = ops.convert_to_tensor(kernel)
+        return kernel * ops.cast(self.sparsity_mask, kernel.dtype)
+
+    def _assign_head(self, index, kernel, bias):
+        """Writes the weights of a separate head into its slice of the fused kernel"""
+        columns = slice(index * self.state_size, (index + 1) * self.state_size)
+        kernel = np.asarray(kernel)
+        if self._backbone_layers > 0:
+            parts = [(self.kernel, kernel)]
+        else:
+            input_dim = self.input_kernel.shape[0]
+            parts = [
+                (self.input_kernel, kernel[:input_dim]),
+                (self.recurrent_kernel, kernel[input_dim:]),
+            ]
+        for variable, value in parts + [(self.bias, np.asarray(bias))]:
+            updated = np.array(variable)
+            updated[..., columns] = value
+            variable.assign(updated)
+
+    def load_own_variables(self, store):
+        own_variables = self._trainable_variables + self._non_trainable_variables
+        if (
+            self.fused_projection
+            and len(store.keys()) > 0
+            and tuple(store["0"].shape) != tuple(own_variables[0].shape)
+        ):
+            # Checkpoint of the separate-weight layout: ff1 and ff2 are own
+            # weights of the cell, time_a and time_b are loaded by the heads
+            self._assign_head(0, store["0"], store["1"])
+            if self.mode == "pure":
+                self.w_tau.assign(store["2"])
+                self.A.assign(store["3"])
+            else:
+                self._assign_head(1, store["2"], store["3"])
+            return
+        super().load_own_variables(store)
+
     def call(self, inputs, states, **kwargs):
         if isinstance(inputs, (tuple, list)):
             # Irregularly sampled mode
@@ -136,38 +336,149 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
         else:
             # Regularly sampled mode (elapsed time = 1 second)
              t = kwargs.get("time") or 1.0
-        x = ncps.mini_keras.layers.Concatenate()([inputs, states[0]])
+        if self.fused_projection:
+            heads = self._fused_heads(inputs, states[0])
+        else:
+            x = ncps.mini_keras.ops.concatenate([inputs, states[0]], axis=-1)
+            if self._backbone_layers > 0:
+                x = self.backbone_fn(x)
+            heads = self._separate_heads(x)
+        new_hidden = self._solution(heads, t)
+        return new_hidden, [new_hidden]
+
+    def project_inputs(self, inputs):
+        """Input-side part of the first affine map of the cell for inputs of shape (..., input_dim).
+
+        The first map is the first backbone layer, or the projection heads when
+        there is no backbone. Its input rows and bias do not depend on the state,
+        so an RNN layer applies them to a whole sequence with one matmul before the
+        recurrence and advances the cell with :meth:`call_projected`.
+        """
+        ops = ncps.mini_keras.ops
         if self._backbone_layers > 0:
-            x = self.backbone_fn(x)
+            first = self.backbone_fn.layers[0]
+            kernel = ops.convert_to_tensor(first.kernel)[: self._input_dim]
+            return ops.matmul(inputs, kernel) + first.bias
+        if self.fused_projection:
+            input_kernel = self.input_kernel
+            if self._fused_mask is not None:
+                input_kernel = input_kernel * self._fused_mask[0]
+            return ops.matmul(inputs, input_kernel) + self.bias
+        kernels, biases = zip(*[self._head_weights(i) for i in range(self._num_heads)])
+        kernel = ops.concatenate([k[: self._input_dim] for k in kernels], axis=1)
+        return ops.matmul(inputs, kernel) + ops.concatenate(biases, axis=0)
+
+    def call_projected(self, projected, states, **kwargs):
+        """Advances the cell by one regularly sampled step from the output of :meth:`project_inputs`"""
+        ops = ncps.mini_keras.ops
+        hidden = states[0]
+        if self._backbone_layers > 0:
+            first, *rest = self.backbone_fn.layers
+            recurrent_kernel = ops.convert_to_tensor(first.kernel)[self._input_dim :]
+            x = first.activation(projected + ops.matmul(hidden, recurrent_kernel))
+            for layer in rest:
+                x = layer(x)
+            if self.fused_projection:
+                heads = ops.split(
+                    ops.matmul(x, self.kernel) + self.bias, self._num_heads, axis=-1
+                )
+            else:
+                heads = self._separate_heads(x)
+        elif self.fused_projection:
+            recurrent_kernel = self.recurrent_kernel
+            if self._fused_mask is not None:
+                recurrent_kernel = recurrent_kernel * self._fused_mask[1]
+            heads = ops.split(
+                projected + ops.matmul(hidden, recurrent_kernel),
+                self._num_heads,
+                axis=-1,
+            )
+        else:
+            heads = [
+                head + ops.matmul(hidden, self._head_weights(i)[0][self._input_dim :])
+                for i, head in enumerate(ops.split(projected, self._num_heads, axis=-1))
+            ]
+        new_hidden = self._solution(heads, kwargs.get("time") or 1.0)
+        return new_hidden, [new_hidden]
+
+    def _separate_heads(self, x):
+        """ff1, ff2, time_a and time_b (only ff1 in pure mode) of the separate-weight layout for backbone features ``x``"""
         if self.sparsity_mask is not None:
-            ff1_kernel = self.ff1_kernel * self.sparsity_mask
+            ff1_kernel = self._masked(self.ff1_kernel)
             ff1 = ncps.mini_keras.ops.matmul(x, ff1_kernel) + self.ff1_bias
         else:
             ff1 = ncps.mini_keras.ops.matmul(x, self.ff1_kernel) + self.ff1_bias
+        if self.mode == "pure":
+            return [ff1]
+        if self.sparsity_mask is not None:
+            ff2_kernel = self._masked(self.ff2_kernel)
+            ff2 = ncps.mini_keras.ops.matmul(x, ff2_kernel) + self.ff2_bias
+        else:
+            ff2 = ncps.mini_keras.ops.matmul(x, self.ff2_kernel) + self.ff2_bias
+        return [ff1, ff2, self.time_a(x), self.time_b(x)]
+
+    def _solution(self, heads, t):
+        ff1 = heads[0]
         if self.mode == "pure":
             # Solution
-            new_hidden = (
+            return (
                 -self.A
                 * ncps.mini_keras.ops.exp(-t * (ncps.mini_keras.ops.abs(self.w_tau) + ncps.mini_keras.ops.abs(ff1)))
                 * ff1
                 + self.A
             )
+        # Cfc
+        _, ff2, t_a, t_b = heads
+        t_interp = ncps.mini_keras.activations.sigmoid(-t_a * t + t_b)
+        if self.mode == "no_gate":
+            return ff1 + t_interp * ff2
+        return ff1 * (1.0 - t_interp) + t_interp * ff2
+
+    def linearize(self, inputs, prev_hidden, t=1.0):
+        """Evaluates the cell and the diagonal of its Jacobian w.r.t. the previous hidden state.
+
+        Only supported for the "no_gate" and "pure" modes without a backbone, where the
+        diagonal has a closed form. ``inputs`` and ``prev_hidden`` may carry any number of
+        leading dimensions, so a whole (batch, time) grid can be evaluated at once.
+
+        :param inputs: Input features of shape (..., input_dim)
+        :param prev_hidden: Previous hidden states of shape (..., units)
+        :param t: Elapsed time (default 1.0)
+        :return: Tuple of (new_hidden, jacobian_diagonal), both of shape (..., units)
+        """
+        ops = ncps.mini_keras.ops
+        if self.mode not in ["no_gate", "pure"] or self._backbone_layers > 0:
+            raise ValueError(
+                "Linearization is only supported for the 'no_gate' and 'pure' modes without a backbone"
+            )
+
+        def kernel_and_diagonal(index):
+            kernel, bias = self._head_weights(index)
+            # Rows of the state part of the concatenated input, paired with their own unit
+            return kernel, bias, ops.diagonal(kernel[-self.state_size :])
+
+        x = ops.concatenate([inputs, prev_hidden], axis=-1)
+        ff1_kernel, ff1_bias, ff1_diag = kernel_and_diagonal(0)
+        ff1 = ops.matmul(x, ff1_kernel) + ff1_bias
+        if self.mode == "pure":
+            decay = ops.exp(-t * (ops.abs(self.w_tau) + ops.abs(ff1)))
+            new_hidden = -self.A * decay * ff1 + self.A
+            jacobian = -self.A * decay * (1.0 - t * ops.abs(ff1)) * ff1_diag
         else:
-            # Cfc
-            if self.sparsity_mask is not None:
-                ff2_kernel = self.ff2_kernel * self.sparsity_mask
-                ff2 = ncps.mini_keras.ops.matmul(x, ff2_kernel) + self.ff2_bias
-            else:
-                ff2 = ncps.mini_keras.ops.matmul(x, self.ff2_kernel) + self.ff2_bias
-            t_a = self.time_a(x)
-            t_b = self.time_b(x)
+            ff2_kernel, ff2_bias, ff2_diag = kernel_and_diagonal(1)
+            ff2 = ops.matmul(x, ff2_kernel) + ff2_bias
+            time_a_kernel, time_a_bias, time_a_diag = kernel_and_diagonal(2)
+            time_b_kernel, time_b_bias, time_b_diag = kernel_and_diagonal(3)
+            t_a = ops.matmul(x, time_a_kernel) + time_a_bias
+            t_b = ops.matmul(x, time_b_kernel) + time_b_bias
             t_interp = ncps.mini_keras.activations.sigmoid(-t_a * t + t_b)
-            if self.mode == "no_gate":
-                new_hidden = ff1 + t_interp * ff2
-            else:
-                new_hidden = ff1 * (1.0 - t_interp) + t_interp * ff2
-
-        return new_hidden, [new_hidden]
+            new_hidden = ff1 + t_interp * ff2
+            jacobian = (
+                ff1_diag
+                + t_interp * ff2_diag
+                + t_interp * (1.0 - t_interp) * (time_b_diag - t * time_a_diag) * ff2
+            )
+        return new_hidden, jacobian
 
     def get_config(self):
         config = {
@@ -178,6 +489,7 @@ class CfCCell(ncps.mini_keras.layers.AbstractRNNCell):
             "backbone_layers": self._backbone_layers,
             "backbone_dropout": self._backbone_dropout,
             "sparsity_mask": self.sparsity_mask,
+            "fused_projection": self.fused_projection,
         }
         base_config = super().get_config()
         return {**base_config, **config}
@@ -21,20 +21,23 @@ import ncps
 import ncps.mini_keras.ops.ode as ode_ops
 
 @ncps.mini_keras.utils.register_keras_serializable(package="ncps", name="EnhancedLTCCell")
-class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
+class EnhancedLTCCell(LTCCell):
     """
     Enhanced Liquid Time-Constant Cell (LTC-SE) for MLX.
 
     This class extends the LTCCell implementation by adding:
     - Configurable solvers (e.g., RK4, Euler, Semi-Implicit).
+    - Adaptive Dormand-Prince / Runge-Kutta-Fehlberg solvers with error control.
     - Sparsity constraints for adjacency matrices.
     - Flexible activation functions.
     - Modular serialization support.
 
     Attributes:
-        solver (str): Type of solver to use for ODEs ("rk4", "euler", "semi_implicit").
+        solver (str): Type of solver to use for ODEs ("rk4", "euler", "semi_implicit", "dopri5", ...).
         sparsity (float): Sparsity level for adjacency matrices (default: 0.5).
         activation (callable): Activation function to use (default: mx.tanh).
+        nfe (mx.array): Number of ODE function evaluations per batch element of the
+            last step taken with an adaptive solver (None otherwise).
     """
 
     def __init__(
@@ -49,6 +52,9 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
         forget_gate_bias=1.0,
         sparsity=0.5,
         activation=mx.tanh,
+        rtol=1e-3,
+        atol=1e-6,
+        max_steps=64,
         **kwargs,
     ):
         """
@@ -58,15 +64,31 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
             wiring (ncps.wirings.Wiring): Wiring configuration for the LTC cell.
             input_mapping (str): Input mapping type ("affine" or "linear"). Default: "affine".
             output_mapping (str): Output mapping type ("affine" or "linear"). Default: "affine".
-            solver (str): Solver type for ODE solving ("rk4", "euler", "semi_implicit"). Default: "rk4".
-            ode_unfolds (int): Number of ODE unfolds per time step. Default: 6.
+            solver (str): Solver type for ODE solving. One of the fixed-step solvers in
+                `ncps.mini_keras.ops.ode.SOLVERS` ("rk4", "euler", ...), which take `ode_unfolds`
+                steps per time step, "semi_implicit" for the fused unfolds of `LTCCell`, or an
+                adaptive solver ("dopri5", "rkf45"), which chooses its own steps per batch element
+                to meet `rtol`/`atol`. The adaptive solvers check their progress on the host,
+                so models with them are trained without `jit_compile`. Default: "rk4".
+            ode_unfolds (int): Number of ODE unfolds per time step of the fixed-step solvers. Default: 6.
             epsilon (float): Small constant to avoid division by zero. Default: 1e-8.
             initialization_ranges (dict): Ranges for parameter initialization. Default: None.
             forget_gate_bias (float): Bias for the forget gate. Default: 1.0.
             sparsity (float): Sparsity level for adjacency matrices. Default: 0.5.
             activation (callable): Activation function. Default: mx.tanh.
+            rtol (float): Relative tolerance of the adaptive solvers. Default: 1e-3.
+            atol (float): Absolute tolerance of the adaptive solvers. Default: 1e-6.
+            max_steps (int): Maximum number of steps of the adaptive solvers per time step. Default: 64.
             kwargs: Additional arguments passed to the base LTCCell.
         """
+        if solver not in ode_ops.SOLVERS and solver not in ode_ops.ADAPTIVE_SOLVERS:
+            raise ValueError(f"Unsupported solver type: {solver}")
+        if solver != "semi_implicit":
+            # The solvers evaluate the ODE right-hand side on the dense synapse tensors
+            if kwargs.setdefault("sparse_execution", False) is not False:
+                raise ValueError(
+                    f"Solver '{solver}' requires sparse_execution=False"
+                )
         super().__init__(
             wiring=wiring,
             input_mapping=input_mapping,
@@ -74,12 +96,19 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
             ode_unfolds=ode_unfolds,
             epsilon=epsilon,
             initialization_ranges=initialization_ranges,
-            forget_gate_bias=forget_gate_bias,
             **kwargs,
         )
         self.solver = solver
+        if solver in ode_ops.ADAPTIVE_SOLVERS:
+            # `model.compile()` falls back to eager training steps
+            self.supports_jit = False
+        self.forget_gate_bias = forget_gate_bias
         self.sparsity = sparsity
         self.activation = activation
+        self.rtol = rtol
+        self.atol = atol
+        self.max_steps = max_steps
+        self.nfe = None
 
         # Apply sparsity to the adjacency matrix
         self._apply_sparsity()
@@ -97,10 +126,10 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
 
     def ode_solver(self, f, y0, t0, dt):
         """
-        Solve ODEs using the configured solver.
+        Take one step with the configured fixed-step solver.
 
         Args:
-            f (callable): Function representing the ODE (dy/dt = f(y, t)).
+            f (callable): Function representing the ODE (dy/dt = f(t, y)).
             y0 (mx.array): Initial state.
             t0 (float): Initial time.
             dt (float): Time step size.
@@ -108,91 +137,76 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
         Returns:
             mx.array: Updated state after one time step.
         """
-        if self.solver == "rk4":
-            return ode_ops.rk4_solve(f, y0, t0, dt)
-        elif self.solver == "euler":
-            return ode_ops.euler_solve(f, y0, t0, dt)
-        elif self.solver == "semi_implicit":
-            return ode_ops.semi_implicit_solve(f, y0, dt)
-        else:
-            raise ValueError(f"Unsupported solver type: {self.solver}")
-
-    def _ode_solver(self, inputs, state, elapsed_time):
+        return ode_ops.SOLVERS[self.solver](f, y0, t0, dt)
+
+    def _derivative(self, w_numerator_sensory, w_denominator_sensory):
         """
-        Solve the ODEs with enhanced solvers.
+        Right-hand side of the LTC ODE for the given sensory contributions.
+
+        cm * dv/dt = gleak * (vleak - v) + sum_j w_j * sigmoid_j(v) * (erev_j - v)
 
         Args:
-            inputs (mx.array): Input tensor.
-            state (mx.array): Current state tensor.
-            elapsed_time (float): Time elapsed since the last step.
+            w_numerator_sensory (mx.array): Sensory contribution to sum_j w_j * sigmoid_j * erev_j.
+            w_denominator_sensory (mx.array): Sensory contribution to sum_j w_j * sigmoid_j.
 
         Returns:
-            mx.array: Updated state tensor.
+            callable: f(t, v) returning dv/dt.
         """
-        v_pre = state
-
-        # Precompute sensory neuron effects
-        sensory_w_activation = self._params["sensory_w"] * self._sigmoid(
-            inputs, self._params["sensory_mu"], self._params["sensory_sigma"]
-        )
-        sensory_w_activation *= self._params["sensory_sparsity_mask"]
-
-        sensory_rev_activation = sensory_w_activation * self._params["sensory_erev"]
+        params = self._tensor_params()
 
-        w_numerator_sensory = mx.sum(sensory_rev_activation, axis=1)
-        w_denominator_sensory = mx.sum(sensory_w_activation, axis=1)
+        def f(_, v_pre):
+            w_activation = params["w"] * self._sigmoid(v_pre, params["mu"], params["sigma"])
+            w_activation *= params["sparsity_mask"]
 
-        cm_t = self._params["cm"] / (elapsed_time / self._ode_unfolds)
+            w_numerator = mx.sum(w_activation * params["erev"], axis=1) + w_numerator_sensory
+            w_denominator = mx.sum(w_activation, axis=1) + w_denominator_sensory
 
-        # ODE unfolds
-        for _ in range(self._ode_unfolds):
-            def f(_, v_pre):
-                w_activation = self._params["w"] * self._sigmoid(v_pre, self._params["mu"], self._params["sigma"])
-                w_activation *= self._params["sparsity_mask"]
-
-                rev_activation = w_activation * self._params["erev"]
-                w_numerator = mx.sum(rev_activation, axis=1) + w_numerator_sensory
-                w_denominator = mx.sum(w_activation, axis=1) + w_denominator_sensory
-
-                numerator = cm_t * v_pre + self._params["gleak"] * self._params["vleak"] + w_numerator
-                denominator = cm_t + self._params["gleak"] + w_denominator
-
-                return numerator / (denominator + self._epsilon)
-
-            v_pre = self.ode_solver(f, v_pre, 0, 1.0 / self._ode_unfolds)
-
-        return v_pre
-
-    def call(self, inputs, states):
-        """
-        Call the EnhancedLTCCell with the given inputs and states.
+            leak = params["gleak"] * (params["vleak"] - v_pre)
+            return (leak + w_numerator - v_pre * w_denominator) / params["cm"]
 
-        Args:
-            inputs (mx.array): Input tensor.
-            states (list): List of state tensors.
+        return f
 
-        Returns:
-            tuple: Output tensor and updated states.
-        """
-        if self.solver == "rk4":
-            return self._solve_rk4(inputs, states)
-        elif self.solver == "euler":
-            return self._solve_euler(inputs, states)
-        else:
-            return self._solve_euler(inputs, states)
-
-    def __call__(self, inputs, states):
+    def _ode_solver(
+        self, state, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
         """
-        Make the cell callable.
+        Solve the ODEs with enhanced solvers.
 
         Args:
-            inputs (mx.array): Input tensor.
-            states (list): List of state tensors.
+            state (mx.array): Current state tensor.
+            elapsed_time (float or mx.array): Time elapsed since the last step.
+            w_numerator_sensory (mx.array): Sensory numerator sums, see `LTCCell._sensory_sums`.
+            w_denominator_sensory (mx.array): Sensory denominator sums.
 
         Returns:
-            tuple: Output tensor and updated states.
+            mx.array: Updated state tensor.
         """
-        return self.call(inputs, states)
+        if self.solver == "semi_implicit":
+            return super()._ode_solver(
+                state, elapsed_time, w_numerator_sensory, w_denominator_sensory
+            )
+        f = self._derivative(w_numerator_sensory, w_denominator_sensory)
+
+        if self.solver in ode_ops.ADAPTIVE_SOLVERS:
+            if isinstance(elapsed_time, mx.array):
+                # One interval per batch element
+                elapsed_time = mx.reshape(elapsed_time, (-1,))
+            state, self.nfe = ode_ops.adaptive_solve(
+                f,
+                state,
+                0.0,
+                elapsed_time,
+                method=self.solver,
+                rtol=self.rtol,
+                atol=self.atol,
+                max_steps=self.max_steps,
+            )
+            return state
+
+        dt = elapsed_time / self._ode_unfolds
+        for _ in range(self._ode_unfolds):
+            state = self.ode_solver(f, state, 0, dt)
+        return state
 
     def get_config(self):
         """
@@ -206,24 +220,8 @@ class EnhancedLTCCell(ncps.mini_keras.layers.Layer, LTCCell):
             "solver": self.solver,
             "sparsity": self.sparsity,
             "activation": self.activation,
+            "rtol": self.rtol,
+            "atol": self.atol,
+            "max_steps": self.max_steps,
         })
         return config
-
-    @classmethod
-    def from_config(cls, config):
-        """
-        Reconstructs an EnhancedLTCCell from its serialized configuration.
-
-        Args:
-            config (dict): Serialized configuration.
-
-        Returns:
-            EnhancedLTCCell: Reconstructed EnhancedLTCCell instance.
-        """
-        base_config = LTCCell.from_config(config)
-        return cls(
-            **base_config,
-            solver=config["solver"],
-            sparsity=config["sparsity"],
-            activation=config["activation"],
-        )
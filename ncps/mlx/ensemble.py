@@ -0,0 +1,256 @@
+# Copyright 2022 Mathias Lechner and Ramin Hasani
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+
+import ncps
+import mlx.core as mx
+import numpy as np
+from ncps.mini_keras import tree
+from ncps.mini_keras.utils import tracking
+
+
+def _constant_slots(layer):
+    """(owner, key) pairs of the arrays the sublayers of ``layer`` keep outside of their variables.
+
+    These are the sparsity masks of the wiring, e.g. the ``sparsity_mask`` entries
+    of `ncps.mlx.LTCCell` and the ``sparsity_mask`` of `ncps.mlx.CfCCell`. The
+    owner is a dict for item keys and a layer for attribute names.
+    """
+    slots = []
+    for sublayer in layer._flatten_layers():
+        if getattr(sublayer, "is_sparse", False):
+            raise ValueError(
+                "Ensemble members cannot evaluate their synapses over an edge list, "
+                "build LTC members with sparse_execution=False or 'blocks'"
+            )
+        params = getattr(sublayer, "_params", None)
+        if isinstance(params, dict):
+            slots.extend(
+                (params, key)
+                for key, value in params.items()
+                if not isinstance(value, ncps.mini_keras.backend.Variable)
+            )
+        for name in ["sparsity_mask", "_fused_mask"]:
+            if getattr(sublayer, name, None) is not None:
+                slots.append((sublayer, name))
+    return slots
+
+
+def _get_slot(owner, key):
+    return owner[key] if isinstance(owner, dict) else getattr(owner, key)
+
+
+def _set_slot(owner, key, value):
+    if isinstance(owner, dict):
+        owner[key] = value
+    else:
+        object.__setattr__(owner, key, value)
+
+
+@contextlib.contextmanager
+def _bound_constants(slots, values):
+    """Temporarily replaces the arrays in ``slots`` by ``values``"""
+    originals = [_get_slot(owner, key) for owner, key in slots]
+    for (owner, key), value in zip(slots, values):
+        _set_slot(owner, key, value)
+    try:
+        yield
+    finally:
+        for (owner, key), value in zip(slots, originals):
+            _set_slot(owner, key, value)
+
+
+@ncps.mini_keras.saving.register_keras_serializable(package="ncps", name="Ensemble")
+class Ensemble(ncps.mini_keras.layers.Layer):
+    def __init__(self, members, shared_inputs=True, **kwargs):
+        """Runs K identically shaped recurrent layers as one batched recurrence.
+
+        The variables of the members are stacked along a leading member axis and
+        the first member is evaluated for all K parameter sets at once with
+        `mx.vmap`, so the Python loop over time and the kernel dispatches are
+        shared by the whole ensemble. Arrays that a member keeps outside of its
+        variables, such as the sparsity masks of its wiring, are stacked too, so
+        members may use different wirings of the same shape (e.g. `ncps.wirings.AutoNCP`
+        with different seeds). The stacked variables are the weights of the
+        ensemble and are trained like any other layer, the members keep their
+        own weights until :meth:`update_members` is called.
+
+        Outputs get a member axis right after the batch axis, e.g. a
+        `ncps.mlx.CfC` with ``return_sequences=True`` produces (B, K, T, units).
+
+        Examples::
+
+             >>> import ncps
+             >>> from ncps.mlx import LTCCell, Ensemble
+             >>>
+             >>> members = [
+             ...     ncps.mini_keras.layers.RNN(
+             ...         LTCCell(ncps.wirings.AutoNCP(16, 2, seed=seed), sparse_execution=False)
+             ...     )
+             ...     for seed in range(32)
+             ... ]
+             >>> ensemble = Ensemble(members)
+             >>> y = ensemble(mx.random.uniform(shape=(8, 20, 4)))  # (8, 32, 2)
+
+        .. Note::
+            The members are traced by `mx.vmap`, so they cannot synchronize with
+            the host during a call. This excludes the adaptive solvers of
+            `ncps.mlx.EnhancedLTCCell`, the exponential integrator of
+            `ncps.mlx.LTCCell` on irregularly sampled inputs, the edge-list
+            execution of `ncps.mlx.LTCCell` and dropout.
+
+        :param members: Recurrent layers (e.g. `ncps.mlx.CfC`, `ncps.mlx.LTC`) with variables of identical shapes
+        :param shared_inputs: Whether all members see the same inputs of shape (B, ...). If False, the inputs have a member axis right after the batch axis (default True)
+        :param kwargs:
+        """
+        super().__init__(**kwargs)
+        if len(members) == 0:
+            raise ValueError("An ensemble needs at least one member")
+        self.shared_inputs = shared_inputs
+        self._set_members(members)
+
+    @tracking.no_automatic_dependency_tracking
+    def _set_members(self, members, slots=None, constants=None):
+        # Neither the members nor their sublayers are tracked, their variables
+        # are not the ensemble's
+        self._members = list(members)
+        self._slots = slots
+        self._constants = constants
+
+    @property
+    def members(self):
+        return list(self._members)
+
+    @property
+    def num_members(self):
+        return len(self._members)
+
+    def build(self, input_shape):
+        if not self.shared_inputs:
+            input_shape = tree.map_shape_structure(
+                lambda shape: tuple(shape[:1]) + tuple(shape[2:]), input_shape
+            )
+        for member in self._members:
+            if not member.built:
+                member.build(input_shape)
+
+        template = self._members[0]
+        slots = [_constant_slots(member) for member in self._members]
+
+        def layout(member, member_slots):
+            return (
+                [tuple(v.shape) for v in member.trainable_variables],
+                [tuple(v.shape) for v in member.non_trainable_variables],
+                [
+                    tree.map_structure(
+                        lambda value: tuple(np.shape(value)), _get_slot(*slot)
+                    )
+                    for slot in member_slots
+                ],
+                [
+                    getattr(sublayer, "synapse_blocks", None)
+                    for sublayer in member._flatten_layers()
+                ],
+            )
+
+        template_layout = layout(template, slots[0])
+        for member, member_slots in zip(self._members[1:], slots[1:]):
+            if layout(member, member_slots) != template_layout:
+                raise ValueError(
+                    "All ensemble members must have variables, sparsity masks and "
+                    "synapse blocks of identical shapes"
+                )
+
+        def constant(value):
+            return lambda shape=None, dtype=None: np.copy(value)
+
+        ops = ncps.mini_keras.ops
+        self._stacked_variables = []
+        for index, variable in enumerate(
+            template.trainable_variables + template.non_trainable_variables
+        ):
+            values = [
+                ops.convert_to_numpy(
+                    (member.trainable_variables + member.non_trainable_variables)[index]
+                )
+                for member in self._members
+            ]
+            self._stacked_variables.append(
+                self.add_weight(
+                    shape=(self.num_members,) + tuple(variable.shape),
+                    initializer=constant(np.stack(values)),
+                    dtype=variable.dtype,
+                    trainable=variable.trainable,
+                    name=variable.name,
+                )
+            )
+        constants = [
+            tree.map_structure(
+                lambda *values: mx.stack([mx.array(v) for v in values]),
+                *[_get_slot(*member_slots[i]) for member_slots in slots],
+            )
+            for i in range(len(slots[0]))
+        ]
+        self._set_members(self._members, slots[0], constants)
+        self.built = True
+
+    def call(self, inputs, training=None):
+        template = self._members[0]
+        num_trainable = len(template.trainable_variables)
+        stacked = [
+            ncps.mini_keras.ops.convert_to_tensor(v) for v in self._stacked_variables
+        ]
+
+        def member_call(trainable, non_trainable, constants, inputs):
+            with _bound_constants(self._slots, constants):
+                return template.stateless_call(
+                    trainable, non_trainable, inputs, training=training
+                )
+
+        outputs, non_trainable = mx.vmap(
+            member_call,
+            in_axes=(0, 0, 0, None if self.shared_inputs else 1),
+            out_axes=(1, 0),
+        )(stacked[:num_trainable], stacked[num_trainable:], self._constants, inputs)
+        # e.g. the states of stateful members
+        for variable, value in zip(self._stacked_variables[num_trainable:], non_trainable):
+            variable.assign(value)
+        return outputs
+
+    def update_members(self):
+        """Writes the stacked weights back into the members, e.g. to save or serve a single member"""
+        for index, stacked in enumerate(self._stacked_variables):
+            value = ncps.mini_keras.ops.convert_to_tensor(stacked)
+            for k, member in enumerate(self._members):
+                (member.trainable_variables + member.non_trainable_variables)[
+                    index
+                ].assign(value[k])
+
+    def get_config(self):
+        config = super().get_config()
+        config["members"] = [
+            ncps.mini_keras.saving.serialize_keras_object(member)
+            for member in self._members
+        ]
+        config["shared_inputs"] = self.shared_inputs
+        return config
+
+    @classmethod
+    def from_config(cls, config):
+        members = [
+            ncps.mini_keras.saving.deserialize_keras_object(member)
+            for member in config.pop("members")
+        ]
+        return cls(members=members, **config)
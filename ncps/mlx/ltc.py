@@ -57,6 +57,14 @@ class LTC(ncps.mini_keras.layers.RNN):  # Change from RNN to RNNBase
         stateful: bool = False,
         unroll: bool = False,
         time_major: bool = False,
+        checkpoint_every: int = None,
+        compile_cell: bool = False,
+        output_stride: int = 1,
+        output_reduction=None,
+        integrator="semi_implicit",
+        substep_size=0.5,
+        max_substeps=32,
+        implicit_param_constraints=False,
         **kwargs,
     ):
         """
@@ -76,6 +84,14 @@ class LTC(ncps.mini_keras.layers.RNN):  # Change from RNN to RNNBase
             stateful: Whether to remember the last hidden state of the previous inference/training batch and use it as initial state for the next inference/training batch (default False)
             unroll: Whether to unroll the graph, i.e., may increase speed at the cost of more memory (default False)
             time_major: Whether the time or batch dimension is the first (0-th) dimension (default False)
+            checkpoint_every: If set, only the hidden state every checkpoint_every steps is kept for backpropagation and the ODE unfolds of the steps in between are recomputed during the backward pass, trading compute for memory on long sequences (default None)
+            compile_cell: Whether the steps call a trace of the cell compiled with `mx.compile` instead of the cell layer, see `ncps.mini_keras.layers.RNN` (default False)
+            output_stride: With return_sequences, only every output_stride-th output is returned (default 1)
+            output_reduction: A `ncps.mini_keras.backend.mlx.core.ScanReduction` that summarizes the outputs on the fly when return_sequences is set, e.g. `LastOutputs(n)` or `MeanOutputs()` (default None)
+            integrator: "semi_implicit" runs ode_unfolds semi-implicit Euler steps per time-step, "exponential" applies the exact exponential update with frozen synaptic conductances over substeps chosen per sample from the elapsed time (default "semi_implicit")
+            substep_size: Longest substep of the exponential integrator (default 0.5)
+            max_substeps: Upper bound on the number of substeps per sample of the exponential integrator (default 32)
+            implicit_param_constraints: Whether the non-negative parameters of the cell are passed through a softplus instead of being projected by constraints after every optimizer step, see `ncps.mlx.LTCCell` (default False)
             kwargs: Additional arguments.
         """
 
@@ -91,6 +107,10 @@ class LTC(ncps.mini_keras.layers.RNN):  # Change from RNN to RNNBase
             ode_unfolds=ode_unfolds,
             epsilon=epsilon,
             initialization_ranges=initialization_ranges,
+            integrator=integrator,
+            substep_size=substep_size,
+            max_substeps=max_substeps,
+            implicit_param_constraints=implicit_param_constraints,
             **kwargs,
         )
         if mixed_memory:
@@ -103,5 +123,9 @@ class LTC(ncps.mini_keras.layers.RNN):  # Change from RNN to RNNBase
             stateful,
             unroll,
             time_major,
+            checkpoint_every=checkpoint_every,
+            compile_cell=compile_cell,
+            output_stride=output_stride,
+            output_reduction=output_reduction,
             **kwargs,
         )
@@ -12,9 +12,237 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import math
+
 from ncps import wirings
 import ncps
-import mlx as mx
+import mlx.core as mx
+import numpy as np
+
+
+def _dense_synapse_sums(v_pre, mu_t, sigma_t, w_stacked):
+    """Numerator and denominator sums of the recurrent synapses, each of shape (B, N_post).
+
+    ``mu_t`` and ``sigma_t`` are laid out as (N_post, 1, N_pre) and
+    ``w_stacked`` as (N_post, N_pre, 2), holding the loop-invariant
+    ``w * erev * sparsity_mask`` and ``w * sparsity_mask`` products. A single
+    (N_post, B, N_pre) sigmoid activation is materialized and reduced against
+    both synapse weightings with one batched matmul. Both are evaluated in the
+    dtype of the synapse weights, the sums are returned in the dtype of
+    ``v_pre``.
+    """
+    activation = mx.sigmoid(sigma_t * (v_pre.astype(sigma_t.dtype) - mu_t))
+    w_sums = (activation @ w_stacked).astype(v_pre.dtype)
+    return mx.transpose(w_sums[..., 0]), mx.transpose(w_sums[..., 1])
+
+
+def _ode_unfolds(
+    v_pre,
+    mu_t,
+    sigma_t,
+    w_stacked,
+    cm_t,
+    numerator_const,
+    denominator_const,
+    ode_unfolds,
+):
+    """Fused semi-implicit Euler unfolds of the LTC ODE.
+
+    The synapse weights are laid out as in `_dense_synapse_sums`.
+    """
+    for _ in range(ode_unfolds):
+        w_numerator, w_denominator = _dense_synapse_sums(
+            v_pre, mu_t, sigma_t, w_stacked
+        )
+        v_pre = (cm_t * v_pre + numerator_const + w_numerator) / (
+            denominator_const + w_denominator
+        )
+    return v_pre
+
+
+# The potentials and the numerator and denominator sums of the ODE updates are
+# kept in float32 under every dtype policy, only the synapse activations are
+# evaluated in the compute dtype
+_ACCUMULATION_DTYPE = mx.float32
+
+# Above this fraction of existing synapses the dense (N_post, B, N_pre)
+# formulation is faster than gathering and scattering over the edge list
+_SPARSE_DENSITY_THRESHOLD = 0.25
+
+
+def _segment_sum(values, segment_ids, num_segments):
+    """Sums ``values`` (B, E, ...) over axis 1 into ``num_segments`` bins."""
+    out = mx.zeros(
+        (values.shape[0], num_segments) + tuple(values.shape[2:]), dtype=values.dtype
+    )
+    return out.at[:, segment_ids].add(values)
+
+
+def _sparse_synapse_sums(v_pre, src, dest, mu, sigma, w_stacked):
+    """Numerator and denominator sums of the recurrent synapses over an edge list.
+
+    ``src`` and ``dest`` index the E existing synapses, ``mu`` and ``sigma``
+    have shape (E,) and ``w_stacked`` (E, 2) holds ``w * erev`` and ``w``. The
+    presynaptic potentials are gathered, one (B, E) sigmoid is evaluated and
+    both synapse weightings are segment-summed into the postsynaptic neurons.
+    The segment sums accumulate in the dtype of ``v_pre``.
+    """
+    activation = mx.sigmoid(sigma * (v_pre[:, src].astype(sigma.dtype) - mu))
+    w_sums = _segment_sum(
+        (mx.expand_dims(activation, -1) * w_stacked).astype(v_pre.dtype),
+        dest,
+        v_pre.shape[-1],
+    )
+    return w_sums[..., 0], w_sums[..., 1]
+
+
+def _sparse_ode_unfolds(
+    v_pre,
+    src,
+    dest,
+    mu,
+    sigma,
+    w_stacked,
+    cm_t,
+    numerator_const,
+    denominator_const,
+    ode_unfolds,
+):
+    """Semi-implicit Euler unfolds of the LTC ODE over a synapse edge list.
+
+    The synapse weights are laid out as in `_sparse_synapse_sums`.
+    """
+    for _ in range(ode_unfolds):
+        w_numerator, w_denominator = _sparse_synapse_sums(
+            v_pre, src, dest, mu, sigma, w_stacked
+        )
+        v_pre = (cm_t * v_pre + numerator_const + w_numerator) / (
+            denominator_const + w_denominator
+        )
+    return v_pre
+
+
+def _layer_ranges(wiring):
+    """Returns the (layer_id, start, stop) neuron ranges of the wiring's layers, ordered by neuron id.
+
+    Raises a ValueError if a layer is not a contiguous range of neuron ids or the
+    layers do not cover all neurons exactly once.
+    """
+    layers = []
+    for layer_id in range(wiring.num_layers):
+        neurons = np.unique(np.asarray(wiring.get_neurons_of_layer(layer_id)))
+        if len(neurons) == 0:
+            continue
+        if neurons[-1] - neurons[0] + 1 != len(neurons):
+            raise ValueError(
+                "Block execution requires every layer to be a contiguous range of neurons, "
+                "but layer {} is not".format(layer_id)
+            )
+        layers.append((layer_id, int(neurons[0]), int(neurons[-1]) + 1))
+    layers.sort(key=lambda layer: layer[1])
+    stops = [0] + [stop for _, _, stop in layers]
+    if [start for _, start, _ in layers] != stops[:-1] or stops[-1] != wiring.units:
+        raise ValueError(
+            "Block execution requires the layers of the wiring to partition its {} neurons".format(
+                wiring.units
+            )
+        )
+    return layers
+
+
+def _block_synapse_sums(v_pre, block_weights, layers, blocks):
+    """Numerator and denominator sums of the recurrent synapses of a layered wiring.
+
+    ``layers`` holds the (layer_id, start, stop) neuron ranges in neuron order and
+    ``blocks`` the (source, destination) positions in ``layers`` that have synapses.
+    ``block_weights`` holds the matching (mu_t, sigma_t, w_stacked) in the layout of
+    `_dense_synapse_sums`. Only the sigmoid activations of these blocks are
+    evaluated, layers without incoming synapses receive no synaptic current.
+    The sums of the blocks are added in the dtype of ``v_pre``.
+    """
+    batch_size = v_pre.shape[0]
+    layer_sums = [[] for _ in layers]
+    for (src, dest), (mu_t, sigma_t, w_stacked) in zip(blocks, block_weights):
+        _, start, stop = layers[src]
+        activation = mx.sigmoid(
+            sigma_t * (v_pre[:, start:stop].astype(sigma_t.dtype) - mu_t)
+        )
+        layer_sums[dest].append((activation @ w_stacked).astype(v_pre.dtype))
+    w_sums = mx.concatenate(
+        [
+            sum(sums[1:], sums[0])
+            if sums
+            else mx.zeros((stop - start, batch_size, 2), dtype=v_pre.dtype)
+            for sums, (_, start, stop) in zip(layer_sums, layers)
+        ],
+        axis=0,
+    )
+    return mx.transpose(w_sums[..., 0]), mx.transpose(w_sums[..., 1])
+
+
+def _block_ode_unfolds(
+    v_pre,
+    block_weights,
+    cm_t,
+    numerator_const,
+    denominator_const,
+    layers,
+    blocks,
+    ode_unfolds,
+):
+    """Semi-implicit Euler unfolds of the LTC ODE over the non-empty blocks of a layered wiring.
+
+    ``layers``, ``blocks`` and ``block_weights`` are laid out as in `_block_synapse_sums`.
+    """
+    for _ in range(ode_unfolds):
+        w_numerator, w_denominator = _block_synapse_sums(
+            v_pre, block_weights, layers, blocks
+        )
+        v_pre = (cm_t * v_pre + numerator_const + w_numerator) / (
+            denominator_const + w_denominator
+        )
+    return v_pre
+
+
+def _exponential_substeps(
+    v_pre,
+    synapse_weights,
+    cm,
+    numerator_const,
+    conductance_const,
+    dt,
+    substeps,
+    synapse_sums,
+    num_substeps,
+    epsilon,
+):
+    """Exponential-integrator substeps of the LTC ODE.
+
+    Over each substep of length ``dt`` the synaptic conductances are frozen,
+    which turns the ODE into a linear one with the exact solution
+    ``v = v_inf + (v_pre - v_inf) * exp(-conductance * dt / cm)``. The
+    conductances are frozen at the midpoint of the substep, predicted by a half
+    substep with the conductances at its start, which makes the update second
+    order at two synapse evaluations per substep. ``synapse_sums`` evaluates the
+    recurrent synapses from a potential and ``synapse_weights``. The loop runs
+    ``num_substeps`` times, samples whose ``substeps`` count is smaller keep
+    their potential once it is reached. ``substeps`` is None if all samples take
+    ``num_substeps`` substeps.
+    """
+
+    def exponential_update(v, v_frozen, h):
+        w_numerator, w_denominator = synapse_sums(v_frozen, *synapse_weights)
+        conductance = conductance_const + w_denominator
+        v_inf = (numerator_const + w_numerator) / (conductance + epsilon)
+        return v_inf + (v - v_inf) * mx.exp(-conductance * h / (cm + epsilon))
+
+    for step in range(num_substeps):
+        v_half = exponential_update(v_pre, v_pre, dt / 2)
+        v_next = exponential_update(v_pre, v_half, dt)
+        v_pre = v_next if substeps is None else mx.where(step < substeps, v_next, v_pre)
+    return v_pre
+
 
 @ncps.mini_keras.saving.register_keras_serializable(package="ncps", name="LTCCell")
 class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
@@ -26,6 +254,12 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
         ode_unfolds=6,
         epsilon=1e-8,
         initialization_ranges=None,
+        fused_unfolds=True,
+        sparse_execution=False,
+        integrator="semi_implicit",
+        substep_size=0.5,
+        max_substeps=32,
+        implicit_param_constraints=False,
         **kwargs
     ):
         """A `Liquid time-constant (LTC) <https://ojs.aaai.org/index.php/AAAI/article/view/16936>`_ cell.
@@ -50,12 +284,24 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
              >>> x_seq = tf.random.uniform((1,20,4)) # (batch, time, features)
              >>> y_seq = rnn(x_seq)
 
+        .. Note::
+            Under a mixed precision dtype policy (e.g. ``dtype="mixed_float16"``)
+            the weights are stored in float32 and the synapse activations are
+            evaluated in the compute dtype, while the potentials and the
+            numerator and denominator sums of the ODE updates are kept in float32.
+
         :param wiring:
         :param input_mapping:
         :param output_mapping:
         :param ode_unfolds:
         :param epsilon:
         :param initialization_ranges:
+        :param fused_unfolds: Whether to run the ODE unfolds as a single compiled function (default True)
+        :param sparse_execution: Whether to store only the synapses of the wiring as an edge list and evaluate them with gather/segment-sum. False (default) stores the dense (N, N) synapse parameters, which keeps the weights compatible with models saved before. "auto" selects the sparse path when the wiring density is at most 25%. "blocks" stores and evaluates only the non-empty blocks between the layers of a layered wiring (e.g. `ncps.wirings.NCP`)
+        :param integrator: "semi_implicit" (default) runs ``ode_unfolds`` semi-implicit Euler unfolds per step. "exponential" freezes the synaptic conductances over a substep (at its predicted midpoint) and applies the exact exponential update of the resulting linear ODE, which is stable for any substep length and takes two synapse evaluations per substep. The number of substeps is chosen per sample from the elapsed time, ``ode_unfolds`` is not used. Counting the substeps of irregularly sampled inputs checks the elapsed times on the host, so such steps cannot be traced by `mx.compile` and models with this integrator are trained without `jit_compile`
+        :param substep_size: Longest substep of the exponential integrator, a sample with elapsed time t takes ceil(t / substep_size) substeps (default 0.5)
+        :param max_substeps: Upper bound on the number of substeps per sample of the exponential integrator, longer gaps take longer substeps (default 32)
+        :param implicit_param_constraints: Whether gleak, cm, w and sensory_w are kept non-negative by evaluating the ODE with the softplus of the parameters instead of by `NonNeg` constraints projecting the parameters after every optimizer step, as in `ncps.torch.LTCCell` (default False)
         :param kwargs:
         """
         super().__init__(**kwargs)
@@ -97,6 +343,38 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
         self._output_mapping = output_mapping
         self._ode_unfolds = ode_unfolds
         self._epsilon = epsilon
+        self._fused_unfolds = fused_unfolds
+        self._compiled_unfolds = None
+        if sparse_execution not in ("auto", "blocks", True, False):
+            raise ValueError(
+                "Unknown sparse_execution mode '{}' (expected 'auto', 'blocks', True or False)".format(
+                    sparse_execution
+                )
+            )
+        self._sparse_execution = sparse_execution
+        self._sparse = None
+        if integrator not in ("semi_implicit", "exponential"):
+            raise ValueError(
+                "Unknown integrator '{}' (expected 'semi_implicit' or 'exponential')".format(
+                    integrator
+                )
+            )
+        if substep_size <= 0:
+            raise ValueError(
+                "substep_size must be positive, got {}".format(substep_size)
+            )
+        if max_substeps < 1:
+            raise ValueError(
+                "max_substeps must be at least 1, got {}".format(max_substeps)
+            )
+        self._integrator = integrator
+        if integrator == "exponential":
+            # `model.compile()` falls back to eager training steps
+            self.supports_jit = False
+        self._substep_size = substep_size
+        self._max_substeps = max_substeps
+        self._implicit_param_constraints = implicit_param_constraints
+        self._blocks = None
 
     @property
     def state_size(self):
@@ -114,6 +392,20 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
     def output_size(self):
         return self.motor_size
 
+    @property
+    def is_sparse(self):
+        """Whether the cell evaluates its synapses over an edge list (known after build)"""
+        return self._sparse
+
+    @property
+    def synapse_blocks(self):
+        """(source layer, destination layer) pairs evaluated in block execution, None otherwise (known after build)"""
+        if self._blocks is None:
+            return None
+        return [
+            (self._layers[src][0], self._layers[dest][0]) for src, dest in self._blocks
+        ]
+
     def _get_initializer(self, param_name):
             minval, maxval = self._init_ranges[param_name]
             if minval == maxval:
@@ -133,98 +425,130 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
 
         self._wiring.build(input_dim)
 
+        if self._sparse_execution == "auto":
+            self._sparse = self._wiring.density <= _SPARSE_DENSITY_THRESHOLD
+        else:
+            self._sparse = self._sparse_execution is True
+        if self._sparse_execution == "blocks":
+            self._layers = _layer_ranges(self._wiring)
+            adjacency = np.abs(self._wiring.adjacency_matrix)
+            sensory_adjacency = np.abs(self._wiring.sensory_adjacency_matrix)
+            # Only the (source layer, destination layer) blocks that contain
+            # synapses are stored and evaluated
+            self._blocks = [
+                (src, dest)
+                for src, (_, src_start, src_stop) in enumerate(self._layers)
+                for dest, (_, dest_start, dest_stop) in enumerate(self._layers)
+                if adjacency[src_start:src_stop, dest_start:dest_stop].any()
+            ]
+            self._sensory_blocks = [
+                dest
+                for dest, (_, start, stop) in enumerate(self._layers)
+                if sensory_adjacency[:, start:stop].any()
+            ]
+        elif self._sparse:
+            src, dest, polarity = self._wiring.synapse_edges()
+            sensory_src, sensory_dest, sensory_polarity = (
+                self._wiring.sensory_synapse_edges()
+            )
+            self._edges = (mx.array(src), mx.array(dest))
+            self._sensory_edges = (mx.array(sensory_src), mx.array(sensory_dest))
+            # Only the existing synapses carry parameters
+            synapse_shape = (len(src),)
+            sensory_synapse_shape = (len(sensory_src),)
+            erev_initializer = lambda shape=None, dtype=None: np.copy(polarity)
+            sensory_erev_initializer = lambda shape=None, dtype=None: np.copy(
+                sensory_polarity
+            )
+        else:
+            synapse_shape = (self.state_size, self.state_size)
+            sensory_synapse_shape = (self.sensory_size, self.state_size)
+            erev_initializer = self._wiring.erev_initializer
+            sensory_erev_initializer = self._wiring.sensory_erev_initializer
+
         self._params = {}
-        self._params["gleak"] = self.add_weight(
+        self._non_negative_params = []
+        self._params["gleak"] = self._add_non_negative_weight(
             name="gleak",
             shape=(self.state_size,),
-            dtype=mx.float32,
-            constraint=lambda x: mx.maximum(x, 0),
             initializer=self._get_initializer("gleak"),
         )
         self._params["vleak"] = self.add_weight(
             name="vleak",
             shape=(self.state_size,),
-            dtype=mx.float32,
             initializer=self._get_initializer("vleak"),
         )
-        self._params["cm"] = self.add_weight(
+        self._params["cm"] = self._add_non_negative_weight(
             name="cm",
             shape=(self.state_size,),
-            dtype=mx.float32,
-            constraint=ncps.mini_keras.constraints.NonNeg(),
             initializer=self._get_initializer("cm"),
         )
-        self._params["sigma"] = self.add_weight(
-            name="sigma",
-            shape=(self.state_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._get_initializer("sigma"),
-        )
-        self._params["mu"] = self.add_weight(
-            name="mu",
-            shape=(self.state_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._get_initializer("mu"),
-        )
-        self._params["w"] = self.add_weight(
-            name="w",
-            shape=(self.state_size, self.state_size),
-            dtype=mx.float32,
-            constraint=ncps.mini_keras.constraints.NonNeg(),
-            initializer=self._get_initializer("w"),
-        )
-        self._params["erev"] = self.add_weight(
-            name="erev",
-            shape=(self.state_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._wiring.erev_initializer,
-        )
+        if self._blocks is not None:
+            self._build_block_synapses()
+        else:
+            self._params["sigma"] = self.add_weight(
+                name="sigma",
+                shape=synapse_shape,
+                initializer=self._get_initializer("sigma"),
+            )
+            self._params["mu"] = self.add_weight(
+                name="mu",
+                shape=synapse_shape,
+                initializer=self._get_initializer("mu"),
+            )
+            self._params["w"] = self._add_non_negative_weight(
+                name="w",
+                shape=synapse_shape,
+                initializer=self._get_initializer("w"),
+            )
+            self._params["erev"] = self.add_weight(
+                name="erev",
+                shape=synapse_shape,
+                initializer=erev_initializer,
+            )
 
-        self._params["sensory_sigma"] = self.add_weight(
-            name="sensory_sigma",
-            shape=(self.sensory_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._get_initializer("sensory_sigma"),
-        )
-        self._params["sensory_mu"] = self.add_weight(
-            name="sensory_mu",
-            shape=(self.sensory_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._get_initializer("sensory_mu"),
-        )
-        self._params["sensory_w"] = self.add_weight(
-            name="sensory_w",
-            shape=(self.sensory_size, self.state_size),
-            dtype=mx.float32,
-            constraint=ncps.mini_keras.constraints.NonNeg(),
-            initializer=self._get_initializer("sensory_w"),
-        )
-        self._params["sensory_erev"] = self.add_weight(
-            name="sensory_erev",
-            shape=(self.sensory_size, self.state_size),
-            dtype=mx.float32,
-            initializer=self._wiring.sensory_erev_initializer,
-        )
+            self._params["sensory_sigma"] = self.add_weight(
+                name="sensory_sigma",
+                shape=sensory_synapse_shape,
+                initializer=self._get_initializer("sensory_sigma"),
+            )
+            self._params["sensory_mu"] = self.add_weight(
+                name="sensory_mu",
+                shape=sensory_synapse_shape,
+                initializer=self._get_initializer("sensory_mu"),
+            )
+            self._params["sensory_w"] = self._add_non_negative_weight(
+                name="sensory_w",
+                shape=sensory_synapse_shape,
+                initializer=self._get_initializer("sensory_w"),
+            )
+            self._params["sensory_erev"] = self.add_weight(
+                name="sensory_erev",
+                shape=sensory_synapse_shape,
+                initializer=sensory_erev_initializer,
+            )
 
-        self._params["sparsity_mask"] = ncps.mini_keras.initializers.Constant(
-            mx.abs(self._wiring.adjacency_matrix), dtype=mx.float32
-        )
-        self._params["sensory_sparsity_mask"] = ncps.mini_keras.initializers.Constant(
-            mx.abs(self._wiring.sensory_adjacency_matrix), dtype=mx.float32
-        )
+            if not self._sparse:
+                # The masks multiply the weights inside the step, so they are
+                # kept in the compute dtype of the dtype policy
+                self._params["sparsity_mask"] = ncps.mini_keras.ops.convert_to_tensor(
+                    np.abs(self._wiring.adjacency_matrix), dtype=self.compute_dtype
+                )
+                self._params["sensory_sparsity_mask"] = ncps.mini_keras.ops.convert_to_tensor(
+                    np.abs(self._wiring.sensory_adjacency_matrix),
+                    dtype=self.compute_dtype,
+                )
 
         if self._input_mapping in ["affine", "linear"]:
             self._params["input_w"] = self.add_weight(
                 name="input_w",
                 shape=(self.sensory_size,),
-                dtype=mx.float32,
                 initializer=ncps.mini_keras.initializers.Constant(1),
             )
         if self._input_mapping == "affine":
             self._params["input_b"] = self.add_weight(
                 name="input_b",
                 shape=(self.sensory_size,),
-                dtype=mx.float32,
                 initializer=ncps.mini_keras.initializers.Constant(0),
             )
 
@@ -232,70 +556,421 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
             self._params["output_w"] = self.add_weight(
                 name="output_w",
                 shape=(self.motor_size,),
-                dtype=mx.float32,
                 initializer=ncps.mini_keras.initializers.Constant(1),
             )
         if self._output_mapping == "affine":
             self._params["output_b"] = self.add_weight(
                 name="output_b",
                 shape=(self.motor_size,),
-                dtype=mx.float32,
                 initializer=ncps.mini_keras.initializers.Constant(0),
             )
         self.built = True
 
+    def _build_block_synapses(self):
+        """Adds the synapse parameters and sparsity masks of every non-empty block.
+
+        The parameters of the block from layer ``i`` to layer ``j`` are named e.g.
+        ``sigma_i_j`` and those of the sensory synapses into layer ``j`` e.g.
+        ``sensory_sigma_j``, with ``i`` and ``j`` the layer ids of the wiring.
+        """
+
+        def constant(value):
+            return lambda shape=None, dtype=None: np.copy(value)
+
+        adjacency = self._wiring.adjacency_matrix
+        sensory_adjacency = self._wiring.sensory_adjacency_matrix
+        synapses = [
+            (
+                "_{}_{}".format(self._layers[src][0], self._layers[dest][0]),
+                adjacency[
+                    self._layers[src][1] : self._layers[src][2],
+                    self._layers[dest][1] : self._layers[dest][2],
+                ],
+                "",
+            )
+            for src, dest in self._blocks
+        ] + [
+            (
+                "_{}".format(self._layers[dest][0]),
+                sensory_adjacency[:, self._layers[dest][1] : self._layers[dest][2]],
+                "sensory_",
+            )
+            for dest in self._sensory_blocks
+        ]
+        for suffix, polarity, prefix in synapses:
+            for name in ["sigma", "mu", "w", "erev"]:
+                add_weight = (
+                    self._add_non_negative_weight if name == "w" else self.add_weight
+                )
+                self._params[prefix + name + suffix] = add_weight(
+                    name=prefix + name + suffix,
+                    shape=polarity.shape,
+                    initializer=(
+                        constant(polarity)
+                        if name == "erev"
+                        else self._get_initializer(prefix + name)
+                    ),
+                )
+            self._params[prefix + "sparsity_mask" + suffix] = (
+                ncps.mini_keras.ops.convert_to_tensor(
+                    np.abs(polarity), dtype=self.compute_dtype
+                )
+            )
+
+    def _add_non_negative_weight(self, name, **kwargs):
+        """Adds a parameter that the ODE requires to be non-negative.
+
+        It is projected by a `NonNeg` constraint, or passed through a softplus
+        by :meth:`_tensor_params` with ``implicit_param_constraints``.
+        """
+        self._non_negative_params.append(name)
+        constraint = None
+        if not self._implicit_param_constraints:
+            constraint = ncps.mini_keras.constraints.NonNeg()
+        return self.add_weight(name=name, constraint=constraint, **kwargs)
+
+    def _block_params(self, params, prefix, suffix):
+        """sigma, mu, w, erev and sparsity mask of one block"""
+        return [params[prefix + name + suffix] for name in ["sigma", "mu", "w", "erev"]] + [
+            params[prefix + "sparsity_mask" + suffix]
+        ]
+
     def _sigmoid(self, v_pre, mu, sigma):
         v_pre = ncps.mini_keras.ops.expand_dims(v_pre, axis=-1)  # For broadcasting
         mues = v_pre - mu
         x = sigma * mues
         return ncps.mini_keras.ops.sigmoid(x)
 
-    def _ode_solver(self, inputs, state, elapsed_time):
-        v_pre = state
+    def _sensory_sums(self, inputs):
+        """Contributions of the sensory synapses to the numerator and denominator of the ODE update.
+
+        They only depend on the mapped inputs of shape (B, sensory_size), so they are
+        evaluated once per step, outside of the unfolds. The activations are
+        evaluated in the compute dtype and summed in float32.
+        """
+        params = self._tensor_params()
+        if self._blocks is not None:
+            numerators, denominators = [], []
+            for dest, (layer_id, start, stop) in enumerate(self._layers):
+                if dest not in self._sensory_blocks:
+                    zeros = mx.zeros(
+                        (inputs.shape[0], stop - start), dtype=_ACCUMULATION_DTYPE
+                    )
+                    numerators.append(zeros)
+                    denominators.append(zeros)
+                    continue
+                sigma, mu, w, erev, mask = self._block_params(
+                    params, "sensory_", "_{}".format(layer_id)
+                )
+                sensory_w_activation = w * self._sigmoid(inputs, mu, sigma) * mask
+                numerators.append(
+                    mx.sum(
+                        (sensory_w_activation * erev).astype(_ACCUMULATION_DTYPE),
+                        axis=1,
+                    )
+                )
+                denominators.append(
+                    mx.sum(sensory_w_activation.astype(_ACCUMULATION_DTYPE), axis=1)
+                )
+            return (
+                mx.concatenate(numerators, axis=1),
+                mx.concatenate(denominators, axis=1),
+            )
+        if self._sparse:
+            sensory_src, sensory_dest = self._sensory_edges
+            sensory_w_activation = params["sensory_w"] * mx.sigmoid(
+                params["sensory_sigma"]
+                * (inputs[:, sensory_src] - params["sensory_mu"])
+            )
+            sensory_sums = _segment_sum(
+                mx.stack(
+                    [
+                        sensory_w_activation * params["sensory_erev"],
+                        sensory_w_activation,
+                    ],
+                    axis=-1,
+                ).astype(_ACCUMULATION_DTYPE),
+                sensory_dest,
+                self.state_size,
+            )
+            return sensory_sums[..., 0], sensory_sums[..., 1]
 
-        # We can pre-compute the effects of the sensory neurons here
-        sensory_w_activation = self._params["sensory_w"] * self._sigmoid(
-            inputs, self._params["sensory_mu"], self._params["sensory_sigma"]
+        sensory_w_activation = params["sensory_w"] * self._sigmoid(
+            inputs, params["sensory_mu"], params["sensory_sigma"]
         )
-        sensory_w_activation *= self._params["sensory_sparsity_mask"]
+        sensory_w_activation *= params["sensory_sparsity_mask"]
 
-        sensory_rev_activation = sensory_w_activation * self._params["sensory_erev"]
+        sensory_rev_activation = sensory_w_activation * params["sensory_erev"]
 
         # Reduce over dimension 1 (=source sensory neurons)
-        w_numerator_sensory = mx.sum(sensory_rev_activation, axis=1,dtype=mx.float32)
-        w_denominator_sensory = mx.sum(sensory_w_activation, axis=1,dtype=mx.float32)
+        w_numerator_sensory = mx.sum(
+            sensory_rev_activation.astype(_ACCUMULATION_DTYPE), axis=1
+        )
+        w_denominator_sensory = mx.sum(
+            sensory_w_activation.astype(_ACCUMULATION_DTYPE), axis=1
+        )
+        return w_numerator_sensory, w_denominator_sensory
 
-        # cm/t is loop invariant
-        cm_t = self._params["cm"] / (elapsed_time / 
-            self._ode_unfolds).astype(mx.float32
+    def _ode_solver(
+        self, state, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        """Advances the potentials ``state`` over ``elapsed_time``.
+
+        The potentials are integrated in float32 whatever the dtype policy of the
+        cell and returned in the dtype of ``state``.
+        """
+        if self._integrator == "exponential":
+            solver = self._exponential_ode_solver
+        elif self._sparse:
+            solver = self._sparse_ode_solver
+        elif self._blocks is not None:
+            solver = self._block_ode_solver
+        elif self._fused_unfolds:
+            solver = self._fused_ode_solver
+        else:
+            solver = self._unfused_ode_solver
+        next_state = solver(
+            state.astype(_ACCUMULATION_DTYPE),
+            elapsed_time,
+            w_numerator_sensory,
+            w_denominator_sensory,
         )
+        return next_state.astype(state.dtype)
+
+    def _unfused_ode_solver(
+        self, v_pre, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        params = self._tensor_params()
+        cm, gleak, vleak = self._leak_params(params)
+
+        # cm/t is loop invariant
+        cm_t = cm / (elapsed_time / self._ode_unfolds)
 
         # Unfold the multiply ODE multiple times into one RNN step
         for t in range(self._ode_unfolds):
-            w_activation = self._params["w"] * self._sigmoid(
-                v_pre, self._params["mu"], self._params["sigma"]
+            w_activation = params["w"] * self._sigmoid(
+                v_pre.astype(params["w"].dtype), params["mu"], params["sigma"]
             )
 
-            w_activation *= self._params["sparsity_mask"]
+            w_activation *= params["sparsity_mask"]
 
-            rev_activation = w_activation * self._params["erev"]
+            rev_activation = w_activation * params["erev"]
 
             # Reduce over dimension 1 (=source neurons)
-            w_numerator = mx.sum(rev_activation, axis=1) + w_numerator_sensory
-            w_denominator = mx.sum(w_activation, axis=1) + w_denominator_sensory
-
-            numerator = (
-                cm_t * v_pre
-                + self._params["gleak"] * self._params["vleak"]
-                + w_numerator
+            w_numerator = (
+                mx.sum(rev_activation.astype(_ACCUMULATION_DTYPE), axis=1)
+                + w_numerator_sensory
+            )
+            w_denominator = (
+                mx.sum(w_activation.astype(_ACCUMULATION_DTYPE), axis=1)
+                + w_denominator_sensory
             )
-            denominator = cm_t + self._params["gleak"] + w_denominator
+
+            numerator = cm_t * v_pre + gleak * vleak + w_numerator
+            denominator = cm_t + gleak + w_denominator
 
             # Avoid dividing by 0
             v_pre = numerator / (denominator + self._epsilon)
 
         return v_pre
 
+    def _synapse_weights(self, params):
+        """Loop-invariant recurrent synapse weights in the layout of the synapse-sum kernel of the execution mode"""
+        if self._sparse:
+            src, dest = self._edges
+            return (
+                src,
+                dest,
+                params["mu"],
+                params["sigma"],
+                mx.stack([params["w"] * params["erev"], params["w"]], axis=-1),
+            )
+        if self._blocks is not None:
+            # Every block is laid out like the full matrices of the dense path
+            block_weights = []
+            for src, dest in self._blocks:
+                sigma, mu, w, erev, mask = self._block_params(
+                    params,
+                    "",
+                    "_{}_{}".format(self._layers[src][0], self._layers[dest][0]),
+                )
+                w_masked = w * mask
+                block_weights.append(
+                    (
+                        mx.expand_dims(mx.transpose(mu), 1),
+                        mx.expand_dims(mx.transpose(sigma), 1),
+                        mx.stack(
+                            [mx.transpose(w_masked * erev), mx.transpose(w_masked)],
+                            axis=-1,
+                        ),
+                    )
+                )
+            return (block_weights,)
+        w_masked = params["w"] * params["sparsity_mask"]
+        return (
+            mx.expand_dims(mx.transpose(params["mu"]), 1),
+            mx.expand_dims(mx.transpose(params["sigma"]), 1),
+            mx.stack(
+                [mx.transpose(w_masked * params["erev"]), mx.transpose(w_masked)],
+                axis=-1,
+            ),
+        )
+
+    def _tensor_params(self):
+        """The parameters as tensors, with the softplus applied to the non-negative ones under ``implicit_param_constraints``"""
+        params = {
+            k: ncps.mini_keras.ops.convert_to_tensor(v)
+            for k, v in self._params.items()
+        }
+        if self._implicit_param_constraints:
+            for k in self._non_negative_params:
+                params[k] = ncps.mini_keras.ops.softplus(params[k])
+        return params
+
+    def _leak_params(self, params):
+        """cm, gleak and vleak in float32"""
+        return [
+            params[k].astype(_ACCUMULATION_DTYPE) for k in ["cm", "gleak", "vleak"]
+        ]
+
+    def _unfold_constants(
+        self, params, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        """cm/dt and the loop-invariant numerator and denominator terms of the semi-implicit unfolds, in float32"""
+        cm, gleak, vleak = self._leak_params(params)
+        cm_t = cm / (elapsed_time / self._ode_unfolds)
+        numerator_const = gleak * vleak + w_numerator_sensory
+        denominator_const = cm_t + gleak + w_denominator_sensory + self._epsilon
+        return cm_t, numerator_const, denominator_const
+
+    def _fused_ode_solver(
+        self, v_pre, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        if self._compiled_unfolds is None:
+            self._compiled_unfolds = mx.compile(
+                functools.partial(_ode_unfolds, ode_unfolds=self._ode_unfolds)
+            )
+        params = self._tensor_params()
+        # Everything except the synapse activations is loop invariant
+        return self._compiled_unfolds(
+            v_pre,
+            *self._synapse_weights(params),
+            *self._unfold_constants(
+                params, elapsed_time, w_numerator_sensory, w_denominator_sensory
+            ),
+        )
+
+    def _sparse_ode_solver(
+        self, v_pre, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        params = self._tensor_params()
+
+        if self._fused_unfolds:
+            if self._compiled_unfolds is None:
+                self._compiled_unfolds = mx.compile(
+                    functools.partial(
+                        _sparse_ode_unfolds, ode_unfolds=self._ode_unfolds
+                    )
+                )
+            unfolds = self._compiled_unfolds
+        else:
+            unfolds = functools.partial(
+                _sparse_ode_unfolds, ode_unfolds=self._ode_unfolds
+            )
+        return unfolds(
+            v_pre,
+            *self._synapse_weights(params),
+            *self._unfold_constants(
+                params, elapsed_time, w_numerator_sensory, w_denominator_sensory
+            ),
+        )
+
+    def _block_ode_solver(
+        self, v_pre, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        params = self._tensor_params()
+
+        unfolds = functools.partial(
+            _block_ode_unfolds,
+            layers=tuple(self._layers),
+            blocks=tuple(self._blocks),
+            ode_unfolds=self._ode_unfolds,
+        )
+        if self._fused_unfolds:
+            if self._compiled_unfolds is None:
+                self._compiled_unfolds = mx.compile(unfolds)
+            unfolds = self._compiled_unfolds
+        return unfolds(
+            v_pre,
+            *self._synapse_weights(params),
+            *self._unfold_constants(
+                params, elapsed_time, w_numerator_sensory, w_denominator_sensory
+            ),
+        )
+
+    def _substeps(self, elapsed_time):
+        """Substep length, per-sample substep counts and loop length of the exponential integrator.
+
+        The counts are None if every sample takes the same number of substeps.
+        Counting the substeps of an array of elapsed times synchronizes with the
+        host, a Python scalar elapsed time does not.
+        """
+        if isinstance(elapsed_time, (int, float)):
+            num_substeps = min(
+                max(math.ceil(elapsed_time / self._substep_size), 1),
+                self._max_substeps,
+            )
+            return elapsed_time / num_substeps, None, num_substeps
+        substeps = mx.clip(
+            mx.ceil(mx.stop_gradient(elapsed_time) / self._substep_size),
+            1,
+            self._max_substeps,
+        )
+        fewest, most = mx.stack([mx.min(substeps), mx.max(substeps)]).tolist()
+        return (
+            elapsed_time / substeps,
+            None if fewest == most else substeps,
+            int(most),
+        )
+
+    def _exponential_ode_solver(
+        self, v_pre, elapsed_time, w_numerator_sensory, w_denominator_sensory
+    ):
+        params = self._tensor_params()
+        dt, substeps, num_substeps = self._substeps(elapsed_time)
+        cm, gleak, vleak = self._leak_params(params)
+        numerator_const = gleak * vleak + w_numerator_sensory
+        conductance_const = gleak + w_denominator_sensory
+
+        if self._sparse:
+            synapse_sums = _sparse_synapse_sums
+        elif self._blocks is not None:
+            synapse_sums = functools.partial(
+                _block_synapse_sums,
+                layers=tuple(self._layers),
+                blocks=tuple(self._blocks),
+            )
+        else:
+            synapse_sums = _dense_synapse_sums
+        solver = functools.partial(
+            _exponential_substeps, synapse_sums=synapse_sums, epsilon=self._epsilon
+        )
+        if self._fused_unfolds:
+            # Retraced for every distinct number of substeps
+            if self._compiled_unfolds is None:
+                self._compiled_unfolds = mx.compile(solver)
+            solver = self._compiled_unfolds
+        return solver(
+            v_pre,
+            self._synapse_weights(params),
+            cm,
+            numerator_const,
+            conductance_const,
+            dt,
+            substeps,
+            num_substeps=num_substeps,
+        )
+
     def _map_inputs(self, inputs):
         if self._input_mapping in ["affine", "linear"]:
             inputs = inputs * self._params["input_w"]
@@ -323,18 +998,47 @@ class LTCCell(ncps.mini_keras.layers.AbstractRNNCell):
             elapsed_time = 1.0
         inputs = self._map_inputs(inputs)
 
-        next_state = self._ode_solver(inputs, states[0], elapsed_time)
+        next_state = self._ode_solver(
+            states[0], elapsed_time, *self._sensory_sums(inputs)
+        )
 
         outputs = self._map_outputs(next_state)
 
         return outputs, [next_state]
 
+    def project_inputs(self, inputs):
+        """Evaluates the input mapping and the sensory synapses for inputs of shape (..., input_dim).
+
+        Neither depends on the state, so an RNN layer computes them for a whole
+        sequence at once before the recurrence and advances the cell with
+        :meth:`call_projected`. The sensory numerator and denominator sums are
+        concatenated along the last axis.
+        """
+        leading_shape = tuple(inputs.shape[:-1])
+        inputs = self._map_inputs(mx.reshape(inputs, (-1, inputs.shape[-1])))
+        projected = mx.concatenate(self._sensory_sums(inputs), axis=-1)
+        return mx.reshape(projected, leading_shape + (2 * self.state_size,))
+
+    def call_projected(self, projected, states, **kwargs):
+        """Advances the cell by one regularly sampled step from the output of :meth:`project_inputs`"""
+        w_numerator_sensory, w_denominator_sensory = mx.split(projected, 2, axis=-1)
+        next_state = self._ode_solver(
+            states[0], 1.0, w_numerator_sensory, w_denominator_sensory
+        )
+        return self._map_outputs(next_state), [next_state]
+
     def get_config(self):
         seralized = self._wiring.get_config()
         seralized["input_mapping"] = self._input_mapping
         seralized["output_mapping"] = self._output_mapping
         seralized["ode_unfolds"] = self._ode_unfolds
         seralized["epsilon"] = self._epsilon
+        seralized["fused_unfolds"] = self._fused_unfolds
+        seralized["sparse_execution"] = self._sparse_execution
+        seralized["integrator"] = self._integrator
+        seralized["substep_size"] = self._substep_size
+        seralized["max_substeps"] = self._max_substeps
+        seralized["implicit_param_constraints"] = self._implicit_param_constraints
         return seralized
 
     @classmethod
@@ -39,9 +39,7 @@ class MixedMemoryRNN(AbstractRNNCell):
 
     def build(self, input_shape):
         input_dim = input_shape[-1]
-        if isinstance(input_shape[0], tuple) or isinstance(
-            input_shape[0], mx.Shape
-        ):
+        if isinstance(input_shape[0], (tuple, list)):
             # Nested tuple
             input_dim = input_shape[0][-1]
 
@@ -64,13 +62,34 @@ class MixedMemoryRNN(AbstractRNNCell):
         
         self.built = True
 
+    def project_inputs(self, inputs):
+        """Input contribution to the gates, ``inputs @ input_kernel + bias``, for inputs of shape (..., input_dim).
+
+        It does not depend on the state, so an RNN layer computes it for a whole
+        sequence with one matmul before the recurrence and advances the cell with
+        :meth:`call_projected`.
+        """
+        return ncps.mini_keras.ops.matmul(inputs, self.input_kernel) + self.bias
+
     def call(self, inputs, states, **kwargs):
+        return self._step(self.project_inputs(inputs), inputs, states, **kwargs)
+
+    def call_projected(self, projected, states, **kwargs):
+        """Advances the cell by one step from the output of :meth:`project_inputs`"""
+        return self._step(projected, None, states, **kwargs)
+
+    def _step(self, projected, inputs, states, **kwargs):
         memory_state, ct_state = states
+        # An RNN layer passes the state of a single-state cell as one array
+        nested_ct_state = isinstance(ct_state, (tuple, list))
+        if not nested_ct_state:
+            ct_state = [ct_state]
         flat_ct_state = mx.concatenate(ct_state, axis=-1)
         z = (
-            mx.matmul(inputs, self.input_kernel)  # Input contribution
-            + mx.matmul(flat_ct_state, self.recurrent_kernel)  # Recurrent contribution
-            + self.bias  # Bias term
+            projected  # Input contribution and bias term
+            + ncps.mini_keras.ops.matmul(
+                flat_ct_state, self.recurrent_kernel
+            )  # Recurrent contribution
         )
         i, ig, fg, og = mx.split(z, 4, axis=-1)
 
@@ -79,18 +98,22 @@ class MixedMemoryRNN(AbstractRNNCell):
         forget_gate = mx.sigmoid(fg + self.forget_gate_bias)  # Controls how much memory to forget
         output_gate = mx.sigmoid(og)  # Controls the output from the memory state
 
-        new_memory_state = memory_state * forget_gate + input_activation * input_gate
-        ct_input = mx.tanh(new_memory_state) * output_gate  # LSTM-like output serves as ODE input
+        # The memory cell is a running sum over the whole sequence, so it is
+        # updated in float32 even if the gates are evaluated in half precision
+        new_memory_state = (
+            memory_state.astype(mx.float32) * forget_gate
+            + input_activation * input_gate
+        )
+        ct_input = mx.tanh(new_memory_state).astype(z.dtype) * output_gate  # LSTM-like output serves as ODE input
+        new_memory_state = new_memory_state.astype(memory_state.dtype)
 
         if (isinstance(inputs, tuple) or isinstance(inputs, list)) and len(inputs) > 1:
             # Input is a tuple -> Ct cell input should also be a tuple
             ct_input = (ct_input,) + inputs[1:]
 
-        # Implementation choice on how to parametrize ODE component
-        if (not isinstance(ct_state, tuple)) and (not isinstance(ct_state, list)):
-            ct_state = [ct_state]
-
         ct_output, new_ct_state = self.rnn_cell(ct_input, ct_state, **kwargs)
+        if not nested_ct_state:
+            new_ct_state = new_ct_state[0]
 
         return ct_output, [new_memory_state, new_ct_state]
 
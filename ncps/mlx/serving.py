@@ -0,0 +1,253 @@
+# Copyright 2022 Mathias Lechner and Ramin Hasani
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import mlx.core as mx
+import numpy as np
+
+
+class StatefulInferenceEngine:
+    def __init__(
+        self,
+        cell,
+        max_sessions,
+        max_batch_size=None,
+        latency_budget=0.002,
+    ):
+        """Serves closed-loop inference of a recurrent cell for many sessions from one process.
+
+        The hidden states of all sessions live in a slab of shape (max_sessions, state_size)
+        that is allocated once. Creating and evicting sessions only hands out and returns
+        slots of that slab. Concurrent :meth:`step` calls are collected by a worker thread
+        and evaluated as a single batched cell call, waiting at most ``latency_budget``
+        seconds after the first pending request for more requests to arrive.
+
+        Examples::
+
+             >>> from ncps.mlx import CfC, StatefulInferenceEngine
+             >>>
+             >>> policy = CfC(32, return_sequences=True)
+             >>> policy(mx.zeros((1, 1, 8)))  # build
+             >>> with StatefulInferenceEngine(policy, max_sessions=1024) as engine:
+             ...     session = engine.create_session()
+             ...     action = engine.step(session, obs)
+             ...     engine.evict_session(session)
+
+        :param cell: An RNN cell (e.g. `ncps.mlx.CfCCell`, `ncps.mlx.LTCCell`) or an RNN layer wrapping one (e.g. `ncps.mlx.CfC`, `ncps.mlx.LTC`)
+        :param max_sessions: Number of slots in the hidden state slab
+        :param max_batch_size: Largest number of requests evaluated in one cell call (default max_sessions)
+        :param latency_budget: Longest time in seconds the worker waits for a batch to fill up (default 0.002)
+        """
+        self._cell = getattr(cell, "cell", cell)
+        state_size = self._cell.state_size
+        self._nested_state = isinstance(state_size, (list, tuple))
+        state_sizes = list(state_size) if self._nested_state else [state_size]
+        self._slabs = [mx.zeros((max_sessions, size)) for size in state_sizes]
+        # MLX streams are per thread and the worker cannot evaluate graphs
+        # that were built lazily on another thread, so everything it reads
+        # is materialized up front and after every update
+        weights = [getattr(w, "value", w) for w in getattr(self._cell, "weights", [])]
+        mx.eval(self._slabs, weights)
+
+        self.max_sessions = max_sessions
+        self.max_batch_size = max_batch_size or max_sessions
+        self.latency_budget = latency_budget
+
+        self._free_slots = list(range(max_sessions - 1, -1, -1))
+        self._slot_of = {}
+        self._session_ids = itertools.count()
+        # Guards the slab and the session table. All MLX work on the slab
+        # happens while holding it.
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+        self._closed = False
+
+    @property
+    def num_sessions(self):
+        return len(self._slot_of)
+
+    def create_session(self, session_id=None):
+        """Assigns a free slot with a zero hidden state to a new session and returns its id"""
+        with self._lock:
+            if session_id is None:
+                session_id = next(self._session_ids)
+                while session_id in self._slot_of:
+                    session_id = next(self._session_ids)
+            elif session_id in self._slot_of:
+                raise ValueError("Session {} already exists".format(session_id))
+            if not self._free_slots:
+                raise RuntimeError(
+                    "All {} session slots are in use".format(self.max_sessions)
+                )
+            slot = self._free_slots.pop()
+            for slab in self._slabs:
+                slab[slot] = 0
+            mx.eval(self._slabs)
+            self._slot_of[session_id] = slot
+        return session_id
+
+    def evict_session(self, session_id):
+        """Releases the slot of a session"""
+        with self._lock:
+            self._free_slots.append(self._slot_of.pop(session_id))
+
+    def reset_session(self, session_id):
+        """Sets the hidden state of a session back to zero, e.g. at the end of an episode"""
+        with self._lock:
+            slot = self._slot_of[session_id]
+            for slab in self._slabs:
+                slab[slot] = 0
+            mx.eval(self._slabs)
+
+    def get_state(self, session_id):
+        """Returns the current hidden state of a session"""
+        with self._lock:
+            slot = self._slot_of[session_id]
+            states = [slab[slot] for slab in self._slabs]
+            mx.eval(states)
+        return states if self._nested_state else states[0]
+
+    def step_batch(self, session_ids, observations):
+        """Advances several sessions by one step with a single cell call
+
+        :param session_ids: Sequence of distinct session ids
+        :param observations: Array of shape (len(session_ids), features)
+        :return: Array of outputs, one row per session
+        """
+        with self._lock:
+            return self._step_slots(
+                [self._slot_of[s] for s in session_ids], observations
+            )
+
+    def _step_slots(self, slots, observations):
+        """Advances the states in ``slots`` by one step, the caller holds the lock"""
+        slots = mx.array(slots)
+        states = [slab[slots] for slab in self._slabs]
+        outputs, new_states = self._cell(
+            mx.array(observations), states if self._nested_state else [states[0]]
+        )
+        if not isinstance(new_states, (list, tuple)):
+            new_states = [new_states]
+        for slab, new_state in zip(self._slabs, new_states):
+            slab[slots] = new_state
+        mx.eval(outputs, *self._slabs)
+        return outputs
+
+    def submit(self, session_id, observation):
+        """Queues one step of a session for the next micro-batch
+
+        :return: A `concurrent.futures.Future` resolving to the output of the step as a numpy array
+        """
+        if self._closed:
+            raise RuntimeError("The inference engine has been closed")
+        self._ensure_worker()
+        future = Future()
+        self._requests.put((session_id, np.asarray(observation), future))
+        return future
+
+    def step(self, session_id, observation, timeout=None):
+        """Advances one session by one step, batched with concurrent requests of other sessions"""
+        return self.submit(session_id, observation).result(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._serve, daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self):
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.latency_budget
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = (
+                    self._requests.get(timeout=remaining)
+                    if remaining > 0
+                    else self._requests.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if request is None:
+                # Serve what was collected, then stop
+                self._requests.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _serve(self):
+        pending = []
+        while True:
+            batch = pending or self._collect_batch()
+            if batch is None:
+                return
+            # A session may only appear once per cell call, later steps of
+            # the same session go into the next batch
+            seen, current, pending = set(), [], []
+            for request in batch:
+                if request[0] in seen:
+                    pending.append(request)
+                else:
+                    seen.add(request[0])
+                    current.append(request)
+            # Only the requests of evicted or unknown sessions fail, the
+            # others are served
+            error = None
+            with self._lock:
+                slots = [self._slot_of.get(r[0]) for r in current]
+                missing = [r for r, slot in zip(current, slots) if slot is None]
+                current = [r for r, slot in zip(current, slots) if slot is not None]
+                slots = [slot for slot in slots if slot is not None]
+                if current:
+                    try:
+                        outputs = self._step_slots(
+                            slots, np.stack([r[1] for r in current])
+                        )
+                    except Exception as e:
+                        error = e
+            for request in missing:
+                request[2].set_exception(
+                    KeyError("Unknown session {}".format(request[0]))
+                )
+            if error is not None:
+                for request in current:
+                    request[2].set_exception(error)
+            elif current:
+                # Lazy arrays cannot be evaluated outside of the worker thread
+                outputs = np.array(outputs)
+                for i, request in enumerate(current):
+                    request[2].set_result(outputs[i])
+
+    def close(self):
+        """Stops the worker thread after the queued requests have been served"""
+        self._closed = True
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
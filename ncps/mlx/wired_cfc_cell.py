@@ -2,6 +2,7 @@
 
 from .cfc_cell import CfCCell
 import mlx.core as mx
+import numpy as np
 import ncps
 from ncps.wirings import wirings
 from ncps.mini_keras.activations import lecun_tanh
@@ -53,6 +54,10 @@ class WiredCfCCell(ncps.mini_keras.layers.AbstractRNNCell):
     def input_size(self):
         return self._wiring.input_dim
 
+    @property
+    def output_size(self):
+        return self._wiring.output_dim
+
     def build(self, input_shape):
         if isinstance(input_shape[0], tuple):
             # Nested tuple -> First item represent feature dimension
@@ -62,8 +67,42 @@ class WiredCfCCell(ncps.mini_keras.layers.AbstractRNNCell):
 
         self._wiring.build(input_dim)
         for i in range(self._wiring.num_layers):
-            # ...existing build logic...
-            pass
+            layer_i_neurons = self._wiring.get_neurons_of_layer(i)
+            if i == 0:
+                input_sparsity = self._wiring.sensory_adjacency_matrix[:, layer_i_neurons]
+            else:
+                prev_layer_neurons = self._wiring.get_neurons_of_layer(i - 1)
+                input_sparsity = self._wiring.adjacency_matrix[
+                    np.ix_(prev_layer_neurons, layer_i_neurons)
+                ]
+            if self.fully_recurrent:
+                recurrent_sparsity = np.ones(
+                    (len(layer_i_neurons), len(layer_i_neurons)), dtype=np.int32
+                )
+            else:
+                recurrent_sparsity = self._wiring.adjacency_matrix[
+                    np.ix_(layer_i_neurons, layer_i_neurons)
+                ]
+            sparsity_mask = mx.array(
+                np.abs(np.concatenate([input_sparsity, recurrent_sparsity], axis=0)),
+                dtype=mx.float32,
+            )
+            # The layers share the dtype policy of the wired cell
+            cell = CfCCell(
+                len(layer_i_neurons),
+                mode=self.mode,
+                activation=self._activation,
+                backbone_units=0,
+                backbone_layers=0,
+                backbone_dropout=0,
+                sparsity_mask=sparsity_mask,
+                dtype=self.dtype_policy,
+            )
+            cell.build((None, input_sparsity.shape[0]))
+            self._cfc_layers.append(cell)
+
+        self._layer_sizes = [layer.units for layer in self._cfc_layers]
+        self.built = True
 
     def call(self, inputs, states, **kwargs):
         if isinstance(inputs, (tuple, list)):
@@ -74,11 +113,13 @@ class WiredCfCCell(ncps.mini_keras.layers.AbstractRNNCell):
             # Regularly sampled mode (elapsed time = 1 second)
             t = 1.0
 
-        states = mx.split(states[0], self._layer_sizes, axis=-1)
+        states = mx.split(
+            states[0], np.cumsum(self._layer_sizes)[:-1].tolist(), axis=-1
+        )
         assert len(states) == self._wiring.num_layers
         new_hiddens = []
         for i, layer in enumerate(self._cfc_layers):
-            layer_input = (inputs, t)
+            layer_input = inputs if isinstance(t, float) else (inputs, t)
             output, new_hidden = layer(layer_input, [states[i]])
             new_hiddens.append(new_hidden[0])
             inputs = output
@@ -0,0 +1,89 @@
+# Copyright 2022 Mathias Lechner
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+
+def test_timeseries_dataset_from_array():
+    """Strided windows with sampling rate, stride, shuffling and prefetching"""
+    from ncps.mini_keras.utils import timeseries_dataset_from_array
+
+    data = np.random.default_rng(0).normal(size=(500, 3)).astype(np.float32)
+    targets = np.arange(500)
+    kwargs = dict(
+        sequence_length=10, sequence_stride=3, sampling_rate=2, batch_size=16
+    )
+    dataset = timeseries_dataset_from_array(
+        data, targets, prefetch_buffer_size=0, **kwargs
+    )
+    starts = []
+    for x, y in dataset:
+        assert x.shape[1:] == (10, 3)
+        for window, start in zip(x, y):
+            np.testing.assert_array_equal(window, data[start : start + 20 : 2])
+        starts.extend(y)
+    assert starts == list(range(0, 500 - 18, 3))
+
+    # Prefetching does not change the batches
+    prefetched = timeseries_dataset_from_array(data, targets, **kwargs)
+    for (x, y), (px, py) in zip(dataset, prefetched):
+        np.testing.assert_array_equal(x, px)
+        np.testing.assert_array_equal(y, py)
+
+    # Every window once per epoch, in a new order every epoch
+    shuffled = timeseries_dataset_from_array(
+        data, targets, shuffle=True, seed=1, **kwargs
+    )
+    epochs = [np.concatenate([y for _, y in shuffled]) for _ in range(2)]
+    assert sorted(epochs[0]) == starts
+    assert not np.array_equal(epochs[0], epochs[1])
+
+    # Data shorter than one window gives an empty dataset
+    empty = timeseries_dataset_from_array(
+        data, targets, start_index=490, **kwargs
+    )
+    assert len(empty) == 0 and list(empty) == []
+
+
+def test_sequence_windows(tmp_path):
+    """Strided windows with lazy augmentation, and the cached checksum sidecar"""
+    from ncps.datasets.utils import SequenceWindows, md5_checksum
+
+    x = np.random.default_rng(0).normal(size=(100, 5, 1)).astype(np.float32)
+    y = np.arange(100, dtype=np.float32)[:, None]
+    starts = np.array([0, 10, 10, 50])
+    windows = SequenceWindows(
+        x,
+        y,
+        starts,
+        seq_len=8,
+        augmented=[False, False, True, False],
+        augment=lambda x, y: (x[:, :, ::-1], -y),
+    )
+    xb, yb = windows[:]
+    assert xb.shape == (4, 8, 5, 1) and yb.shape == (4, 8, 1)
+    np.testing.assert_array_equal(xb[1], x[10:18])
+    np.testing.assert_array_equal(xb[2], x[10:18, ::-1])
+    np.testing.assert_array_equal(yb[2], -y[10:18])
+    # Single windows are views of the data
+    assert np.shares_memory(windows[3][0], x)
+    np.testing.assert_array_equal(windows[2][0], xb[2])
+    batches = list(windows.batches(3, shuffle=True, seed=0))
+    assert [len(b[0]) for b in batches] == [3, 1]
+
+    path = str(tmp_path / "data.npz")
+    np.savez(path, x=x)
+    checksum = md5_checksum(path)
+    assert (tmp_path / "data.npz.md5").exists()
+    assert md5_checksum(path) == checksum
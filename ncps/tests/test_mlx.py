@@ -12,10 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+
+import pytest
 import mlx.core as mx
 import mlx.nn as nn
-from ncps.mlx import CfC, LTCCell, LTC, EnhancedLTCCell
+from ncps.mlx import CfC, CfCCell, LTCCell, LTC, EnhancedLTCCell, MixedMemoryRNN, StatefulInferenceEngine, Ensemble
+import ncps
 from ncps import wirings
+from ncps.mini_keras.backend.mlx.rnn import rnn as mlx_rnn
+from ncps.mini_keras.backend.mlx.core import LastOutputs, MeanOutputs, scan as mlx_scan
+from ncps.mini_keras.layers import RNN
+from ncps.mini_keras import optimizers
+from ncps.mini_keras.optimizers.base_optimizer import BaseOptimizer
 import numpy as np
 
 
@@ -297,3 +306,941 @@ def test_ltc_with_enhanced_ltc_cell():
     optimizer = nn.Adam(learning_rate=0.01)
     model.compile(optimizer=optimizer, loss=nn.MeanSquaredError())
     model.fit(data_x, data_y, batch_size=1, epochs=3)
+
+
+def _regression_data(n=64):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(n, 4)).astype(np.float32)
+    y = x @ np.array([[1.0], [-2.0], [0.5], [3.0]], dtype=np.float32) + 0.1
+    return x, y
+
+
+def _regression_model(**compile_kwargs):
+    model = ncps.mini_keras.Sequential(
+        [ncps.mini_keras.layers.Input((4,)), ncps.mini_keras.layers.Dense(1)]
+    )
+    model.compile(
+        optimizer=optimizers.SGD(learning_rate=0.05), loss="mse", **compile_kwargs
+    )
+    return model
+
+
+def test_fit_lowers_loss():
+    x, y = _regression_data()
+    model = _regression_model(jit_compile=True)
+    history = model.fit(x, y, batch_size=16, epochs=5, verbose=0)
+    losses = history.history["loss"]
+    assert len(losses) == 5
+    assert losses[-1] < 0.5 * losses[0]
+
+
+@pytest.mark.parametrize(
+    "compile_kwargs",
+    [
+        dict(jit_compile=True),
+        dict(jit_compile=True, steps_per_execution=3),
+        dict(jit_compile=False),
+        dict(jit_compile=False, steps_per_execution=3),
+    ],
+)
+def test_fit_matches_per_batch_updates(compile_kwargs):
+    """Compiled and grouped steps apply the same updates as one step per batch"""
+    x, y = _regression_data()
+    reference = _regression_model(jit_compile=False)
+    model = _regression_model(**compile_kwargs)
+    model.set_weights(reference.get_weights())
+    for _ in range(2):
+        for i in range(0, len(x), 16):
+            reference.train_on_batch(x[i : i + 16], y[i : i + 16])
+    # 4 batches per epoch, i.e. a partial group with steps_per_execution=3
+    model.fit(x, y, batch_size=16, epochs=2, shuffle=False, verbose=0)
+    for a, b in zip(model.get_weights(), reference.get_weights()):
+        np.testing.assert_allclose(a, b, atol=1e-5)
+    assert ncps.mini_keras.ops.convert_to_numpy(model.optimizer.iterations) == 8
+
+
+def test_train_on_batch():
+    x, y = _regression_data(16)
+    model = _regression_model()
+    weights = model.get_weights()
+    logs = model.train_on_batch(x, y, return_dict=True)
+    assert "loss" in logs and np.isfinite(logs["loss"])
+    assert not all(np.allclose(a, b) for a, b in zip(model.get_weights(), weights))
+    assert ncps.mini_keras.ops.convert_to_numpy(model.optimizer.iterations) == 1
+    # The loss of the updated weights is lower
+    loss = model.train_on_batch(x, y)
+    assert np.asarray(loss) < logs["loss"]
+
+
+def _reference_rnn(step, x, h0, go_backwards=False, mask=None):
+    """Step-by-step reference loop used to check the MLX ``rnn()``."""
+    h = h0
+    outputs = []
+    steps = range(x.shape[1] - 1, -1, -1) if go_backwards else range(x.shape[1])
+    for t in steps:
+        new_h, _ = step(x[:, t], [h])
+        if mask is not None:
+            new_h = mx.where(mask[:, t : t + 1], new_h, h)
+        h = new_h
+        outputs.append(h)
+    return mx.stack(outputs, axis=1), h
+
+
+def test_mlx_backend_rnn():
+    """The MLX-native rnn() matches a plain loop with masking and go_backwards"""
+    kernel = mx.random.normal((4, 6)) * 0.5
+    recurrent_kernel = mx.random.normal((6, 6)) * 0.5
+
+    def step(inputs, states):
+        h = mx.tanh(inputs @ kernel + states[0] @ recurrent_kernel)
+        return h, [h]
+
+    x = mx.random.normal((3, 9, 4))
+    h0 = mx.zeros((3, 6))
+    mask = np.ones((3, 9), dtype=bool)
+    mask[0, 5:] = False
+    mask[2, :3] = False
+    mask = mx.array(mask)
+
+    for go_backwards in [False, True]:
+        for unroll in [False, True]:
+            last, outputs, states = mlx_rnn(
+                step, x, [h0], go_backwards=go_backwards, unroll=unroll
+            )
+            expected, expected_h = _reference_rnn(step, x, h0, go_backwards)
+            assert outputs.shape == (3, 9, 6)
+            assert mx.allclose(outputs, expected, atol=1e-5)
+            assert mx.allclose(last, expected_h, atol=1e-5)
+
+    _, _, states = mlx_rnn(step, x, [h0], mask=mask)
+    _, expected_h = _reference_rnn(step, x, h0, mask=mask)
+    assert mx.allclose(states[0], expected_h, atol=1e-5)
+
+    last, outputs, _ = mlx_rnn(step, x, [h0], return_all_outputs=False)
+    assert outputs.shape == (3, 1, 6)
+    assert mx.allclose(last, outputs[:, -1])
+
+
+def test_ltc_fused_unfolds_parity():
+    """The compiled, fused ODE unfolds match the reference Python loop"""
+    wiring = wirings.AutoNCP(32, 4)
+    cell = LTCCell(wiring, ode_unfolds=6, sparse_execution=False)
+    x = mx.random.normal((6, 5))
+    h = mx.random.normal((6, wiring.units))
+
+    fused_output, fused_state = cell(x, [h])
+    cell._fused_unfolds = False
+    loop_output, loop_state = cell(x, [h])
+
+    assert mx.allclose(fused_output, loop_output, atol=1e-5)
+    assert mx.allclose(fused_state[0], loop_state[0], atol=1e-5)
+
+
+def test_ltc_sparse_execution_parity():
+    """The edge-list LTC path matches the dense masked path"""
+    # NCP wirings add synapses on every build, so each cell gets its own
+    wiring = wirings.AutoNCP(48, 4)
+    dense_cell = LTCCell(wirings.AutoNCP(48, 4), sparse_execution=False)
+    sparse_cell = LTCCell(wiring, sparse_execution=True)
+    x = mx.random.normal((6, 5))
+    h = mx.random.normal((6, wiring.units))
+    dense_cell(x, [h])
+    sparse_cell(x, [h])
+    assert not dense_cell.is_sparse and sparse_cell.is_sparse
+    # The dense parameters are the default, "auto" follows the wiring density
+    default_cell = LTCCell(wirings.AutoNCP(48, 4))
+    default_cell(x, [h])
+    assert not default_cell.is_sparse
+    auto_cell = LTCCell(wirings.FullyConnected(8), sparse_execution="auto")
+    auto_cell(x, [mx.zeros((6, 8))])
+    assert not auto_cell.is_sparse
+    auto_cell = LTCCell(wirings.AutoNCP(48, 4), sparse_execution="auto")
+    auto_cell(x, [h])
+    assert auto_cell.is_sparse
+
+    src, dest, _ = wiring.synapse_edges()
+    sensory_src, sensory_dest, _ = wiring.sensory_synapse_edges()
+    for name, param in dense_cell._params.items():
+        if "sparsity_mask" in name:
+            continue
+        value = np.asarray(param)
+        if name in ["sigma", "mu", "w", "erev"]:
+            value = value[src, dest]
+        elif name in ["sensory_sigma", "sensory_mu", "sensory_w", "sensory_erev"]:
+            value = value[sensory_src, sensory_dest]
+        sparse_cell._params[name].assign(value)
+
+    for fused in [True, False]:
+        sparse_cell._fused_unfolds = fused
+        dense_output, dense_state = dense_cell(x, [h])
+        sparse_output, sparse_state = sparse_cell(x, [h])
+        assert mx.allclose(dense_output, sparse_output, atol=1e-5)
+        assert mx.allclose(dense_state[0], sparse_state[0], atol=1e-5)
+
+
+def test_cfc_parallel_scan():
+    """The associative-scan evaluation matches the sequential scan"""
+    import warnings
+
+    x = mx.random.normal((2, 64, 5))
+    for mode in ["no_gate", "pure"]:
+        sequential = CfC(16, mode=mode, backbone_layers=0, return_sequences=True)
+        parallel = CfC(
+            16,
+            mode=mode,
+            backbone_layers=0,
+            return_sequences=True,
+            parallel_scan=True,
+        )
+        sequential(x)
+        parallel(x)
+        # Damp the untrained recurrence so that the reference stays bounded
+        weights = [0.5 * np.asarray(w) for w in sequential.get_weights()]
+        sequential.set_weights(weights)
+        parallel.set_weights(weights)
+
+        with warnings.catch_warnings():
+            # Falling back to the sequential scan would make this test vacuous
+            warnings.simplefilter("error")
+            y_parallel = parallel(x)
+        assert mx.allclose(sequential(x), y_parallel, atol=1e-4)
+
+    # The convergence check syncs with the host, so training runs eagerly
+    model = ncps.mini_keras.Sequential(
+        [ncps.mini_keras.layers.Input((None, 5)), parallel]
+    )
+    model.compile(optimizer=optimizers.SGD(learning_rate=0.01), loss="mse")
+    assert not model.jit_compile
+    model.fit(x, mx.zeros((2, 64, 16)), epochs=1, verbose=0)
+
+
+def test_wiring_bulk_synapses():
+    """add_synapses matches repeated add_synapse calls, including overwrites"""
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 12, size=100)
+    dest = rng.integers(0, 12, size=100)
+    polarity = rng.choice([-1, 1], size=100)
+
+    looped = wirings.Wiring(12)
+    bulk = wirings.Wiring(12)
+    for s, d, p in zip(src, dest, polarity):
+        looped.add_synapse(s, d, p)
+    bulk.add_synapses(src, dest, polarity)
+    assert np.array_equal(looped.adjacency_matrix, bulk.adjacency_matrix)
+
+    bulk.build(3)
+    bulk.add_sensory_synapses([0, 2], [5, 7], 1)
+    assert bulk.sensory_synapse_count == 2
+    with pytest.raises(ValueError):
+        bulk.add_synapses([0], [12], [1])
+    with pytest.raises(ValueError):
+        bulk.add_sensory_synapses([0], [1], [0])
+
+
+def test_wiring_edge_list():
+    """Edge lists and the exported graph cover exactly the wiring's synapses"""
+    wiring = wirings.AutoNCP(40, 4)
+    wiring.build(6)
+    src, dest, polarity = wiring.synapse_edges()
+    assert len(src) == wiring.synapse_count
+    assert np.array_equal(wiring.adjacency_matrix[src, dest], polarity)
+    assert np.all(np.diff(dest) >= 0)
+
+    nx = pytest.importorskip("networkx")
+    graph = wiring.get_graph()
+    assert isinstance(graph, nx.DiGraph)
+    assert graph.number_of_edges() == (
+        wiring.synapse_count + wiring.sensory_synapse_count
+    )
+
+
+def test_wiring_config_roundtrip():
+    """Compact wiring configs round-trip through JSON and old list configs still load"""
+    import json
+
+    sparse = wirings.AutoNCP(64, 8)
+    sparse.build(5)
+    dense = wirings.FullyConnected(16)
+    dense.build(3)
+    for wiring in [sparse, dense]:
+        # Subclasses serialize their seeds, the base config holds the matrices
+        config = json.loads(json.dumps(wirings.Wiring.get_config(wiring)))
+        restored = wirings.Wiring.from_config(config)
+        assert np.array_equal(restored.adjacency_matrix, wiring.adjacency_matrix)
+        assert np.array_equal(
+            restored.sensory_adjacency_matrix, wiring.sensory_adjacency_matrix
+        )
+
+    legacy = wirings.Wiring.get_config(sparse)
+    legacy["adjacency_matrix"] = sparse.adjacency_matrix.tolist()
+    legacy["sensory_adjacency_matrix"] = sparse.sensory_adjacency_matrix.tolist()
+    restored = wirings.Wiring.from_config(legacy)
+    assert np.array_equal(restored.adjacency_matrix, sparse.adjacency_matrix)
+
+
+def test_mlx_orthogonal_initializer():
+    """The MLX orthogonal initializer covers square, tall, wide and nested shapes"""
+    from ncps.mini_keras.backend.mlx.orthogonal import orthogonal, _custom_qr
+
+    for shape in [(32, 32), (48, 16), (16, 48), (8, 4, 6)]:
+        q = orthogonal(shape, gain=2.0)
+        assert q.shape == shape
+        m = q.reshape(shape[0], -1) / 2.0
+        gram = m @ m.T if m.shape[0] <= m.shape[1] else m.T @ m
+        assert mx.allclose(gram, mx.eye(gram.shape[0]), atol=1e-5)
+
+    matrix_high = mx.random.normal((24, 24))
+    matrix_low = 1e-7 * mx.random.normal((24, 24))
+    q, r_high, r_low = _custom_qr(matrix_high, matrix_low)
+    assert mx.allclose(q @ (r_high + r_low), matrix_high + matrix_low, atol=1e-5)
+    assert mx.allclose(r_low, mx.triu(r_low))
+
+
+def test_stateful_inference_engine():
+    """Micro-batched serving matches stepping every session on its own"""
+    import threading
+
+    cell = LTCCell(wirings.AutoNCP(16, 2))
+    cell(mx.zeros((1, 3)), [mx.zeros((1, 16))])
+    obs = np.random.default_rng(0).normal(size=(8, 4, 3)).astype(np.float32)
+
+    with StatefulInferenceEngine(cell, max_sessions=8, latency_budget=0.005) as engine:
+        sessions = [engine.create_session() for _ in range(8)]
+        with pytest.raises(RuntimeError):
+            engine.create_session()
+        results = {}
+
+        def run(i):
+            results[i] = [engine.step(sessions[i], obs[i, t]) for t in range(4)]
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(8):
+            h = mx.zeros((1, 16))
+            for t in range(4):
+                output, (h,) = cell(mx.array(obs[i, t : t + 1]), [h])
+                assert np.allclose(np.array(output[0]), results[i][t], atol=1e-5)
+            assert mx.allclose(engine.get_state(sessions[i]), h[0], atol=1e-5)
+
+        # Evicted slots are handed out again with a zero state
+        engine.evict_session(sessions[0])
+        session = engine.create_session()
+        assert engine.num_sessions == 8
+        assert mx.all(engine.get_state(session) == 0)
+
+        outputs = engine.step_batch(sessions[1:3], obs[1:3, 0])
+        assert outputs.shape == (2, cell.output_size)
+
+
+def test_stateful_inference_engine_evicted_session():
+    """A request of an evicted session fails without failing its micro-batch"""
+    cell = CfCCell(8)
+    cell(mx.zeros((1, 3)), [mx.zeros((1, 8))])
+    obs = np.random.default_rng(0).normal(size=(3, 3)).astype(np.float32)
+
+    with StatefulInferenceEngine(cell, max_sessions=4, latency_budget=0.5) as engine:
+        sessions = [engine.create_session() for _ in range(3)]
+        # The worker waits for the latency budget after the first request, so
+        # all three requests are queued for the same micro-batch
+        futures = [engine.submit(s, o) for s, o in zip(sessions, obs)]
+        engine.evict_session(sessions[1])
+        with pytest.raises(KeyError):
+            futures[1].result(timeout=5)
+        for i in [0, 2]:
+            output, _ = cell(mx.array(obs[i : i + 1]), [mx.zeros((1, 8))])
+            result = futures[i].result(timeout=5)
+            assert np.allclose(result, np.array(output[0]), atol=1e-5)
+        assert engine.num_sessions == 2
+
+    # A micro-batch of only evicted sessions does not stop the worker
+    with StatefulInferenceEngine(cell, max_sessions=4) as engine:
+        evicted, session = engine.create_session(), engine.create_session()
+        engine.evict_session(evicted)
+        with pytest.raises(KeyError):
+            engine.step(evicted, obs[0], timeout=5)
+        assert engine.step(session, obs[0], timeout=5).shape == (8,)
+
+
+def test_mlx_backend_nn_ops():
+    """The MLX nn ops stay on device and match their NumPy definitions"""
+    from ncps.mini_keras.backend.mlx import nn as mlx_nn
+
+    x = mx.random.normal((4, 8, 3))
+    logits = np.array(x)
+    expected = np.exp(logits) / np.exp(logits).sum(-1, keepdims=True)
+    assert isinstance(mlx_nn.softmax(x, axis=-1), mx.array)
+    assert np.allclose(mlx_nn.softmax(x, axis=-1), expected, atol=1e-6)
+    assert np.allclose(mlx_nn.sigmoid(x), 1 / (1 + np.exp(-logits)), atol=1e-6)
+
+    one_hot = mlx_nn.one_hot(mx.array([0, 2, -1]), 3)
+    assert np.array_equal(one_hot, [[1, 0, 0], [0, 0, 1], [0, 0, 0]])
+
+    # A kernel of ones sums all channels of three neighbouring steps
+    kernel = mx.ones((3, 3, 1))
+    summed = mlx_nn.conv(x, kernel, padding="valid")
+    assert summed.shape == (4, 6, 1)
+    expected = sum(logits[:, i : i + 6].sum(-1) for i in range(3))
+    assert np.allclose(summed[..., 0], expected, atol=1e-5)
+
+    pooled = mlx_nn.max_pool(x, 2, None, "same")
+    assert pooled.shape == (4, 4, 3)
+    assert np.allclose(pooled, logits.reshape(4, 4, 2, 3).max(2))
+    averaged = mlx_nn.average_pool(x, 3, 3, "same")
+    assert averaged.shape == (4, 3, 3)
+    assert np.allclose(averaged[:, -1], logits[:, 6:].mean(1), atol=1e-6)
+
+
+def test_cfc_fused_projection():
+    """A fused cell loaded from a separate-weight checkpoint matches the original"""
+    x = mx.random.normal((3, 5))
+    h = mx.random.normal((3, 16))
+    for mode in ["default", "pure"]:
+        for backbone_layers in [0, 1]:
+            separate = CfCCell(16, mode=mode, backbone_layers=backbone_layers)
+            fused = CfCCell(
+                16, mode=mode, backbone_layers=backbone_layers, fused_projection=True
+            )
+            separate(x, [h])
+            fused(x, [h])
+
+            def load(target, source):
+                store = {}
+                source.save_own_variables(store)
+                target.load_own_variables(store)
+
+            load(fused, separate)
+            if mode != "pure":
+                load(fused.time_a, separate.time_a)
+                load(fused.time_b, separate.time_b)
+            if backbone_layers > 0:
+                for target, source in zip(fused.backbone_fn.layers, separate.backbone_fn.layers):
+                    load(target, source)
+
+            expected, _ = separate(x, [h])
+            output, _ = fused(x, [h])
+            assert mx.allclose(output, expected, atol=1e-5)
+
+
+def test_hoisted_input_projection():
+    """Stepping from whole-sequence input projections matches the per-step cell call"""
+    x = mx.random.normal((3, 7, 5))
+    cells = [
+        CfCCell(16),
+        CfCCell(16, mode="pure", backbone_layers=0, backbone_units=0),
+        CfCCell(16, backbone_layers=0, backbone_units=0, fused_projection=True),
+        LTCCell(wirings.AutoNCP(16, 4)),
+        MixedMemoryRNN(LTCCell(wirings.FullyConnected(8))),
+    ]
+    for cell in cells:
+        if isinstance(cell, MixedMemoryRNN):
+            initial_state = [mx.zeros((3, 8)), [mx.zeros((3, 8))]]
+        else:
+            initial_state = [mx.zeros((3, cell.state_size))]
+        cell(x[:, 0], initial_state)
+
+        projected = cell.project_inputs(x)
+        states, hoisted_states = initial_state, initial_state
+        for t in range(x.shape[1]):
+            expected, states = cell(x[:, t], states)
+            output, hoisted_states = cell.call_projected(projected[:, t], hoisted_states)
+            assert mx.allclose(output, expected, atol=1e-5)
+
+    rnn = CfC(16, return_sequences=True)
+    outputs = rnn(x)
+    h = mx.zeros((3, 16))
+    for t in range(x.shape[1]):
+        expected, [h] = rnn.cell(x[:, t], [h])
+        assert mx.allclose(outputs[:, t], expected, atol=1e-5)
+
+
+def test_ltc_block_execution_parity():
+    """The layer-block LTC path matches the dense masked path"""
+    # NCP wirings add synapses on every build, so each cell gets its own
+    wiring = wirings.AutoNCP(48, 4)
+    dense_cell = LTCCell(wirings.AutoNCP(48, 4), sparse_execution=False)
+    block_cell = LTCCell(wiring, sparse_execution="blocks")
+    x = mx.random.normal((6, 5))
+    h = mx.random.normal((6, wiring.units))
+    dense_cell(x, [h])
+    block_cell(x, [h])
+    assert not block_cell.is_sparse
+    # No synapses from the motor layer (2) or back into the inter layer (0)
+    assert all(src != 2 and dest != 0 for src, dest in block_cell.synapse_blocks)
+
+    def neurons(layer_id):
+        layer = wiring.get_neurons_of_layer(layer_id)
+        return slice(min(layer), max(layer) + 1)
+
+    for name, param in block_cell._params.items():
+        if "sparsity_mask" in name:
+            continue
+        parts = name.split("_")
+        if name.startswith("sensory_"):
+            value = np.asarray(dense_cell._params["_".join(parts[:2])])
+            value = value[:, neurons(int(parts[2]))]
+        elif len(parts) == 3 and parts[0] in ["sigma", "mu", "w", "erev"]:
+            value = np.asarray(dense_cell._params[parts[0]])
+            value = value[neurons(int(parts[1])), neurons(int(parts[2]))]
+        else:
+            value = np.asarray(dense_cell._params[name])
+        param.assign(value)
+
+    for fused in [True, False]:
+        block_cell._fused_unfolds = fused
+        dense_output, dense_state = dense_cell(x, [h])
+        block_output, block_state = block_cell(x, [h])
+        assert mx.allclose(dense_output, block_output, atol=1e-5)
+        assert mx.allclose(dense_state[0], block_state[0], atol=1e-5)
+
+
+def test_mlx_scan_stride_and_reduction():
+    """Strided and reduced scan outputs match slices of the full outputs"""
+    xs = mx.arange(10).astype(mx.float32)
+    cumsum = lambda carry, x: (carry + x, carry + x)
+    carry, full = mlx_scan(cumsum, mx.array(0.0), xs)
+    assert carry.item() == 45 and full.tolist() == np.cumsum(np.arange(10)).tolist()
+    _, strided = mlx_scan(cumsum, mx.array(0.0), xs, stride=3)
+    assert mx.array_equal(strided, full[2::3])
+    _, last = mlx_scan(cumsum, mx.array(0.0), xs, reduction=LastOutputs(4))
+    assert mx.array_equal(last, full[-4:])
+    _, mean = mlx_scan(cumsum, mx.array(0.0), xs, reduction=MeanOutputs())
+    assert mx.allclose(mean, mx.mean(full, keepdims=True))
+
+    kernel = mx.random.normal((4, 6)) * 0.5
+
+    def step(inputs, states):
+        h = mx.tanh(inputs @ kernel + states[0])
+        return h, [h]
+
+    x = mx.random.normal((3, 12, 4))
+    h0 = mx.zeros((3, 6))
+    last_output, outputs, _ = mlx_rnn(step, x, [h0])
+    strided_last, strided, _ = mlx_rnn(step, x, [h0], output_stride=4)
+    assert strided.shape == (3, 3, 6)
+    assert mx.allclose(strided, outputs[:, 3::4])
+    assert mx.allclose(strided_last, last_output)
+    _, last_outputs, _ = mlx_rnn(step, x, [h0], output_reduction=LastOutputs(5))
+    assert mx.allclose(last_outputs, outputs[:, -5:])
+    _, mean_output, _ = mlx_rnn(step, x, [h0], output_reduction=MeanOutputs())
+    assert mx.allclose(mean_output[:, 0], mx.mean(outputs, axis=1), atol=1e-5)
+
+    # Longer than one block of strided outputs, with gradients
+    xs = mx.random.normal((300, 2))
+
+    def strided_loss(w, stride):
+        step = lambda carry, x: (mx.tanh(carry * w + x), mx.tanh(carry * w + x))
+        _, ys = mlx_scan(step, mx.zeros((2,)), xs, stride=stride)
+        return ys
+
+    w = mx.array(0.5)
+    full = strided_loss(w, 1)
+    for stride in (2, 7):
+        assert mx.allclose(strided_loss(w, stride), full[stride - 1 :: stride])
+        grad = mx.grad(lambda w: mx.sum(strided_loss(w, stride)))(w)
+        expected = mx.grad(
+            lambda w: mx.sum(strided_loss(w, 1)[stride - 1 :: stride])
+        )(w)
+        assert mx.allclose(grad, expected)
+
+
+def test_rnn_output_stride_and_reduction():
+    """`output_stride` and `output_reduction` of the RNN layers"""
+    x = mx.random.normal((2, 12, 3))
+    full = CfC(8, return_sequences=True)
+    outputs = full(x)
+    strided = CfC(8, return_sequences=True, output_stride=4)
+    strided(x)
+    strided.set_weights(full.get_weights())
+    assert mx.allclose(strided(x), outputs[:, 3::4], atol=1e-6)
+    assert strided.compute_output_shape((2, 12, 3)) == (2, 3, 8)
+
+    mean = LTC(6, return_sequences=True, output_reduction=MeanOutputs())
+    ltc = LTC(6, return_sequences=True)
+    ltc(x)
+    mean(x)
+    mean.set_weights(ltc.get_weights())
+    assert mx.allclose(mean(x), mx.mean(ltc(x), axis=1, keepdims=True), atol=1e-5)
+    assert mean.compute_output_shape((2, 12, 3)) == (2, 1, 6)
+
+    with pytest.raises(ValueError):
+        CfC(8, output_stride=4)
+    with pytest.raises(ValueError):
+        CfC(8, return_sequences=True, output_stride=0)
+    with pytest.raises(ValueError):
+        CfC(8, mode="no_gate", backbone_layers=0, return_sequences=True,
+            parallel_scan=True, output_stride=4)
+
+
+def _stateful_cfc_model(stateful=True):
+    model = ncps.mini_keras.Sequential(
+        [
+            ncps.mini_keras.layers.Input(batch_shape=(4, None, 2)),
+            CfC(8, return_sequences=True, stateful=stateful),
+            ncps.mini_keras.layers.Dense(1),
+        ]
+    )
+    model.compile(optimizer=optimizers.Adam(learning_rate=0.01), loss="mse")
+    return model
+
+
+def test_fit_truncated_bptt():
+    """One update per window, with the RNN state carried between the windows
+    of a batch and reset at every batch"""
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(8, 24, 2)).astype(np.float32)
+    y = np.cumsum(x[..., :1], axis=1) * 0.1
+
+    model = _stateful_cfc_model()
+    train_function = model.make_train_function()
+    windows = []
+
+    def recording_train_function(state, data):
+        indices = model._rnn_state_indices()
+        logs, new_state = train_function(state, data)
+        windows.append(
+            (
+                [np.array(state[1][i]) for i in indices],
+                [np.array(new_state[1][i]) for i in indices],
+            )
+        )
+        return logs, new_state
+
+    model.train_function = recording_train_function
+    history = model.fit(
+        x, y, batch_size=4, epochs=2, shuffle=False, truncated_bptt_steps=8, verbose=0
+    )
+    assert len(history.history["loss"]) == 2
+    # 2 epochs of 2 batches of 3 windows
+    assert len(windows) == 12
+    assert ncps.mini_keras.ops.convert_to_numpy(model.optimizer.iterations) == 12
+    for k, (start, end) in enumerate(windows):
+        assert all(np.any(v != 0) for v in end)
+        if k % 3 == 0:
+            assert all(np.all(v == 0) for v in start)
+        else:
+            for v, previous in zip(start, windows[k - 1][1]):
+                np.testing.assert_array_equal(v, previous)
+
+    # Without a stateful RNN there is no state to carry between windows
+    model = _stateful_cfc_model(stateful=False)
+    with pytest.raises(ValueError):
+        model.fit(x, y, batch_size=4, truncated_bptt_steps=8, verbose=0)
+
+
+def test_checkpoint_every_parity():
+    """Recomputing the steps between checkpoints gives the same gradients"""
+    x = mx.random.normal((2, 10, 3))
+    for make in [
+        lambda **kw: LTC(wirings.FullyConnected(8), return_sequences=True, **kw),
+        lambda **kw: CfC(8, mixed_memory=True, return_sequences=True, **kw),
+    ]:
+        layer, checkpointed = make(), make(checkpoint_every=4)
+        layer(x)
+        checkpointed(x)
+        for a, b in zip(checkpointed.weights, layer.weights):
+            a.assign(b)
+
+        def loss_and_grads(layer):
+            def loss(trainable):
+                non_trainable = [v.value for v in layer.non_trainable_variables]
+                y, _ = layer.stateless_call(trainable, non_trainable, x)
+                return mx.sum(y**2)
+
+            trainable = [v.value for v in layer.trainable_variables]
+            return mx.value_and_grad(loss)(trainable)
+
+        loss, grads = loss_and_grads(layer)
+        checkpointed_loss, checkpointed_grads = loss_and_grads(checkpointed)
+        assert mx.allclose(loss, checkpointed_loss, atol=1e-5)
+        for g, cg in zip(grads, checkpointed_grads):
+            assert mx.allclose(g, cg, atol=1e-5)
+
+
+def test_compile_cell_parity():
+    """Steps that bypass `Layer.__call__` or run a compiled trace of the cell match the layer calls"""
+    x = mx.random.normal((2, 10, 3))
+    for make in [
+        lambda **kw: LTC(wirings.FullyConnected(8), return_sequences=True, **kw),
+        lambda **kw: CfC(8, mixed_memory=True, return_sequences=True, **kw),
+        lambda **kw: CfC(wirings.AutoNCP(10, 2, seed=0), return_sequences=True, **kw),
+        lambda **kw: RNN(CfCCell(8), return_sequences=True, **kw),
+    ]:
+        layer, compiled = make(), make(compile_cell=True)
+        layer(x)
+        compiled(x)
+        for a, b in zip(compiled.weights, layer.weights):
+            a.assign(b)
+
+        def loss_and_grads(layer):
+            def loss(trainable):
+                non_trainable = [v.value for v in layer.non_trainable_variables]
+                y, _ = layer.stateless_call(trainable, non_trainable, x)
+                return mx.sum(y**2)
+
+            trainable = [v.value for v in layer.trainable_variables]
+            return mx.value_and_grad(loss)(trainable)
+
+        assert mx.allclose(layer(x), compiled(x), atol=1e-5)
+        loss, grads = loss_and_grads(layer)
+        compiled_loss, compiled_grads = loss_and_grads(compiled)
+        assert mx.allclose(loss, compiled_loss, atol=1e-5)
+        for g, cg in zip(grads, compiled_grads):
+            assert mx.allclose(g, cg, atol=1e-5)
+        # The weights are inputs of the trace, not constants baked into it
+        for v in compiled.trainable_variables:
+            v.assign(v.value * 0.5)
+        for v in layer.trainable_variables:
+            v.assign(v.value * 0.5)
+        assert mx.allclose(layer(x), compiled(x), atol=1e-5)
+
+
+class _ElapsedTimeStep(ncps.mini_keras.Model):
+    """One irregularly sampled step of `cell` from a zero state"""
+
+    def __init__(self, cell):
+        super().__init__()
+        self.cell = cell
+
+    def call(self, inputs):
+        x, elapsed_time = inputs
+        h = mx.zeros((x.shape[0], self.cell.state_size))
+        output, _ = self.cell((x, elapsed_time), [h])
+        return output
+
+
+def _fit_elapsed_time_step(cell):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(32, 3)).astype(np.float32)
+    elapsed_time = rng.uniform(0.1, 3.0, size=(32, 1)).astype(np.float32)
+    y = rng.normal(size=(32, 1)).astype(np.float32)
+    model = _ElapsedTimeStep(cell)
+    model.compile(optimizer=optimizers.Adam(learning_rate=0.01), loss="mse")
+    history = model.fit((x, elapsed_time), y, batch_size=8, epochs=2, verbose=0)
+    assert np.all(np.isfinite(history.history["loss"]))
+    return model
+
+
+def test_enhanced_ltc_adaptive_solver():
+    """Adaptive solvers match a fine fixed-step solution on irregular intervals"""
+    wiring = wirings.FullyConnected(8)
+    x = mx.random.normal((3, 4))
+    h = mx.random.normal((3, 8)) * 0.3
+    elapsed_time = mx.array([[0.1], [1.0], [4.0]])
+    reference = EnhancedLTCCell(wiring, solver="rk4", ode_unfolds=400)
+    _, (expected,) = reference((x, elapsed_time), [h])
+    for solver in ["dopri5", "rkf45"]:
+        cell = EnhancedLTCCell(wiring, solver=solver, rtol=1e-5, atol=1e-7)
+        cell((x, elapsed_time), [h])
+        for name, param in cell._params.items():
+            if "sparsity_mask" not in name:
+                param.assign(reference._params[name])
+        _, (state,) = cell((x, elapsed_time), [h])
+        assert mx.allclose(state, expected, atol=1e-4)
+        # Longer intervals take more steps
+        nfe = cell.nfe.tolist()
+        assert nfe[0] < nfe[1] < nfe[2]
+
+
+def test_enhanced_ltc_adaptive_solver_fit():
+    """The adaptive solvers sync with the host, so training runs eagerly"""
+    model = _fit_elapsed_time_step(
+        EnhancedLTCCell(wirings.FullyConnected(8, 1), solver="dopri5")
+    )
+    assert not model.jit_compile
+
+
+def test_ltc_exponential_integrator():
+    """The exponential integrator converges to a fine solution on irregular intervals"""
+    wiring = wirings.FullyConnected(8)
+    x = mx.random.normal((3, 4))
+    h = mx.random.normal((3, 8)) * 0.3
+    elapsed_time = mx.array([[0.1], [1.0], [20.0]])
+    reference = EnhancedLTCCell(wiring, solver="rk4", ode_unfolds=2000)
+    _, (expected,) = reference((x, elapsed_time), [h])
+
+    errors = []
+    for substep_size in [1.0, 0.1]:
+        cell = LTCCell(
+            wiring,
+            integrator="exponential",
+            substep_size=substep_size,
+            max_substeps=1000,
+            sparse_execution=False,
+        )
+        cell((x, elapsed_time), [h])
+        for name, param in cell._params.items():
+            if "sparsity_mask" not in name:
+                param.assign(reference._params[name])
+        _, (state,) = cell((x, elapsed_time), [h])
+        errors.append(mx.abs(state - expected).max().item())
+    # Second order in the substep size
+    assert errors[1] < 0.1 * errors[0]
+    assert errors[1] < 1e-2
+
+    # Samples take ceil(elapsed_time / substep_size) substeps up to max_substeps
+    cell = LTCCell(wiring, integrator="exponential", substep_size=0.25, max_substeps=8)
+    _, substeps, num_substeps = cell._substeps(elapsed_time)
+    assert substeps.flatten().tolist() == [1, 4, 8] and num_substeps == 8
+    assert cell._substeps(1.0) == (0.25, None, 4)
+    with pytest.raises(ValueError):
+        LTCCell(wiring, integrator="euler")
+
+
+def test_ltc_exponential_integrator_fit():
+    """Counting the substeps syncs with the host, so training runs eagerly"""
+    model = _fit_elapsed_time_step(
+        LTCCell(wirings.FullyConnected(8, 1), integrator="exponential")
+    )
+    assert not model.jit_compile
+
+
+def test_ensemble_matches_members():
+    """A batched ensemble gives the outputs and gradients of its members run one by one"""
+    x = mx.random.normal((4, 10, 3))
+    for make in [
+        lambda seed: RNN(
+            LTCCell(wirings.AutoNCP(12, 2, seed=seed), sparse_execution=False),
+            return_sequences=True,
+        ),
+        lambda seed: CfC(8, mode="no_gate", backbone_layers=0, return_sequences=True),
+    ]:
+        members = [make(seed) for seed in range(3)]
+        ensemble = Ensemble(members)
+        y = ensemble(x)
+        assert y.shape == (4, 3) + tuple(members[0](x).shape[1:])
+        for k, member in enumerate(members):
+            assert mx.allclose(y[:, k], member(x), atol=1e-5)
+
+        def ensemble_loss(trainable):
+            y, _ = ensemble.stateless_call(trainable, [], x)
+            return mx.sum(y**2)
+
+        grads = mx.grad(ensemble_loss)([v.value for v in ensemble.trainable_variables])
+        for k, member in enumerate(members):
+
+            def member_loss(trainable):
+                y, _ = member.stateless_call(trainable, [], x)
+                return mx.sum(y**2)
+
+            member_grads = mx.grad(member_loss)(
+                [v.value for v in member.trainable_variables]
+            )
+            for g, mg in zip(grads, member_grads):
+                assert mx.allclose(g[k], mg, atol=1e-4)
+
+    # Trained weights are written back into the members
+    for v in ensemble.trainable_variables:
+        v.assign(v.value * 0.5)
+    ensemble.update_members()
+    assert mx.allclose(ensemble(x)[:, 1], members[1](x), atol=1e-5)
+    with pytest.raises(ValueError):
+        Ensemble([CfC(8, backbone_layers=0), CfC(6, backbone_layers=0)])(x)
+
+
+@pytest.mark.parametrize(
+    "policy, dtype, tolerance",
+    [("mixed_float16", mx.float16, 1e-2), ("mixed_bfloat16", mx.bfloat16, 5e-2)],
+)
+def test_mixed_precision_rollout_drift(policy, dtype, tolerance):
+    """Half-precision cells with float32 master weights stay close to float32 over long rollouts"""
+    x = mx.random.normal((4, 500, 3))
+    for make in [
+        lambda policy: LTC(
+            wirings.FullyConnected(12, 2), return_sequences=True, dtype=policy
+        ),
+        lambda policy: LTC(
+            wirings.NCP(4, 4, 2, 2, 2, 2, 2, seed=1),
+            return_sequences=True,
+            sparse_execution="blocks",
+            dtype=policy,
+        ),
+        lambda policy: CfC(16, return_sequences=True, dtype=policy),
+        lambda policy: CfC(
+            16, mixed_memory=True, backbone_layers=0, return_sequences=True, dtype=policy
+        ),
+        lambda policy: CfC(
+            wirings.AutoNCP(16, 2, seed=0), return_sequences=True, dtype=policy
+        ),
+    ]:
+        reference = make("float32")
+        expected = reference(x)
+        layer = make(policy)
+        layer(x[:, :1])
+        layer.set_weights(reference.get_weights())
+        assert all(v.dtype == "float32" for v in layer.trainable_variables)
+        y = layer(x)
+        assert y.dtype == dtype
+        error = mx.abs(y.astype(mx.float32) - expected).max().item()
+        assert error <= tolerance * mx.abs(expected).max().item()
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda: optimizers.Adam(learning_rate=0.01),
+        lambda: optimizers.Adam(learning_rate=0.01, amsgrad=True),
+        lambda: optimizers.AdamW(learning_rate=0.01, weight_decay=0.1),
+        lambda: optimizers.SGD(learning_rate=0.1, momentum=0.9, nesterov=True),
+        lambda: optimizers.RMSprop(learning_rate=0.01, momentum=0.5, centered=True),
+    ],
+)
+def test_fused_optimizer_parity(make):
+    """The fused MLX optimizers match the per-variable update_step of Keras"""
+    cells = [LTCCell(wirings.AutoNCP(10, 2, seed=0)) for _ in range(2)]
+    x = mx.random.normal((2, 3))
+    for cell in cells:
+        cell(x, [mx.zeros((2, 10))])
+    cells[1].set_weights(cells[0].get_weights())
+    fused, reference = make(), make()
+    # The generic path of the base optimizer, one variable at a time
+    reference._backend_update_step = functools.partial(
+        BaseOptimizer._backend_update_step, reference
+    )
+    reference._apply_weight_decay = functools.partial(
+        BaseOptimizer._apply_weight_decay, reference
+    )
+    reference._apply_constraints = functools.partial(
+        BaseOptimizer._apply_constraints, reference
+    )
+    for _ in range(3):
+        grads = [mx.random.normal(v.shape) for v in cells[0].trainable_variables]
+        fused.apply(grads, cells[0].trainable_variables)
+        reference.apply(grads, cells[1].trainable_variables)
+    for a, b in zip(cells[0].trainable_variables, cells[1].trainable_variables):
+        assert mx.allclose(a.value, b.value, atol=1e-5)
+        # The constraints are projected inside the fused update
+        if a.constraint is not None:
+            assert mx.all(a.value >= 0)
+
+
+def test_ltc_implicit_param_constraints():
+    """The softplus reparameterization matches the constrained cell with the softplus of the parameters"""
+    x = mx.random.normal((4, 3))
+    for make_wiring, sparse_execution in [
+        (lambda: wirings.FullyConnected(8), False),
+        (lambda: wirings.FullyConnected(8), True),
+        (lambda: wirings.NCP(3, 3, 2, 2, 2, 2, 2, seed=1), "blocks"),
+    ]:
+        implicit = LTCCell(
+            make_wiring(),
+            sparse_execution=sparse_execution,
+            implicit_param_constraints=True,
+        )
+        explicit = LTCCell(make_wiring(), sparse_execution=sparse_execution)
+        h = mx.random.normal((4, implicit.state_size)) * 0.3
+        implicit(x, [h])
+        explicit(x, [h])
+        for variable, constrained in zip(implicit.variables, explicit.variables):
+            value = variable.value
+            if constrained.constraint is not None:
+                assert variable.constraint is None
+                value = mx.logaddexp(value, 0.0)
+            constrained.assign(value)
+        y, (state,) = implicit(x, [h])
+        expected_y, (expected_state,) = explicit(x, [h])
+        assert mx.allclose(y, expected_y, atol=1e-5)
+        assert mx.allclose(state, expected_state, atol=1e-5)
@@ -174,6 +174,29 @@ def test_ncp_cfc_2():
     # ):
 
 
+def test_ltc_register_weight_constraints():
+    input_size = 8
+    ltc_cell = LTCCell(ncps.wirings.FullyConnected(8, 4), input_size)
+    names = ["w", "sensory_w", "cm", "gleak"]
+    opt = torch.optim.SGD(ltc_cell.parameters(), lr=100.0)
+    handle = ltc_cell.register_weight_constraints(opt)
+
+    def step():
+        # A large step against a gradient of one drives every parameter negative
+        opt.zero_grad()
+        sum(ltc_cell._params[name].sum() for name in names).backward()
+        opt.step()
+
+    step()
+    for name in names:
+        assert (ltc_cell._params[name] >= 0).all()
+
+    handle.remove()
+    step()
+    for name in names:
+        assert (ltc_cell._params[name] < 0).any()
+
+
 if __name__ == "__main__":
     import traceback
     import warnings
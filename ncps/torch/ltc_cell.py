@@ -70,7 +70,6 @@ class LTCCell(nn.Module):
         self._output_mapping = output_mapping
         self._ode_unfolds = ode_unfolds
         self._epsilon = epsilon
-        self._clip = torch.nn.ReLU()
         self._allocate_parameters()
 
     @property
@@ -266,14 +265,32 @@ class LTCCell(nn.Module):
             output = output + self._params["output_b"]
         return output
 
+    @torch.no_grad()
     def apply_weight_constraints(self):
         if not self._implicit_param_constraints:
             # In implicit mode, the parameter constraints are implemented via
-            # a softplus function at runtime
-            self._params["w"].data = self._clip(self._params["w"].data)
-            self._params["sensory_w"].data = self._clip(self._params["sensory_w"].data)
-            self._params["cm"].data = self._clip(self._params["cm"].data)
-            self._params["gleak"].data = self._clip(self._params["gleak"].data)
+            # a softplus function at runtime. Otherwise the non-negative
+            # parameters are clipped in place with one multi-tensor kernel.
+            torch._foreach_clamp_min_(
+                [
+                    self._params[name].data
+                    for name in ["w", "sensory_w", "cm", "gleak"]
+                ],
+                0.0,
+            )
+
+    def register_weight_constraints(self, optimizer):
+        """Applies the weight constraints after every step of ``optimizer``.
+
+        This replaces calling :meth:`apply_weight_constraints` after each
+        ``optimizer.step()``. It has no effect with ``implicit_param_constraints``.
+
+        :param optimizer: A `torch.optim.Optimizer` updating the parameters of the cell
+        :return: A handle whose ``remove()`` method unregisters the constraints
+        """
+        return optimizer.register_step_post_hook(
+            lambda optimizer, args, kwargs: self.apply_weight_constraints()
+        )
 
     def forward(self, inputs, states, elapsed_time=1.0):
         # Regularly sampled mode (elapsed time = 1 second)
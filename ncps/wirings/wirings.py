@@ -13,17 +13,107 @@
 # limitations under the License.
 
 
+import base64
+
 import numpy as np
 
 
+def _b64encode(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+def _b64decode(text, dtype):
+    return np.frombuffer(base64.b64decode(text), dtype=dtype)
+
+
+def _encode_adjacency_matrix(matrix):
+    """Encodes a polarity matrix (entries -1, 0 or +1) compactly for configs
+
+    Sparse matrices are stored as an edge list of flat indices with one sign
+    bit per synapse, dense ones as two bits per entry. Both are base64 encoded
+    so that the config stays JSON serializable.
+    """
+    if matrix is None:
+        return None
+    if not np.all(np.isin(matrix, [-1, 0, 1])):
+        return matrix.tolist()
+    flat = matrix.reshape(-1)
+    (index,) = np.nonzero(flat)
+    config = {"shape": list(matrix.shape)}
+    if index.shape[0] * 4 < flat.shape[0] // 4:
+        config["encoding"] = "edges"
+        config["index"] = _b64encode(index.astype("<u4"))
+        config["negative"] = _b64encode(np.packbits(flat[index] < 0))
+    else:
+        config["encoding"] = "bits"
+        config["nonzero"] = _b64encode(np.packbits(flat != 0))
+        config["negative"] = _b64encode(np.packbits(flat < 0))
+    return config
+
+
+def _decode_adjacency_matrix(config):
+    if not isinstance(config, dict):
+        # Configs written before the compact encoding hold nested lists
+        return np.array(config)
+    shape = tuple(config["shape"])
+    size = int(np.prod(shape))
+    flat = np.zeros(size, dtype=np.int32)
+    if config["encoding"] == "edges":
+        index = _b64decode(config["index"], "<u4")
+        negative = np.unpackbits(
+            _b64decode(config["negative"], np.uint8), count=index.shape[0]
+        )
+        flat[index] = 1 - 2 * negative.astype(np.int32)
+    elif config["encoding"] == "bits":
+        nonzero = np.unpackbits(_b64decode(config["nonzero"], np.uint8), count=size)
+        negative = np.unpackbits(_b64decode(config["negative"], np.uint8), count=size)
+        flat[:] = nonzero.astype(np.int32) - 2 * negative.astype(np.int32)
+    else:
+        raise ValueError(
+            "Unknown adjacency matrix encoding '{}'".format(config["encoding"])
+        )
+    return flat.reshape(shape)
+
+
 class Wiring:
     def __init__(self, units):
         self.units = units
+        self._encoded_adjacency_matrix = None
+        self._encoded_sensory_adjacency_matrix = None
         self.adjacency_matrix = np.zeros([units, units], dtype=np.int32)
         self.sensory_adjacency_matrix = None
         self.input_dim = None
         self.output_dim = None
 
+    # Matrices restored by from_config() are only decoded on first access
+    @property
+    def adjacency_matrix(self):
+        if self._encoded_adjacency_matrix is not None:
+            self._adjacency_matrix = _decode_adjacency_matrix(
+                self._encoded_adjacency_matrix
+            )
+            self._encoded_adjacency_matrix = None
+        return self._adjacency_matrix
+
+    @adjacency_matrix.setter
+    def adjacency_matrix(self, value):
+        self._encoded_adjacency_matrix = None
+        self._adjacency_matrix = value
+
+    @property
+    def sensory_adjacency_matrix(self):
+        if self._encoded_sensory_adjacency_matrix is not None:
+            self._sensory_adjacency_matrix = _decode_adjacency_matrix(
+                self._encoded_sensory_adjacency_matrix
+            )
+            self._encoded_sensory_adjacency_matrix = None
+        return self._sensory_adjacency_matrix
+
+    @sensory_adjacency_matrix.setter
+    def sensory_adjacency_matrix(self, value):
+        self._encoded_sensory_adjacency_matrix = None
+        self._sensory_adjacency_matrix = value
+
     @property
     def num_layers(self):
         return 1
@@ -109,11 +199,78 @@ class Wiring:
             )
         self.sensory_adjacency_matrix[src, dest] = polarity
 
+    @staticmethod
+    def _check_synapses(src, dest, polarity, num_src, num_dest, src_name):
+        src = np.asarray(src, dtype=np.int64).reshape(-1)
+        dest = np.asarray(dest, dtype=np.int64).reshape(-1)
+        polarity = np.broadcast_to(np.asarray(polarity), src.shape)
+        if dest.shape != src.shape:
+            raise ValueError(
+                "Got {} synapse sources but {} destinations".format(
+                    src.shape[0], dest.shape[0]
+                )
+            )
+        if src.size > 0 and (src.min() < 0 or src.max() >= num_src):
+            raise ValueError(
+                "Cannot add synapses originating in {} if there are only {} {}".format(
+                    src[(src < 0) | (src >= num_src)].tolist(), num_src, src_name
+                )
+            )
+        if dest.size > 0 and (dest.min() < 0 or dest.max() >= num_dest):
+            raise ValueError(
+                "Cannot add synapses feeding into {} if cell has only {} units".format(
+                    dest[(dest < 0) | (dest >= num_dest)].tolist(), num_dest
+                )
+            )
+        if not np.all(np.isin(polarity, [-1, 1])):
+            raise ValueError(
+                "Cannot add synapses with polarity {} (expected -1 or +1)".format(
+                    np.unique(polarity[~np.isin(polarity, [-1, 1])]).tolist()
+                )
+            )
+        return src, dest, polarity
+
+    @staticmethod
+    def _set_synapses(matrix, src, dest, polarity):
+        # Repeated synapses keep the last polarity, like repeated add_synapse() calls
+        flat = src * matrix.shape[1] + dest
+        _, last = np.unique(flat[::-1], return_index=True)
+        keep = flat.shape[0] - 1 - last
+        matrix[src[keep], dest[keep]] = polarity[keep]
+
+    def add_synapses(self, src, dest, polarity):
+        """
+        Adds many synapses between internal neurons at once
+        :param src: Array of source neuron ids
+        :param dest: Array of destination neuron ids
+        :param polarity: Array (or scalar) of polarities, each -1 or +1
+        """
+        src, dest, polarity = self._check_synapses(
+            src, dest, polarity, self.units, self.units, "units"
+        )
+        self._set_synapses(self.adjacency_matrix, src, dest, polarity)
+
+    def add_sensory_synapses(self, src, dest, polarity):
+        """
+        Adds many synapses from the sensory neurons to internal neurons at once
+        :param src: Array of input feature ids
+        :param dest: Array of destination neuron ids
+        :param polarity: Array (or scalar) of polarities, each -1 or +1
+        """
+        if self.input_dim is None:
+            raise ValueError(
+                "Cannot add sensory synapses before build() has been called!"
+            )
+        src, dest, polarity = self._check_synapses(
+            src, dest, polarity, self.input_dim, self.units, "input features"
+        )
+        self._set_synapses(self.sensory_adjacency_matrix, src, dest, polarity)
+
     def get_config(self):
         return {
             "units": self.units,
-            "adjacency_matrix": self.adjacency_matrix.tolist() if self.adjacency_matrix is not None else None,
-            "sensory_adjacency_matrix": self.sensory_adjacency_matrix.tolist() if self.sensory_adjacency_matrix is not None else None,
+            "adjacency_matrix": _encode_adjacency_matrix(self.adjacency_matrix),
+            "sensory_adjacency_matrix": _encode_adjacency_matrix(self.sensory_adjacency_matrix),
             "input_dim": self.input_dim,
             "output_dim": self.output_dim,
         }
@@ -123,9 +280,9 @@ class Wiring:
         # There might be a cleaner solution but it will work
         wiring = Wiring(config["units"])
         if config["adjacency_matrix"] is not None:
-            wiring.adjacency_matrix = np.array(config["adjacency_matrix"])
+            wiring._encoded_adjacency_matrix = config["adjacency_matrix"]
         if config["sensory_adjacency_matrix"] is not None:
-            wiring.sensory_adjacency_matrix = np.array(config["sensory_adjacency_matrix"])
+            wiring._encoded_sensory_adjacency_matrix = config["sensory_adjacency_matrix"]
         wiring.input_dim = config["input_dim"]
         wiring.output_dim = config["output_dim"]
 
@@ -146,36 +303,27 @@ class Wiring:
         import networkx as nx
 
         DG = nx.DiGraph()
-        for i in range(self.units):
-            neuron_type = self.get_type_of_neuron(i)
-            DG.add_node("neuron_{:d}".format(i), neuron_type=neuron_type)
-        for i in range(self.input_dim):
-            DG.add_node("sensory_{:d}".format(i), neuron_type="sensory")
-
-        erev = self.adjacency_matrix
-        sensory_erev = self.sensory_adjacency_matrix
-
-        for src in range(self.input_dim):
-            for dest in range(self.units):
-                if self.sensory_adjacency_matrix[src, dest] != 0:
-                    polarity = (
-                        "excitatory" if sensory_erev[src, dest] >= 0.0 else "inhibitory"
-                    )
-                    DG.add_edge(
-                        "sensory_{:d}".format(src),
-                        "neuron_{:d}".format(dest),
-                        polarity=polarity,
-                    )
-
-        for src in range(self.units):
-            for dest in range(self.units):
-                if self.adjacency_matrix[src, dest] != 0:
-                    polarity = "excitatory" if erev[src, dest] >= 0.0 else "inhibitory"
-                    DG.add_edge(
-                        "neuron_{:d}".format(src),
-                        "neuron_{:d}".format(dest),
-                        polarity=polarity,
-                    )
+        DG.add_nodes_from(
+            ("neuron_{:d}".format(i), {"neuron_type": self.get_type_of_neuron(i)})
+            for i in range(self.units)
+        )
+        DG.add_nodes_from(
+            ("sensory_{:d}".format(i), {"neuron_type": "sensory"})
+            for i in range(self.input_dim)
+        )
+
+        def edges(adjacency_matrix, src_prefix):
+            src, dest = np.nonzero(adjacency_matrix)
+            excitatory = adjacency_matrix[src, dest] >= 0
+            for s, d, e in zip(src.tolist(), dest.tolist(), excitatory.tolist()):
+                yield (
+                    "{}_{:d}".format(src_prefix, s),
+                    "neuron_{:d}".format(d),
+                    {"polarity": "excitatory" if e else "inhibitory"},
+                )
+
+        DG.add_edges_from(edges(self.sensory_adjacency_matrix, "sensory"))
+        DG.add_edges_from(edges(self.adjacency_matrix, "neuron"))
         return DG
 
     @property
@@ -188,6 +336,43 @@ class Wiring:
         """Counts the number of synapses from the inputs (sensory neurons) to the internal neurons of the model"""
         return np.sum(np.abs(self.sensory_adjacency_matrix))
 
+    @staticmethod
+    def _edges_of(adjacency_matrix):
+        # Edges are ordered by destination neuron (CSR order of the transposed
+        # matrix) so that reductions into the postsynaptic neurons touch
+        # contiguous segments
+        dest, src = np.nonzero(np.transpose(adjacency_matrix))
+        polarity = adjacency_matrix[src, dest]
+        return src.astype(np.int32), dest.astype(np.int32), polarity.astype(np.int32)
+
+    def synapse_edges(self):
+        """
+        Returns the synapses between internal neurons as a COO edge list
+        :return: Tuple of (src, dest, polarity) int32 arrays, ordered by destination neuron
+        """
+        return self._edges_of(self.adjacency_matrix)
+
+    def sensory_synapse_edges(self):
+        """
+        Returns the synapses from the sensory neurons to the internal neurons as a COO edge list
+        :return: Tuple of (src, dest, polarity) int32 arrays, ordered by destination neuron
+        """
+        if self.sensory_adjacency_matrix is None:
+            raise ValueError(
+                "Cannot get sensory synapses before build() has been called!"
+            )
+        return self._edges_of(self.sensory_adjacency_matrix)
+
+    @property
+    def density(self):
+        """Fraction of the possible synapses (internal and sensory) that exist in the wiring"""
+        total = self.adjacency_matrix.size
+        count = self.synapse_count
+        if self.sensory_adjacency_matrix is not None:
+            total += self.sensory_adjacency_matrix.size
+            count += self.sensory_synapse_count
+        return float(count) / max(total, 1)
+
     def draw_graph(
         self,
         layout="shell",
@@ -303,19 +488,18 @@ class FullyConnected(Wiring):
         self.set_output_dim(output_dim)
         self._rng = np.random.default_rng(erev_init_seed)
         self._erev_init_seed = erev_init_seed
-        for src in range(self.units):
-            for dest in range(self.units):
-                if src == dest and not self_connections:
-                    continue
-                polarity = self._rng.choice([-1, 1, 1])
-                self.add_synapse(src, dest, polarity)
+        src, dest = np.divmod(np.arange(self.units * self.units), self.units)
+        if not self_connections:
+            src, dest = src[src != dest], dest[src != dest]
+        # One batched draw yields the same polarities as one draw per synapse
+        polarity = self._rng.choice([-1, 1, 1], size=src.shape[0])
+        self.add_synapses(src, dest, polarity)
 
     def build(self, input_shape):
         super().build(input_shape)
-        for src in range(self.input_dim):
-            for dest in range(self.units):
-                polarity = self._rng.choice([-1, 1, 1])
-                self.add_sensory_synapse(src, dest, polarity)
+        src, dest = np.divmod(np.arange(self.input_dim * self.units), self.units)
+        polarity = self._rng.choice([-1, 1, 1], size=src.shape[0])
+        self.add_sensory_synapses(src, dest, polarity)
 
     def get_config(self):
         return {
@@ -348,36 +532,30 @@ class Random(Wiring):
         self._random_seed = random_seed
 
         number_of_synapses = int(np.round(units * units * (1 - sparsity_level)))
-        all_synapses = []
-        for src in range(self.units):
-            for dest in range(self.units):
-                all_synapses.append((src, dest))
-
+        # Sampling flat (src, dest) indices draws the same synapses as
+        # sampling rows of the list of all (src, dest) pairs
         used_synapses = self._rng.choice(
-            all_synapses, size=number_of_synapses, replace=False
+            units * units, size=number_of_synapses, replace=False
         )
-        for src, dest in used_synapses:
-            polarity = self._rng.choice([-1, 1, 1])
-            self.add_synapse(src, dest, polarity)
+        src, dest = np.divmod(used_synapses, units)
+        polarity = self._rng.choice([-1, 1, 1], size=number_of_synapses)
+        self.add_synapses(src, dest, polarity)
 
     def build(self, input_shape):
         super().build(input_shape)
         number_of_sensory_synapses = int(
             np.round(self.input_dim * self.units * (1 - self.sparsity_level))
         )
-        all_sensory_synapses = []
-        for src in range(self.input_dim):
-            for dest in range(self.units):
-                all_sensory_synapses.append((src, dest))
-
         used_sensory_synapses = self._rng.choice(
-            all_sensory_synapses, size=number_of_sensory_synapses, replace=False
+            self.input_dim * self.units,
+            size=number_of_sensory_synapses,
+            replace=False,
         )
-        for src, dest in used_sensory_synapses:
-            polarity = self._rng.choice([-1, 1, 1])
-            self.add_sensory_synapse(src, dest, polarity)
-            polarity = self._rng.choice([-1, 1, 1])
-            self.add_sensory_synapse(src, dest, polarity)
+        src, dest = np.divmod(used_sensory_synapses, self.units)
+        # Two polarities are drawn per sensory synapse and the second one is
+        # kept, which preserves the random stream of existing wirings
+        polarity = self._rng.choice([-1, 1, 1], size=(number_of_sensory_synapses, 2))
+        self.add_sensory_synapses(src, dest, polarity[:, 1])
 
     def get_config(self):
         return {
@@ -486,17 +664,30 @@ class NCP(Wiring):
             return "command"
         return "inter"
 
+    def _sample_fanout(self, sources, targets, fanout):
+        """Connects every source to ``fanout`` distinct random targets
+
+        The random stream is consumed in the same order as one ``choice`` of
+        targets per source followed by one polarity draw per synapse.
+        """
+        src, dest, polarity = [], [], []
+        for source in sources:
+            chosen = self._rng.choice(targets, size=fanout, replace=False)
+            src.append(np.full(fanout, source))
+            dest.append(chosen)
+            polarity.append(self._rng.choice([-1, 1], size=fanout))
+        if len(src) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(src), np.concatenate(dest), np.concatenate(polarity)
+
     def _build_sensory_to_inter_layer(self):
-        unreachable_inter_neurons = [l for l in self._inter_neurons]
         # Randomly connects each sensory neuron to exactly _sensory_fanout number of interneurons
-        for src in self._sensory_neurons:
-            for dest in self._rng.choice(
-                self._inter_neurons, size=self._sensory_fanout, replace=False
-            ):
-                if dest in unreachable_inter_neurons:
-                    unreachable_inter_neurons.remove(dest)
-                polarity = self._rng.choice([-1, 1])
-                self.add_sensory_synapse(src, dest, polarity)
+        src, dest, polarity = self._sample_fanout(
+            self._sensory_neurons, self._inter_neurons, self._sensory_fanout
+        )
+        self.add_sensory_synapses(src, dest, polarity)
+        unreachable_inter_neurons = np.setdiff1d(self._inter_neurons, dest)
 
         # If it happens that some interneurons are not connected, connect them now
         mean_inter_neuron_fanin = int(
@@ -506,24 +697,18 @@ class NCP(Wiring):
         mean_inter_neuron_fanin = np.clip(
             mean_inter_neuron_fanin, 1, self._num_sensory_neurons
         )
-        for dest in unreachable_inter_neurons:
-            for src in self._rng.choice(
-                self._sensory_neurons, size=mean_inter_neuron_fanin, replace=False
-            ):
-                polarity = self._rng.choice([-1, 1])
-                self.add_sensory_synapse(src, dest, polarity)
+        dest, src, polarity = self._sample_fanout(
+            unreachable_inter_neurons, self._sensory_neurons, mean_inter_neuron_fanin
+        )
+        self.add_sensory_synapses(src, dest, polarity)
 
     def _build_inter_to_command_layer(self):
         # Randomly connect interneurons to command neurons
-        unreachable_command_neurons = [l for l in self._command_neurons]
-        for src in self._inter_neurons:
-            for dest in self._rng.choice(
-                self._command_neurons, size=self._inter_fanout, replace=False
-            ):
-                if dest in unreachable_command_neurons:
-                    unreachable_command_neurons.remove(dest)
-                polarity = self._rng.choice([-1, 1])
-                self.add_synapse(src, dest, polarity)
+        src, dest, polarity = self._sample_fanout(
+            self._inter_neurons, self._command_neurons, self._inter_fanout
+        )
+        self.add_synapses(src, dest, polarity)
+        unreachable_command_neurons = np.setdiff1d(self._command_neurons, dest)
 
         # If it happens that some command neurons are not connected, connect them now
         mean_command_neurons_fanin = int(
@@ -533,32 +718,30 @@ class NCP(Wiring):
         mean_command_neurons_fanin = np.clip(
             mean_command_neurons_fanin, 1, self._num_command_neurons
         )
-        for dest in unreachable_command_neurons:
-            for src in self._rng.choice(
-                self._inter_neurons, size=mean_command_neurons_fanin, replace=False
-            ):
-                polarity = self._rng.choice([-1, 1])
-                self.add_synapse(src, dest, polarity)
+        dest, src, polarity = self._sample_fanout(
+            unreachable_command_neurons, self._inter_neurons, mean_command_neurons_fanin
+        )
+        self.add_synapses(src, dest, polarity)
 
     def _build_recurrent_command_layer(self):
-        # Add recurrency in command neurons
+        # Add recurrency in command neurons. The draws of source, destination
+        # and polarity interleave, so they are collected one synapse at a time
+        src = np.zeros(self._recurrent_command_synapses, dtype=np.int64)
+        dest = np.zeros(self._recurrent_command_synapses, dtype=np.int64)
+        polarity = np.zeros(self._recurrent_command_synapses, dtype=np.int64)
         for i in range(self._recurrent_command_synapses):
-            src = self._rng.choice(self._command_neurons)
-            dest = self._rng.choice(self._command_neurons)
-            polarity = self._rng.choice([-1, 1])
-            self.add_synapse(src, dest, polarity)
+            src[i] = self._rng.choice(self._command_neurons)
+            dest[i] = self._rng.choice(self._command_neurons)
+            polarity[i] = self._rng.choice([-1, 1])
+        self.add_synapses(src, dest, polarity)
 
     def _build_command__to_motor_layer(self):
         # Randomly connect command neurons to motor neurons
-        unreachable_command_neurons = [l for l in self._command_neurons]
-        for dest in self._motor_neurons:
-            for src in self._rng.choice(
-                self._command_neurons, size=self._motor_fanin, replace=False
-            ):
-                if src in unreachable_command_neurons:
-                    unreachable_command_neurons.remove(src)
-                polarity = self._rng.choice([-1, 1])
-                self.add_synapse(src, dest, polarity)
+        dest, src, polarity = self._sample_fanout(
+            self._motor_neurons, self._command_neurons, self._motor_fanin
+        )
+        self.add_synapses(src, dest, polarity)
+        unreachable_command_neurons = np.setdiff1d(self._command_neurons, src)
 
         # If it happens that some command neurons are not connected, connect them now
         mean_command_fanout = int(
@@ -566,12 +749,10 @@ class NCP(Wiring):
         )
         # Connect "forgotten" command neuron to at least 1 and at most all motor neuron
         mean_command_fanout = np.clip(mean_command_fanout, 1, self._num_motor_neurons)
-        for src in unreachable_command_neurons:
-            for dest in self._rng.choice(
-                self._motor_neurons, size=mean_command_fanout, replace=False
-            ):
-                polarity = self._rng.choice([-1, 1])
-                self.add_synapse(src, dest, polarity)
+        src, dest, polarity = self._sample_fanout(
+            unreachable_command_neurons, self._motor_neurons, mean_command_fanout
+        )
+        self.add_synapses(src, dest, polarity)
 
     def build(self, input_shape):
         super().build(input_shape)